@@ -4,9 +4,12 @@ from werkzeug.utils import secure_filename
 import os
 import tempfile
 
-from world.grid_forge import Map_Anvil
+from world.world_registry import World_Registry
 from runes.runes import PathGlyph
+from aris.course_service import Course_Service, Course_Timeout
 from aris.saladin_pathfinder import Saladin_Pathfinder
+from aris.search_stats import Search_Cancelled
+from world.cost_profiles import resolve_profile
 
 app = Flask(__name__)
 
@@ -14,6 +17,17 @@ app = Flask(__name__)
 UPLOAD_FOLDER = tempfile.gettempdir()
 app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
 
+# Parsed worlds reused across requests, keyed by file id + content hash
+WORLD_REGISTRY = World_Registry()
+
+# Searches run in this worker pool, with timeouts, node budgets and
+# coalescing of identical requests in flight
+COURSE_SERVICE = Course_Service(
+    WORLD_REGISTRY,
+    workers=int(os.environ.get("PATHFIND_WORKERS", "4")),
+    default_timeout=float(os.environ.get("PATHFIND_TIMEOUT", "10")),
+)
+
 
 # ------------------------------------------------------
 # STATIC UI ROUTES
@@ -50,9 +64,28 @@ def upload_map():
     temp_path = os.path.join(app.config["UPLOAD_FOLDER"], filename)
     file.save(temp_path)
 
+    # An overwritten upload must never be served from the old parse
+    WORLD_REGISTRY.invalidate(temp_path)
+
     return jsonify({"file_id": temp_path}), 200
 
 
+# ------------------------------------------------------
+# API: WORLD CACHE COUNTERS
+# ------------------------------------------------------
+@app.route("/world_cache", methods=["GET"])
+def world_cache():
+    return jsonify(WORLD_REGISTRY.stats()), 200
+
+
+# ------------------------------------------------------
+# API: SEARCH SERVICE COUNTERS
+# ------------------------------------------------------
+@app.route("/service_stats", methods=["GET"])
+def service_stats():
+    return jsonify(COURSE_SERVICE.stats()), 200
+
+
 # ------------------------------------------------------
 # API: PATHFINDING
 # ------------------------------------------------------
@@ -69,13 +102,42 @@ def pathfind():
     goal = data["goal"]
     mode = data["mode"]
 
-    world = Map_Anvil(map_path)
-    pf = Saladin_Pathfinder(world, mode=mode)
-
     start_g = PathGlyph(start["x"], start["y"])
     goal_g = PathGlyph(goal["x"], goal["y"])
 
-    path = pf.chart_course(start_g, goal_g)
+    # Optional: a registered profile name or a {terrain: cost} mapping
+    try:
+        profile = resolve_profile(data.get("profile"))
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+
+    # Optional: seconds to wait and nodes to expand before giving up
+    timeout = data.get("timeout")
+    node_budget = data.get("node_budget")
+    if timeout is not None and (not isinstance(timeout, (int, float)) or timeout <= 0):
+        return jsonify({"error": "timeout must be a positive number of seconds"}), 400
+    if node_budget is not None and (not isinstance(node_budget, int) or node_budget < 1):
+        return jsonify({"error": "node_budget must be a positive integer"}), 400
+
+    # Optional: many agents heading to one goal share a cached flow field
+    try:
+        if data.get("flow_field"):
+            field = COURSE_SERVICE.flow_field_sync(
+                map_path, goal_g, mode,
+                profile=profile, timeout=timeout, node_budget=node_budget,
+            )
+            path = field.path_from(start_g)
+        else:
+            report = COURSE_SERVICE.chart_sync(
+                map_path, start_g, goal_g, mode,
+                profile=profile, timeout=timeout, node_budget=node_budget,
+            )
+            path = report.path
+    except Course_Timeout as error:
+        return jsonify({"error": str(error)}), 504
+    except Search_Cancelled as error:
+        return jsonify({"error": str(error)}), 422
+    world = WORLD_REGISTRY.fetch(map_path)
 
     if path is None:
         return jsonify({"path": None, "cost": None}), 200
@@ -83,6 +145,7 @@ def pathfind():
     serialized_path = [{"x": p.x, "y": p.y} for p in path]
 
     # Calculate energy cost
+    pf = Saladin_Pathfinder(world, mode=mode, profile=profile)
     cost = 0
     for i in range(len(path) - 1):
         cost += pf._movement_cost(path[i], path[i + 1])
@@ -98,4 +161,5 @@ def pathfind():
 # RUN SERVER
 # ------------------------------------------------------
 if __name__ == "__main__":
-    app.run(debug=True)
+    # Debug mode (reloader, debugger) only on request: FLASK_DEBUG=1
+    app.run(debug=os.environ.get("FLASK_DEBUG") == "1", threaded=True)
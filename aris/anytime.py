@@ -0,0 +1,236 @@
+"""
+anytime.py
+----------
+Anytime Repairing A* (ARA*, Likhachev et al. 2003) over flat cell indices.
+
+The first pass runs weighted A* with a large inflation epsilon, which
+finds a path quickly. Each later pass lowers epsilon and repairs the
+previous search instead of starting over: g-scores are kept, and cells
+whose g improved after they were expanded in the current pass wait in
+an INCONS list until the next one. The last pass runs at epsilon = 1 and
+proves the path optimal.
+
+Search may stop at a deadline (time.monotonic() seconds) or an expansion
+budget. The best path found so far is returned with its proven bound:
+its cost divided by the largest lower bound on the optimum seen so far,
+which is at least g(goal) / epsilon and at least min(g + h) over the
+cells still in OPEN or INCONS after a completed pass.
+"""
+
+from typing import Callable, Dict, List, Optional, Set, Tuple
+import heapq
+import time
+
+from aris.index_kernel import INF, Search_Workspace, direction_moves
+from world.terrain_legends import DIAGONAL_PENALTY
+
+# Expansions between two looks at the clock
+CHECK_EVERY = 256
+
+
+def anytime_a_star(
+    world,
+    workspace: Search_Workspace,
+    start: int,
+    goal: int,
+    mode: str,
+    h_straight: float,
+    h_diagonal: float,
+    epsilon: float = 3.0,
+    epsilon_step: float = 0.5,
+    deadline: Optional[float] = None,
+    node_budget: Optional[int] = None,
+    heuristic: Optional[Callable[[int], float]] = None,
+) -> Tuple[Optional[List[int]], Dict[str, object]]:
+    """
+    Returns the best index path found (or None) and the counters:
+    the usual search counts plus suboptimality_bound, passes, epsilon
+    (of the last completed pass), stopped ("deadline", "node_budget" or
+    None when the search ran to the optimum) and solutions, one
+    {epsilon, cost, nodes_expanded, seconds} entry per improvement.
+
+    The octile heuristic uses h_straight / h_diagonal per step unless a
+    heuristic(cell index) is given.
+    """
+    if epsilon < 1.0:
+        raise ValueError("epsilon must be at least 1.0")
+    if epsilon_step <= 0.0:
+        raise ValueError("epsilon_step must be positive")
+
+    started = time.monotonic()
+    width = world.width
+    masks = world.direction_masks
+    costs = world.cost_grid
+    fewest_steps = mode == "fewest_steps"
+    moves = direction_moves(width)
+    gy, gx = divmod(goal, width)
+    extra = h_diagonal - h_straight
+    diagonal_penalty = DIAGONAL_PENALTY
+
+    if heuristic is None:
+        def heuristic(index: int) -> float:
+            y, x = divmod(index, width)
+            hx = x - gx if x > gx else gx - x
+            hy = y - gy if y > gy else gy - y
+            if hx > hy:
+                return h_straight * hx + extra * hy
+            return h_straight * hy + extra * hx
+
+    g_score = workspace.g_score
+    parent = workspace.parent
+    stamp = workspace.stamp
+    # closed marks cells expanded in any pass; expanded holds this pass's
+    ever_expanded = workspace.closed
+    generation = workspace.begin()
+
+    stamp[start] = generation
+    g_score[start] = 0.0
+    parent[start] = -1
+
+    push, pop = heapq.heappush, heapq.heappop
+    open_set = [(epsilon * heuristic(start), start)]
+    expanded: Set[int] = set()
+    incons: Set[int] = set()
+
+    pushes, pops, stale_pops, reexpansions, nodes = 1, 0, 0, 0, 0
+    max_open = 1
+    countdown = CHECK_EVERY
+    passes = 0
+    stopped = None
+
+    best_path: Optional[List[int]] = None
+    best_cost = INF
+    lower_bound = 0.0
+    completed_epsilon = None
+    solutions: List[Dict[str, float]] = []
+
+    def goal_g() -> float:
+        return g_score[goal] if stamp[goal] == generation else INF
+
+    def path_cost(path: List[int]) -> float:
+        if fewest_steps:
+            return float(len(path) - 1)
+        total = 0.0
+        for a, b in zip(path, path[1:]):
+            total += costs[b]
+            if a % width != b % width and a // width != b // width:
+                total += diagonal_penalty
+        return total
+
+    def record(pass_epsilon: float) -> None:
+        """Keep the current goal path if it beats the best one."""
+        nonlocal best_path, best_cost
+        if goal_g() >= best_cost:
+            return
+        # Parents may have improved since the goal was labelled, so the
+        # traced path can be cheaper than g(goal)
+        path = workspace.trace(goal)
+        cost = path_cost(path)
+        if cost < best_cost:
+            best_cost = cost
+            best_path = path
+            solutions.append({
+                "epsilon": pass_epsilon,
+                "cost": cost,
+                "nodes_expanded": nodes,
+                "seconds": time.monotonic() - started,
+            })
+
+    if deadline is not None and time.monotonic() > deadline:
+        stopped = "deadline"
+
+    while stopped is None:
+        # ---- improve path at the current epsilon ----
+        while open_set:
+            if len(open_set) > max_open:
+                max_open = len(open_set)
+            key, current = open_set[0]
+            if current in expanded or key != g_score[current] + epsilon * heuristic(current):
+                pop(open_set)
+                pops += 1
+                stale_pops += 1
+                continue
+            # Stop once no open cell can lead to a cheaper goal
+            if goal_g() <= key:
+                break
+
+            pop(open_set)
+            pops += 1
+            nodes += 1
+            expanded.add(current)
+            if ever_expanded[current] == generation:
+                reexpansions += 1
+            ever_expanded[current] = generation
+
+            countdown -= 1
+            if not countdown:
+                countdown = CHECK_EVERY
+                if deadline is not None and time.monotonic() > deadline:
+                    stopped = "deadline"
+            if node_budget is not None and nodes >= node_budget:
+                stopped = "node_budget"
+
+            base = g_score[current]
+            for offset, dx, dy, penalty in moves[masks[current]]:
+                nb = current + offset
+                tentative = base + 1.0 if fewest_steps else base + costs[nb] + penalty
+                if stamp[nb] != generation or tentative < g_score[nb]:
+                    stamp[nb] = generation
+                    g_score[nb] = tentative
+                    parent[nb] = current
+                    if nb in expanded:
+                        incons.add(nb)
+                    else:
+                        push(open_set, (tentative + epsilon * heuristic(nb), nb))
+                        pushes += 1
+
+            if stopped is not None:
+                break
+
+        # The goal's g may have improved even in an interrupted pass
+        record(epsilon)
+        if stopped is not None:
+            break
+
+        passes += 1
+        completed_epsilon = epsilon
+        if best_cost == INF:
+            # Nothing left to search: the goal cannot be reached
+            break
+
+        # Lower bounds on the optimum after a completed pass
+        frontier = {cell for _, cell in open_set if cell not in expanded} | incons
+        floor = min((g_score[cell] + heuristic(cell) for cell in frontier), default=best_cost)
+        lower_bound = max(lower_bound, best_cost / epsilon, min(floor, best_cost))
+        if epsilon == 1.0 or best_cost <= lower_bound:
+            break
+
+        # ---- next pass: tighter epsilon, INCONS back into OPEN ----
+        epsilon = max(1.0, epsilon - epsilon_step)
+        open_set = [(g_score[cell] + epsilon * heuristic(cell), cell) for cell in frontier]
+        heapq.heapify(open_set)
+        pushes += len(open_set)
+        expanded = set()
+        incons = set()
+
+    if best_path is None:
+        bound = None
+    elif lower_bound > 0.0:
+        bound = max(1.0, best_cost / lower_bound)
+    else:
+        bound = 1.0 if best_cost == 0.0 else None
+
+    counters = {
+        "nodes_expanded": nodes,
+        "pushes": pushes,
+        "pops": pops,
+        "stale_pops": stale_pops,
+        "reexpansions": reexpansions,
+        "max_open_size": max_open,
+        "suboptimality_bound": bound,
+        "passes": passes,
+        "epsilon": completed_epsilon,
+        "stopped": stopped,
+        "solutions": solutions,
+    }
+    return best_path, counters
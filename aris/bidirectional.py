@@ -0,0 +1,174 @@
+"""
+bidirectional.py
+----------------
+Bidirectional A* over flat cell indices.
+
+One frontier grows forward from the start and one grows backward from
+the goal. Moves are asymmetric: stepping from a to b costs the terrain
+of b (plus the diagonal penalty). The backward search therefore charges
+the cell it is expanding, not the predecessor it reaches.
+
+Both sides use the averaged potential p(v) = (h_goal(v) - h_start(v)) / 2
+(negated for the backward side), the consistent choice of Ikeda et al.
+(1994). With it the search is bidirectional Dijkstra on reduced costs.
+Whenever either side labels a cell the other side has already labelled,
+the joined route is a candidate (mu). The search stops once the two open
+list minima sum to at least mu, because no unexplored route can be
+cheaper after that.
+"""
+
+from typing import Dict, List, Optional, Tuple
+import heapq
+
+from aris.index_kernel import INF, Search_Workspace, direction_moves
+from aris.search_stats import Search_Probe
+
+
+def bidirectional_a_star(
+    world,
+    forward: Search_Workspace,
+    backward: Search_Workspace,
+    start: int,
+    goal: int,
+    mode: str,
+    h_straight: float,
+    h_diagonal: float,
+    probe: Optional[Search_Probe] = None,
+) -> Tuple[Optional[List[int]], Dict[str, int]]:
+    """
+    Returns the start-to-goal index path (or None) and the counters,
+    including forward_expanded and backward_expanded. A probe's hook
+    samples expansions of both sides; phases are not timed separately.
+    """
+    sample_every = probe.sample_every if probe is not None and probe.hook is not None else 0
+    countdown = sample_every
+
+    width = world.width
+    passable = world.passable_bits
+    masks = world.direction_masks
+    costs = world.cost_grid
+    fewest_steps = mode == "fewest_steps"
+    extra = h_diagonal - h_straight
+    moves = direction_moves(width)
+
+    sy, sx = divmod(start, width)
+    gy, gx = divmod(goal, width)
+
+    def octile(x: int, y: int, tx: int, ty: int) -> float:
+        dx = x - tx if x > tx else tx - x
+        dy = y - ty if y > ty else ty - y
+        if dx > dy:
+            return h_straight * dx + extra * dy
+        return h_straight * dy + extra * dx
+
+    def potential(x: int, y: int) -> float:
+        """Forward potential; the backward side uses its negation."""
+        return (octile(x, y, gx, gy) - octile(x, y, sx, sy)) * 0.5
+
+    sides = []
+    for workspace, origin, sign in ((forward, start, 1.0), (backward, goal, -1.0)):
+        generation = workspace.begin()
+        workspace.stamp[origin] = generation
+        workspace.g_score[origin] = 0.0
+        workspace.parent[origin] = -1
+        oy, ox = divmod(origin, width)
+        p = sign * potential(ox, oy)
+        sides.append({
+            "ws": workspace,
+            "gen": generation,
+            "open": [(p, origin)],
+            "sign": sign,
+            "expanded": 0,
+        })
+
+    fwd, bwd = sides
+    fwd["other"], bwd["other"] = bwd, fwd
+    fwd["reverse"], bwd["reverse"] = False, True
+
+    mu = INF
+    meet = -1
+    pushes, pops, stale_pops = 2, 0, 0
+    max_open = 2
+    push, pop = heapq.heappush, heapq.heappop
+
+    while fwd["open"] and bwd["open"]:
+        if mu <= fwd["open"][0][0] + bwd["open"][0][0]:
+            break
+
+        forward_open, backward_open = len(fwd["open"]), len(bwd["open"])
+        if forward_open + backward_open > max_open:
+            max_open = forward_open + backward_open
+        side = fwd if forward_open <= backward_open else bwd
+        ws, generation = side["ws"], side["gen"]
+        g_score, parent, stamp, closed = ws.g_score, ws.parent, ws.stamp, ws.closed
+        other = side["other"]
+        o_ws, o_gen = other["ws"], other["gen"]
+        o_stamp, o_g = o_ws.stamp, o_ws.g_score
+        reverse = side["reverse"]
+        sign = side["sign"]
+
+        _, current = pop(side["open"])
+        pops += 1
+        if closed[current] == generation:
+            stale_pops += 1
+            continue
+        closed[current] = generation
+        side["expanded"] += 1
+
+        if sample_every:
+            countdown -= 1
+            if not countdown:
+                countdown = sample_every
+                probe.sample(current, g_score[current], len(fwd["open"]) + len(bwd["open"]))
+
+        # Backward edges end at current, so current must be enterable
+        if reverse and not passable[current >> 3] >> (current & 7) & 1:
+            continue
+
+        cy, cx = divmod(current, width)
+        base = g_score[current]
+
+        # Both sides only link open cells, so the mask serves either way
+        for offset, dx, dy, penalty in moves[masks[current]]:
+            nb = current + offset
+            if closed[nb] == generation:
+                continue
+
+            if fewest_steps:
+                tentative = base + 1.0
+            else:
+                tentative = base + costs[current if reverse else nb] + penalty
+
+            if stamp[nb] != generation or tentative < g_score[nb]:
+                stamp[nb] = generation
+                g_score[nb] = tentative
+                parent[nb] = current
+
+                push(side["open"], (tentative + sign * potential(cx + dx, cy + dy), nb))
+                pushes += 1
+
+                if o_stamp[nb] == o_gen and tentative + o_g[nb] < mu:
+                    mu = tentative + o_g[nb]
+                    meet = nb
+
+    counters = {
+        "nodes_expanded": fwd["expanded"] + bwd["expanded"],
+        "forward_expanded": fwd["expanded"],
+        "backward_expanded": bwd["expanded"],
+        "pushes": pushes,
+        "pops": pops,
+        "stale_pops": stale_pops,
+        "reexpansions": 0,
+        "max_open_size": max_open,
+    }
+
+    if meet == -1:
+        return None, counters
+
+    path = forward.trace(meet)
+    cell = backward.parent[meet]
+    while cell != -1:
+        path.append(cell)
+        cell = backward.parent[cell]
+
+    return path, counters
@@ -0,0 +1,309 @@
+"""
+course_service.py
+-----------------
+Non-blocking pathfinding service for the web API.
+
+Searches run in a pool of worker threads, never in the caller's thread
+or on its event loop: submit() returns a concurrent Future, chart() is a
+coroutine that awaits it, and chart_sync() blocks with a timeout (for
+WSGI views). One Saladin_Pathfinder per (map, mode, profile) is shared
+by the workers; it keeps scratch arrays per thread, so each worker
+allocates them only once.
+
+Every search carries a Search_Budget, so runaway queries are cancelled
+from inside the kernel once they exceed their node budget or deadline,
+freeing the worker. Identical requests in flight at the same time
+(same map, start, goal, mode, profile and node budget) are coalesced:
+later callers wait on the first caller's computation, whose deadline is
+extended to the latest waiter's. Each caller still gets its own timeout.
+
+Flow fields (submit_flow_field, flow_field_sync) are whole-map builds
+and go through the same pool, budgets and coalescing.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as Future_Timeout
+from typing import Dict, Hashable, Optional, Tuple
+import asyncio
+import threading
+import time
+
+from aris.flow_field import Flow_Field
+from aris.path_cache import Course_Cache
+from aris.saladin_pathfinder import Saladin_Pathfinder
+from aris.search_stats import Course_Report, Search_Budget, Search_Cancelled, Search_Probe
+from runes.runes import PathGlyph
+from world.cost_profiles import Profile_Spec, resolve_profile
+from world.grid_forge import Map_Anvil
+from world.world_registry import World_Registry
+
+# Engines whose kernels call expansion hooks, so budgets can stop them
+CANCELLABLE_ENGINES = ("indexed", "bidirectional", "glyph")
+
+# Pathfinders kept per cached world: (mode, costs) -> Saladin_Pathfinder
+PATHFINDER_LIMIT = 16
+
+
+class Course_Timeout(Exception):
+    """The answer did not arrive within the request's timeout."""
+
+
+class Course_Service:
+    """
+    Worker pool answering chart_course requests for maps in a registry.
+    Use as a context manager (or call close()) to stop the workers.
+    """
+
+    def __init__(
+        self,
+        registry: World_Registry,
+        workers: Optional[int] = None,
+        engine: str = "indexed",
+        default_timeout: Optional[float] = 10.0,
+        default_node_budget: Optional[int] = None,
+    ):
+        if engine not in CANCELLABLE_ENGINES:
+            raise ValueError(f"Engine {engine} cannot be cancelled; use one of {CANCELLABLE_ENGINES}")
+
+        self.registry = registry
+        self.engine = engine
+        self.default_timeout = default_timeout
+        self.default_node_budget = default_node_budget
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="course")
+
+        # coalescing key -> (future, budget) of the computation in flight
+        self._in_flight: Dict[Hashable, Tuple[Future, Search_Budget]] = {}
+        self._lock = threading.Lock()
+
+        self.submitted = 0
+        self.coalesced = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.timeouts = 0
+
+    # ------------------------------------------------------------
+    # PUBLIC METHODS
+    # ------------------------------------------------------------
+    def submit(
+        self,
+        file_id: str,
+        hearth: PathGlyph,
+        pythonia: PathGlyph,
+        mode: str = "lowest_energy",
+        profile: Profile_Spec = None,
+        timeout: Optional[float] = None,
+        node_budget: Optional[int] = None,
+    ) -> Future:
+        """
+        Future of the Course_Report for one request, joining an identical
+        request already in flight. The future fails with Search_Cancelled
+        if the search hits its node budget or deadline.
+        """
+        profile = resolve_profile(profile)
+        if node_budget is None:
+            node_budget = self.default_node_budget
+        key = (file_id, hearth, pythonia, mode, profile.costs, node_budget)
+        return self._submit(
+            key, self._run, (file_id, hearth, pythonia, mode, profile), timeout, node_budget
+        )
+
+    def submit_flow_field(
+        self,
+        file_id: str,
+        pythonia: PathGlyph,
+        mode: str = "lowest_energy",
+        profile: Profile_Spec = None,
+        timeout: Optional[float] = None,
+        node_budget: Optional[int] = None,
+    ) -> Future:
+        """
+        Future of the Flow_Field towards pythonia, built in the pool under
+        the same budgets and coalescing as submit(). Fields are kept by
+        the shared pathfinder and rebuilt once the world changes.
+        """
+        profile = resolve_profile(profile)
+        if node_budget is None:
+            node_budget = self.default_node_budget
+        key = ("flow_field", file_id, pythonia, mode, profile.costs, node_budget)
+        return self._submit(
+            key, self._run_flow_field, (file_id, pythonia, mode, profile), timeout, node_budget
+        )
+
+    def chart_sync(self, *args, timeout: Optional[float] = None, **kwargs) -> Course_Report:
+        """
+        submit() and wait for the answer, raising Course_Timeout once
+        timeout (default: the service's) has passed.
+        """
+        if timeout is None:
+            timeout = self.default_timeout
+        return self._wait(self.submit(*args, timeout=timeout, **kwargs), timeout)
+
+    def flow_field_sync(self, *args, timeout: Optional[float] = None, **kwargs) -> Flow_Field:
+        """submit_flow_field() and wait for the field, as chart_sync does."""
+        if timeout is None:
+            timeout = self.default_timeout
+        return self._wait(self.submit_flow_field(*args, timeout=timeout, **kwargs), timeout)
+
+    async def chart(self, *args, timeout: Optional[float] = None, **kwargs) -> Course_Report:
+        """Coroutine form of chart_sync; the event loop is never blocked."""
+        if timeout is None:
+            timeout = self.default_timeout
+        future = asyncio.wrap_future(self.submit(*args, timeout=timeout, **kwargs))
+        try:
+            # shield: a caller giving up must not cancel a shared computation
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            self._count_timeout()
+            raise Course_Timeout(f"no answer within {timeout} s") from None
+        except Search_Cancelled as error:
+            if error.reason == "deadline":
+                self._count_timeout()
+                raise Course_Timeout(f"no answer within {timeout} s") from error
+            raise
+
+    def courses(self, file_id: str) -> Tuple[Map_Anvil, Course_Cache]:
+        """The world for this map file and its shared Course_Cache."""
+        world, _, cache = self._courses(file_id)
+        return world, cache
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "coalesced": self.coalesced,
+                "completed": self.completed,
+                "cancelled": self.cancelled,
+                "timeouts": self.timeouts,
+                "in_flight": len(self._in_flight),
+            }
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self) -> "Course_Service":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # ------------------------------------------------------------
+    # INTERNAL UTILITIES
+    # ------------------------------------------------------------
+    def _submit(
+        self,
+        key: Hashable,
+        run,
+        args: Tuple,
+        timeout: Optional[float],
+        node_budget: Optional[int],
+    ) -> Future:
+        """Queue run(*args, budget), or join the identical job in flight."""
+        if timeout is None:
+            timeout = self.default_timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._lock:
+            self.submitted += 1
+            running = self._in_flight.get(key)
+            if running is not None:
+                future, budget = running
+                budget.extend(deadline)
+                self.coalesced += 1
+                return future
+
+            check_every = min(256, node_budget) if node_budget else 256
+            budget = Search_Budget(node_budget, deadline, check_every)
+            future = self._pool.submit(run, *args, budget)
+            self._in_flight[key] = (future, budget)
+
+        future.add_done_callback(lambda done: self._settle(key, done))
+        return future
+
+    def _wait(self, future: Future, timeout: Optional[float]):
+        """The future's result, raising Course_Timeout after timeout."""
+        try:
+            return future.result(timeout)
+        except Future_Timeout:
+            self._count_timeout()
+            raise Course_Timeout(f"no answer within {timeout} s") from None
+        except Search_Cancelled as error:
+            if error.reason == "deadline":
+                self._count_timeout()
+                raise Course_Timeout(f"no answer within {timeout} s") from error
+            raise
+
+    def _run(
+        self,
+        file_id: str,
+        hearth: PathGlyph,
+        pythonia: PathGlyph,
+        mode: str,
+        profile,
+        budget: Search_Budget,
+    ) -> Course_Report:
+        """Worker body: load (or reuse) the map and run one budgeted search."""
+        # A request that waited out its deadline in the queue is not started
+        budget.check()
+        pathfinder = self._pathfinder(file_id, mode, profile)
+        return pathfinder.chart_course_report(
+            hearth, pythonia, hook=budget, sample_every=budget.check_every
+        )
+
+    def _run_flow_field(
+        self,
+        file_id: str,
+        pythonia: PathGlyph,
+        mode: str,
+        profile,
+        budget: Search_Budget,
+    ) -> Flow_Field:
+        """Worker body: build (or reuse) one budgeted flow field."""
+        budget.check()
+        pathfinder = self._pathfinder(file_id, mode, profile)
+        return pathfinder.flow_field(pythonia, probe=Search_Probe(budget, budget.check_every))
+
+    def _courses(self, file_id: str) -> Tuple[Map_Anvil, Dict, Course_Cache]:
+        """World, products and Course_Cache of one registry entry."""
+        world, products = self.registry.fetch_with_products(file_id)
+        cache = products.get("course_cache")
+        if cache is None:
+            cache = products.setdefault("course_cache", Course_Cache(world))
+        return world, products, cache
+
+    def _pathfinder(self, file_id: str, mode: str, profile) -> Saladin_Pathfinder:
+        """Shared pathfinder for this map, mode and profile."""
+        world, products, cache = self._courses(file_id)
+        key = (mode, profile.costs)
+
+        with self._lock:
+            pathfinders = products.setdefault("pathfinders", OrderedDict())
+            pathfinder = pathfinders.get(key)
+            if pathfinder is not None:
+                pathfinders.move_to_end(key)
+                return pathfinder
+
+        # Compiling the profile view is O(cells): never under the lock,
+        # which submit() and _settle() need
+        built = Saladin_Pathfinder(
+            world, mode=mode, engine=self.engine, course_cache=cache, profile=profile
+        )
+        with self._lock:
+            pathfinder = pathfinders.setdefault(key, built)
+            pathfinders.move_to_end(key)
+            if len(pathfinders) > PATHFINDER_LIMIT:
+                pathfinders.popitem(last=False)
+            return pathfinder
+
+    def _settle(self, key: Hashable, future: Future) -> None:
+        with self._lock:
+            if self._in_flight.get(key, (None,))[0] is future:
+                del self._in_flight[key]
+            if future.cancelled() or isinstance(future.exception(), Search_Cancelled):
+                self.cancelled += 1
+            else:
+                self.completed += 1
+
+    def _count_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
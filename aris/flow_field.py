@@ -0,0 +1,105 @@
+"""
+flow_field.py
+-------------
+Goal distance fields for crowds heading to one destination.
+
+A Flow_Field runs a single reverse Dijkstra from its goal over the whole
+Map_Anvil, using the same move costs as Saladin_Pathfinder._movement_cost.
+It keeps two arrays:
+
+    - cost_to_goal : cheapest cost from every cell to the goal (inf if none)
+    - direction    : per cell, index into DIRECTIONS of the next step
+                     (-1 at the goal and on cells that cannot reach it)
+
+After that, any agent's path is read in O(path length) by following
+directions, with no further searching. A Search_Probe passed to the
+constructor watches the build, so a Search_Budget can cancel it.
+"""
+
+from array import array
+from typing import List, Optional
+import time
+
+from aris.index_kernel import DIRECTIONS, INF, Search_Workspace, dijkstra_tree
+from aris.search_stats import Search_Probe
+from runes.runes import PathGlyph
+
+
+class Flow_Field:
+    """
+    Cost-to-goal and next-step direction for every cell of a world.
+    """
+
+    def __init__(
+        self,
+        world,
+        pythonia: PathGlyph,
+        mode: str = "lowest_energy",
+        probe: Optional[Search_Probe] = None,
+    ):
+        self.world = world
+        self.pythonia = pythonia
+        self.mode = mode
+        # World version the field was built from
+        self.version = world.version
+
+        started = time.perf_counter()
+        size = world.width * world.height
+        workspace = Search_Workspace(size)
+        goal = world.index_of(pythonia.x, pythonia.y)
+        self.stats = dijkstra_tree(world, workspace, goal, mode, reverse=True, probe=probe)
+
+        self.cost_to_goal = array("d", [INF]) * size
+        self.direction = array("b", [-1]) * size
+
+        width = world.width
+        direction_of = {(dx, dy): d for d, (dx, dy) in enumerate(DIRECTIONS)}
+        stamp, generation = workspace.stamp, workspace.generation
+        g_score, parent = workspace.g_score, workspace.parent
+
+        for index in range(size):
+            if stamp[index] != generation:
+                continue
+            self.cost_to_goal[index] = g_score[index]
+            step = parent[index]
+            if step != -1:
+                delta = (step % width - index % width, step // width - index // width)
+                self.direction[index] = direction_of[delta]
+
+        self.stats["build_seconds"] = time.perf_counter() - started
+
+    def cost_from(self, hearth: PathGlyph) -> float:
+        """Cheapest cost from hearth to the goal (inf if unreachable)."""
+        if not self.world.in_bounds(hearth.x, hearth.y):
+            return INF
+        return self.cost_to_goal[self.world.index_of(hearth.x, hearth.y)]
+
+    def next_step(self, hearth: PathGlyph) -> Optional[PathGlyph]:
+        """The cell to move to from hearth, or None at/without the goal."""
+        if not self.world.in_bounds(hearth.x, hearth.y):
+            return None
+        d = self.direction[self.world.index_of(hearth.x, hearth.y)]
+        if d == -1:
+            return None
+        dx, dy = DIRECTIONS[d]
+        return PathGlyph(hearth.x + dx, hearth.y + dy)
+
+    def path_from(self, hearth: PathGlyph) -> Optional[List[PathGlyph]]:
+        """Full path from hearth to the goal, or None if there is none."""
+        world = self.world
+        width = world.width
+        if not world.in_bounds(hearth.x, hearth.y):
+            return None
+        index = world.index_of(hearth.x, hearth.y)
+
+        if self.cost_to_goal[index] == INF:
+            return None
+
+        offsets = [dy * width + dx for dx, dy in DIRECTIONS]
+        indices = [index]
+        direction = self.direction
+        while direction[index] != -1:
+            index += offsets[direction[index]]
+            indices.append(index)
+
+        return [world.glyph_at_index(i) for i in indices]
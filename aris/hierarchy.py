@@ -0,0 +1,466 @@
+"""
+hierarchy.py
+------------
+Hierarchical pathfinding (HPA*) over a Map_Anvil.
+
+The map is cut into square clusters. Cells on either side of a cluster
+border that can step across it become entrance nodes of an abstract
+graph, linked by:
+
+    - inter edges : the single step across the border
+    - intra edges : the cheapest route between two entrances that stays
+                    inside their cluster (precomputed for both modes)
+
+A query joins start and goal to the entrances of their own clusters,
+searches the small abstract graph, then refines each abstract edge back
+into grid cells with a search confined to one cluster.
+
+exact=True keeps every border crossing as an entrance, which makes the
+abstract distances equal to the true ones at the price of a larger
+graph. exact=False follows the original HPA* paper: one entrance for
+each short run of border crossings and two for a long run. Paths are
+then near-optimal but the graph is much smaller. smooth=True straightens
+the refined path afterwards wherever a direct route is cheaper.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+import heapq
+import sys
+import time
+
+from aris.index_kernel import DIRECTIONS, INF
+from world.terrain_legends import DIAGONAL_PENALTY
+
+MODES = ("fewest_steps", "lowest_energy")
+
+# Directions that cover each unordered pair of neighbouring cells once
+_FORWARD_DIRECTIONS = ((1, 0), (0, 1), (1, 1), (-1, 1))
+
+
+class Cluster_Atlas:
+    """
+    Precomputed cluster abstraction of one Map_Anvil.
+    """
+
+    def __init__(
+        self,
+        world,
+        cluster_size: int = 16,
+        exact: bool = False,
+        smooth: bool = False,
+    ):
+        if cluster_size < 2:
+            raise ValueError("cluster_size must be at least 2")
+
+        self.world = world
+        self.cluster_size = cluster_size
+        self.exact = exact
+        self.smooth = smooth
+        # World version the abstraction was built from
+        self.version = world.version
+
+        self.columns = -(-world.width // cluster_size)
+        self.rows = -(-world.height // cluster_size)
+
+        # cluster id -> entrance cell indices
+        self.entrances: Dict[int, List[int]] = {}
+        # mode -> cell -> {neighbour cell: cost}
+        self.edges: Dict[str, Dict[int, Dict[int, float]]] = {m: {} for m in MODES}
+
+        self.build_stats: Dict[str, float] = {}
+        self._build()
+
+    # ------------------------------------------------------------
+    # BUILD
+    # ------------------------------------------------------------
+    def _build(self) -> None:
+        started = time.perf_counter()
+
+        crossings = self._border_crossings()
+        pairs = crossings if self.exact else self._pick_entrances(crossings)
+
+        for a, b in pairs:
+            for node in (a, b):
+                cluster = self.cluster_of(node)
+                nodes = self.entrances.setdefault(cluster, [])
+                if node not in nodes:
+                    nodes.append(node)
+            for mode in MODES:
+                self._link(mode, a, b, self._step_cost(a, b, mode))
+                self._link(mode, b, a, self._step_cost(b, a, mode))
+
+        intra_expanded = 0
+        for cluster, nodes in self.entrances.items():
+            for mode in MODES:
+                for node in nodes:
+                    dist, _, expanded = self._local_search(node, cluster, mode, targets=nodes)
+                    intra_expanded += expanded
+                    for other in nodes:
+                        if other != node and other in dist:
+                            self._link(mode, node, other, dist[other])
+
+        self.build_stats = {
+            "build_seconds": time.perf_counter() - started,
+            "clusters": self.columns * self.rows,
+            "abstract_nodes": sum(len(n) for n in self.entrances.values()),
+            "abstract_edges": sum(
+                len(targets) for mode in MODES for targets in self.edges[mode].values()
+            ),
+            "intra_nodes_expanded": intra_expanded,
+            "approx_bytes": self._approx_bytes(),
+        }
+
+    def _border_crossings(self) -> List[Tuple[int, int]]:
+        """Every pair of passable neighbours that sit in different clusters."""
+        world = self.world
+        width, height, size = world.width, world.height, self.cluster_size
+        passable = world.is_passable_index
+        pairs = []
+
+        for y in range(height):
+            on_row_edge = y % size == size - 1
+            for x in range(width):
+                if not (on_row_edge or x % size in (0, size - 1)):
+                    continue
+                a = y * width + x
+                if not passable(a):
+                    continue
+                for dx, dy in _FORWARD_DIRECTIONS:
+                    nx, ny = x + dx, y + dy
+                    if not (0 <= nx < width and 0 <= ny < height):
+                        continue
+                    b = ny * width + nx
+                    if passable(b) and self.cluster_of(a) != self.cluster_of(b):
+                        pairs.append((a, b))
+
+        return pairs
+
+    def _pick_entrances(self, crossings: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """
+        Group crossings between the same two clusters into runs whose cells
+        are contiguous on both sides, then keep the middle crossing of a
+        short run or both ends of a long one (Botea et al., 2004).
+        """
+        by_border: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+        for a, b in crossings:
+            key = (self.cluster_of(a), self.cluster_of(b))
+            by_border.setdefault(key, []).append((a, b))
+
+        chosen = []
+        for pairs in by_border.values():
+            pairs.sort()
+            run = [pairs[0]]
+            for pair in pairs[1:]:
+                last = run[-1]
+                if self._touching(pair[0], last[0]) and self._touching(pair[1], last[1]):
+                    run.append(pair)
+                    continue
+                chosen.extend(self._run_representatives(run))
+                run = [pair]
+            chosen.extend(self._run_representatives(run))
+
+        return chosen
+
+    @staticmethod
+    def _run_representatives(run: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        if len(run) < 6:
+            return [run[len(run) // 2]]
+        return [run[0], run[-1]]
+
+    def _touching(self, a: int, b: int) -> bool:
+        width = self.world.width
+        return abs(a % width - b % width) <= 1 and abs(a // width - b // width) <= 1
+
+    def _link(self, mode: str, a: int, b: int, cost: float) -> None:
+        targets = self.edges[mode].setdefault(a, {})
+        if cost < targets.get(b, float("inf")):
+            targets[b] = cost
+
+    def _approx_bytes(self) -> int:
+        total = sys.getsizeof(self.entrances) + sys.getsizeof(self.edges)
+        for nodes in self.entrances.values():
+            total += sys.getsizeof(nodes)
+        for mode in MODES:
+            total += sys.getsizeof(self.edges[mode])
+            for targets in self.edges[mode].values():
+                total += sys.getsizeof(targets)
+        return total
+
+    # ------------------------------------------------------------
+    # GRID HELPERS
+    # ------------------------------------------------------------
+    def cluster_of(self, index: int) -> int:
+        width, size = self.world.width, self.cluster_size
+        return (index // width // size) * self.columns + (index % width) // size
+
+    def _bounds(self, cluster: int) -> Tuple[int, int, int, int]:
+        """(x0, y0, x1, y1) of a cluster, end-exclusive."""
+        size = self.cluster_size
+        cy, cx = divmod(cluster, self.columns)
+        x0, y0 = cx * size, cy * size
+        return x0, y0, min(x0 + size, self.world.width), min(y0 + size, self.world.height)
+
+    def _step_cost(self, a: int, b: int, mode: str) -> float:
+        if mode == "fewest_steps":
+            return 1.0
+        width = self.world.width
+        cost = self.world.cost_grid[b]
+        if a % width != b % width and a // width != b // width:
+            cost += DIAGONAL_PENALTY
+        return cost
+
+    def _open_neighbours(self, index: int) -> List[int]:
+        world = self.world
+        width = world.width
+        y, x = divmod(index, width)
+        cells = []
+        for dx, dy in DIRECTIONS:
+            nx, ny = x + dx, y + dy
+            if world.in_bounds(nx, ny) and world.is_passable_index(ny * width + nx):
+                cells.append(ny * width + nx)
+        return cells
+
+    def _local_search(
+        self,
+        source: int,
+        cluster: int,
+        mode: str,
+        reverse: bool = False,
+        targets: Iterable[int] = (),
+    ) -> Tuple[Dict[int, float], Dict[int, int], int]:
+        """
+        Dijkstra confined to one cluster. Forward it measures source -> cell;
+        with reverse it measures cell -> source. Stops early once every cell
+        in targets is settled.
+        """
+        world = self.world
+        width = world.width
+        passable = world.passable_bits
+        costs = world.cost_grid
+        fewest_steps = mode == "fewest_steps"
+        x0, y0, x1, y1 = self._bounds(cluster)
+
+        pending = set(targets)
+        dist = {source: 0.0}
+        parent = {source: -1}
+        done = set()
+        heap = [(0.0, source)]
+        expanded = 0
+
+        while heap:
+            d, u = heapq.heappop(heap)
+            if u in done:
+                continue
+            done.add(u)
+            expanded += 1
+            if pending:
+                pending.discard(u)
+                if not pending:
+                    break
+            if reverse and not passable[u >> 3] >> (u & 7) & 1:
+                continue
+
+            uy, ux = divmod(u, width)
+            for dx, dy in DIRECTIONS:
+                nx, ny = ux + dx, uy + dy
+                if not (x0 <= nx < x1 and y0 <= ny < y1):
+                    continue
+                v = ny * width + nx
+                if v in done or not passable[v >> 3] >> (v & 7) & 1:
+                    continue
+                if fewest_steps:
+                    step = 1.0
+                else:
+                    step = costs[u] if reverse else costs[v]
+                    if dx and dy:
+                        step += DIAGONAL_PENALTY
+                if d + step < dist.get(v, INF):
+                    dist[v] = d + step
+                    parent[v] = u
+                    heapq.heappush(heap, (d + step, v))
+
+        return dist, parent, expanded
+
+    # ------------------------------------------------------------
+    # QUERY
+    # ------------------------------------------------------------
+    def chart(
+        self,
+        start: int,
+        goal: int,
+        mode: str,
+    ) -> Tuple[Optional[List[int]], Dict[str, int]]:
+        """
+        Abstract search plus refinement. Returns the cell index path (or
+        None) and the query counters.
+        """
+        width = self.world.width
+        start_cluster = self.cluster_of(start)
+        goal_cluster = self.cluster_of(goal)
+
+        # A start on impassable terrain is never an entrance, so launch
+        # from each cell it can step onto instead.
+        if self.world.is_passable_index(start):
+            launches = [(start, 0.0)]
+        else:
+            launches = [(cell, self._step_cost(start, cell, mode)) for cell in self._open_neighbours(start)]
+
+        start_edges: Dict[int, float] = {}
+        start_via: Dict[int, int] = {}
+        start_expanded = 0
+        for launch, offset in launches:
+            cluster = self.cluster_of(launch)
+            reached, _, expanded = self._local_search(launch, cluster, mode)
+            start_expanded += expanded
+            targets = list(self.entrances.get(cluster, []))
+            targets.append(goal)
+            for node in targets:
+                if node in reached and offset + reached[node] < start_edges.get(node, float("inf")):
+                    start_edges[node] = offset + reached[node]
+                    start_via[node] = launch
+
+        to_goal, _, goal_expanded = self._local_search(goal, goal_cluster, mode, reverse=True)
+        goal_edges = {n: to_goal[n] for n in self.entrances.get(goal_cluster, []) if n in to_goal}
+
+        if mode == "fewest_steps":
+            h_straight = h_diagonal = 1.0
+        else:
+            h_straight = self.world.profile.minimum_cost
+            h_diagonal = self.world.profile.diagonal_minimum_cost
+        gy, gx = divmod(goal, width)
+
+        def heuristic(cell: int) -> float:
+            cy, cx = divmod(cell, width)
+            dx, dy = abs(cx - gx), abs(cy - gy)
+            return h_straight * abs(dx - dy) + h_diagonal * min(dx, dy)
+
+        edges = self.edges[mode]
+        g_score = {start: 0.0}
+        came_from = {start: -1}
+        closed = set()
+        heap = [(heuristic(start), start)]
+        abstract_expanded = 0
+
+        while heap:
+            _, node = heapq.heappop(heap)
+            if node in closed:
+                continue
+            closed.add(node)
+            abstract_expanded += 1
+            if node == goal:
+                break
+
+            links = list(edges.get(node, {}).items())
+            if node == start:
+                links.extend(start_edges.items())
+            if node in goal_edges:
+                links.append((goal, goal_edges[node]))
+
+            for other, cost in links:
+                tentative = g_score[node] + cost
+                if tentative < g_score.get(other, float("inf")):
+                    g_score[other] = tentative
+                    came_from[other] = node
+                    heapq.heappush(heap, (tentative + heuristic(other), other))
+
+        counters = {
+            "abstract_nodes_expanded": abstract_expanded,
+            "insert_nodes_expanded": start_expanded + goal_expanded,
+            "refine_nodes_expanded": 0,
+        }
+
+        if goal not in closed:
+            counters["nodes_expanded"] = abstract_expanded + start_expanded + goal_expanded
+            return None, counters
+
+        waypoints = []
+        node = goal
+        while node != -1:
+            waypoints.append(node)
+            node = came_from[node]
+        waypoints.reverse()
+
+        path = [start]
+        launch = start_via.get(waypoints[1], start)
+        if launch != start:
+            path.append(launch)
+            waypoints[0] = launch
+
+        for a, b in zip(waypoints, waypoints[1:]):
+            if a == b:
+                continue
+            if self.cluster_of(a) != self.cluster_of(b):
+                path.append(b)
+                continue
+            _, parent, expanded = self._local_search(a, self.cluster_of(a), mode, targets=(b,))
+            counters["refine_nodes_expanded"] += expanded
+            segment = []
+            cell = b
+            while cell != a:
+                segment.append(cell)
+                cell = parent[cell]
+            path.extend(reversed(segment))
+
+        if self.smooth:
+            path = self._smooth(path, mode)
+
+        counters["nodes_expanded"] = (
+            abstract_expanded + start_expanded + goal_expanded
+            + counters["refine_nodes_expanded"]
+        )
+        return path, counters
+
+    # ------------------------------------------------------------
+    # SMOOTHING
+    # ------------------------------------------------------------
+    def _direct_route(self, a: int, b: int) -> Optional[List[int]]:
+        """Diagonal-then-straight route from a to b, or None if blocked."""
+        width = self.world.width
+        passable = self.world.is_passable_index
+        ay, ax = divmod(a, width)
+        by, bx = divmod(b, width)
+        route = []
+
+        while (ax, ay) != (bx, by):
+            ax += (bx > ax) - (bx < ax)
+            ay += (by > ay) - (by < ay)
+            cell = ay * width + ax
+            if not passable(cell):
+                return None
+            route.append(cell)
+
+        return route
+
+    def _route_cost(self, a: int, cells: List[int], mode: str) -> float:
+        cost = 0.0
+        for cell in cells:
+            cost += self._step_cost(a, cell, mode)
+            a = cell
+        return cost
+
+    def _smooth(self, path: List[int], mode: str) -> List[int]:
+        """
+        Replace a stretch of path with the direct route between its ends
+        when that route is open and strictly cheaper. Stretches are capped
+        at two cluster widths to keep the pass linear in path length.
+        """
+        window = 2 * self.cluster_size
+        smoothed = [path[0]]
+        i = 0
+
+        while i < len(path) - 1:
+            step_to, route = i + 1, [path[i + 1]]
+
+            for j in range(min(len(path) - 1, i + window), i + 1, -1):
+                direct = self._direct_route(path[i], path[j])
+                if direct is None:
+                    continue
+                current = self._route_cost(path[i], path[i + 1:j + 1], mode)
+                if self._route_cost(path[i], direct, mode) < current - 1e-9:
+                    step_to, route = j, direct
+                    break
+
+            smoothed.extend(route)
+            i = step_to
+
+        return smoothed
@@ -0,0 +1,295 @@
+"""
+incremental_planner.py
+----------------------
+D* Lite (Koenig & Likhachev, 2002) over flat cell indices.
+
+The planner searches backwards from the goal, so g[cell] is the cheapest
+cost from that cell to the goal, using the same move costs as
+Saladin_Pathfinder (entering a cell costs its terrain, plus the diagonal
+penalty; or 1 per step in fewest_steps). It subscribes to the world's
+Terrain_Change events. After an edit, plan() repairs only the part of
+the search tree whose costs actually changed, instead of searching again
+from scratch. The start may also move along the plan (move_to), as an
+agent walking through changing terrain would.
+
+last_run_stats reports, for every plan() call, how many cells were
+re-touched (their g or rhs recomputed) and how many were expanded.
+"""
+
+from array import array
+from typing import Dict, List, Optional, Tuple
+import heapq
+
+from aris.index_kernel import DIRECTIONS, INF, direction_moves
+from runes.runes import PathGlyph
+from world.grid_forge import Map_Anvil, Terrain_Change
+from world.terrain_legends import DIAGONAL_PENALTY
+
+
+class Incremental_Planner:
+    """
+    Keeps one hearth -> pythonia plan valid while the terrain changes.
+
+    Call close() when done so the planner stops listening to the world.
+    """
+
+    def __init__(
+        self,
+        world: Map_Anvil,
+        hearth: PathGlyph,
+        pythonia: PathGlyph,
+        mode: str = "lowest_energy",
+    ):
+        self.world = world
+        self.mode = mode
+        self.hearth = hearth
+        self.pythonia = pythonia
+
+        width, height = world.width, world.height
+        size = width * height
+        self._start = world.index_of(hearth.x, hearth.y)
+        self._goal = world.index_of(pythonia.x, pythonia.y)
+
+        if mode == "fewest_steps":
+            self._h_straight, self._h_diagonal = 1.0, 1.0
+        else:
+            self._h_straight = world.profile.minimum_cost
+            self._h_diagonal = world.profile.diagonal_minimum_cost
+
+        self._steps = [
+            (dx, dy, dy * width + dx, DIAGONAL_PENALTY if dx and dy else 0.0)
+            for dx, dy in DIRECTIONS
+        ]
+        self._moves = direction_moves(width)
+
+        self.g = array("d", [INF]) * size
+        self.rhs = array("d", [INF]) * size
+        self.rhs[self._goal] = 0.0
+
+        # Key modifier: grows by h(old start, new start) whenever the start moves
+        self._km = 0.0
+        self._last_start = self._start
+
+        # Current key of every queued cell; heap entries that disagree are stale
+        self._queued: Dict[int, Tuple[float, float]] = {self._goal: self._key(self._goal)}
+        self._open: List[Tuple[float, float, int]] = [self._queued[self._goal] + (self._goal,)]
+
+        # Cells edited since the last plan()
+        self._pending: Dict[int, None] = {}
+        self._planned = False
+
+        # Per-plan bookkeeping for the re-touched count
+        self._touched = array("I", [0]) * size
+        self._generation = 0
+        self._counters: Dict[str, int] = {}
+
+        # Metrics of the last plan() call
+        self.last_run_stats: Dict[str, object] = {}
+
+        world.subscribe(self._on_change)
+
+    # ------------------------------------------------------------
+    # PUBLIC METHODS
+    # ------------------------------------------------------------
+    def plan(self) -> Optional[List[PathGlyph]]:
+        """
+        Current best path from hearth to pythonia (None if unreachable).
+        The first call is a full search; later calls only repair.
+        """
+        self._generation += 1
+        self._counters = {
+            "nodes_expanded": 0,
+            "nodes_retouched": 0,
+            "pushes": 0,
+            "pops": 0,
+            "stale_pops": 0,
+        }
+        cells_changed = len(self._pending)
+
+        if self._start != self._last_start:
+            self._km += self._heuristic(self._last_start, self._start)
+            self._last_start = self._start
+
+        for cell in self._pending:
+            self._repair_around(cell)
+        self._pending.clear()
+
+        self._compute_shortest_path()
+
+        stats: Dict[str, object] = dict(self._counters)
+        stats.update({
+            "cells_changed": cells_changed,
+            "incremental": self._planned,
+            "world_version": self.world.version,
+            "path_length": 0,
+            "total_energy": 0.0,
+            "success": False,
+        })
+        self._planned = True
+
+        indices = self._extract()
+        self.last_run_stats = stats
+        if indices is None:
+            return None
+
+        stats["path_length"] = len(indices) - 1
+        stats["total_energy"] = self._energy(indices)
+        stats["success"] = True
+        return [self.world.glyph_at_index(i) for i in indices]
+
+    def move_to(self, hearth: PathGlyph) -> None:
+        """Move the start (e.g. one step along the plan) before re-planning."""
+        self.hearth = hearth
+        self._start = self.world.index_of(hearth.x, hearth.y)
+
+    def cost_to_goal(self, glyph: PathGlyph) -> float:
+        """Settled cost from glyph to the goal as of the last plan()."""
+        return self.g[self.world.index_of(glyph.x, glyph.y)]
+
+    def close(self) -> None:
+        self.world.unsubscribe(self._on_change)
+
+    # ------------------------------------------------------------
+    # INTERNAL: D* LITE
+    # ------------------------------------------------------------
+    def _on_change(self, change: Terrain_Change) -> None:
+        for index in change.indices:
+            self._pending[index] = None
+
+    def _repair_around(self, cell: int) -> None:
+        """
+        Entering cell got cheaper, dearer, blocked or opened, so every
+        neighbour that can step into it needs its rhs recomputed.
+        """
+        width, height = self.world.width, self.world.height
+        cy, cx = divmod(cell, width)
+        for dx, dy, offset, _ in self._steps:
+            nx, ny = cx + dx, cy + dy
+            if 0 <= nx < width and 0 <= ny < height:
+                self._update_vertex(cell + offset)
+
+    def _compute_shortest_path(self) -> None:
+        g, rhs = self.g, self.rhs
+        open_list, queued = self._open, self._queued
+        counters = self._counters
+        start = self._start
+        passable = self.world.passable_bits
+        width, height = self.world.width, self.world.height
+        push, pop = heapq.heappush, heapq.heappop
+
+        while open_list:
+            k1, k2, cell = open_list[0]
+            if queued.get(cell) != (k1, k2):
+                pop(open_list)
+                counters["pops"] += 1
+                counters["stale_pops"] += 1
+                continue
+
+            if (k1, k2) >= self._key(start) and rhs[start] == g[start]:
+                break
+
+            pop(open_list)
+            counters["pops"] += 1
+            fresh = self._key(cell)
+            if (k1, k2) < fresh:
+                queued[cell] = fresh
+                push(open_list, fresh + (cell,))
+                counters["pushes"] += 1
+                continue
+
+            del queued[cell]
+            counters["nodes_expanded"] += 1
+            self._touch(cell)
+
+            if g[cell] > rhs[cell]:
+                g[cell] = rhs[cell]
+            else:
+                g[cell] = INF
+                self._update_vertex(cell)
+
+            # Only a passable cell can be stepped into from its neighbours
+            if not passable[cell >> 3] >> (cell & 7) & 1:
+                continue
+
+            cy, cx = divmod(cell, width)
+            for dx, dy, offset, _ in self._steps:
+                nx, ny = cx + dx, cy + dy
+                if 0 <= nx < width and 0 <= ny < height:
+                    self._update_vertex(cell + offset)
+
+    def _update_vertex(self, cell: int) -> None:
+        """Recompute rhs[cell] from its successors and requeue if inconsistent."""
+        self._touch(cell)
+
+        if cell != self._goal:
+            self.rhs[cell] = self._best_successor(cell)[0]
+
+        if self.g[cell] != self.rhs[cell]:
+            key = self._key(cell)
+            if self._queued.get(cell) != key:
+                self._queued[cell] = key
+                heapq.heappush(self._open, key + (cell,))
+                self._counters["pushes"] += 1
+        else:
+            self._queued.pop(cell, None)
+
+    def _best_successor(self, cell: int) -> Tuple[float, int]:
+        """(cheapest step cost + g, successor) over the cells cell can enter."""
+        world = self.world
+        costs, g = world.cost_grid, self.g
+        fewest_steps = self.mode == "fewest_steps"
+
+        best, best_cell = INF, -1
+        for offset, _, _, penalty in self._moves[world.direction_masks[cell]]:
+            nb = cell + offset
+            step = 1.0 if fewest_steps else costs[nb] + penalty
+            if step + g[nb] < best:
+                best, best_cell = step + g[nb], nb
+        return best, best_cell
+
+    def _key(self, cell: int) -> Tuple[float, float]:
+        best = min(self.g[cell], self.rhs[cell])
+        return (best + self._heuristic(self._start, cell) + self._km, best)
+
+    def _heuristic(self, a: int, b: int) -> float:
+        width = self.world.width
+        ay, ax = divmod(a, width)
+        by, bx = divmod(b, width)
+        dx, dy = abs(ax - bx), abs(ay - by)
+        diagonal = min(dx, dy)
+        return (max(dx, dy) - diagonal) * self._h_straight + diagonal * self._h_diagonal
+
+    def _touch(self, cell: int) -> None:
+        if self._touched[cell] != self._generation:
+            self._touched[cell] = self._generation
+            self._counters["nodes_retouched"] += 1
+
+    # ------------------------------------------------------------
+    # INTERNAL: PATH READOUT
+    # ------------------------------------------------------------
+    def _extract(self) -> Optional[List[int]]:
+        """Walk greedily downhill in g from the start to the goal."""
+        cell, goal = self._start, self._goal
+        if cell == goal:
+            return [cell]
+        if self.g[cell] == INF:
+            return None
+
+        path = [cell]
+        for _ in range(len(self.g)):
+            _, cell = self._best_successor(cell)
+            if cell == -1:
+                return None
+            path.append(cell)
+            if cell == goal:
+                return path
+        return None
+
+    def _energy(self, indices: List[int]) -> float:
+        costs, width = self.world.cost_grid, self.world.width
+        total = 0.0
+        for a, b in zip(indices, indices[1:]):
+            total += costs[b]
+            if a % width != b % width and a // width != b // width:
+                total += DIAGONAL_PENALTY
+        return total
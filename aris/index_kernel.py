@@ -0,0 +1,677 @@
+"""
+index_kernel.py
+---------------
+Integer-indexed A* kernel used by Saladin_Pathfinder.
+
+Cells are addressed by their flat row-major index (y * width + x).
+Scores and parents live in preallocated arrays that are reused between
+searches, and heap entries are plain tuples of numbers, so no PathGlyph
+is created until the final path is rebuilt.
+
+Expansion reads the cell's precomputed direction mask (see Map_Anvil)
+and walks the matching entry of direction_moves(), so it does no bounds
+or passability checks of its own.
+
+indexed_a_star takes an optional Search_Probe. Without one it only keeps
+the open-set high-water mark; a probe that times phases switches to a
+slower variant that clocks heuristic and neighbour work separately.
+"""
+
+from array import array
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import heapq
+import sys
+import time
+
+from aris.search_stats import Search_Probe
+
+from world.grid_forge import DIRECTIONS
+from world.terrain_legends import DIAGONAL_PENALTY
+
+INF = float("inf")
+
+# One move: (index offset, dx, dy, diagonal penalty)
+Move = Tuple[int, int, int, float]
+
+
+@lru_cache(maxsize=16)
+def direction_moves(width: int) -> Tuple[Tuple[Move, ...], ...]:
+    """
+    For every 8-bit direction mask, the moves it allows on a map of this
+    width, with each step's index offset and diagonal penalty.
+    """
+    steps = [
+        (dy * width + dx, dx, dy, DIAGONAL_PENALTY if dx and dy else 0.0)
+        for dx, dy in DIRECTIONS
+    ]
+    return tuple(
+        tuple(step for d, step in enumerate(steps) if mask >> d & 1)
+        for mask in range(256)
+    )
+
+
+def bounds_mask(x: int, y: int, width: int, height: int) -> int:
+    """Direction mask of the steps from (x, y) that stay on the map."""
+    mask = 0
+    for d, (dx, dy) in enumerate(DIRECTIONS):
+        if 0 <= x + dx < width and 0 <= y + dy < height:
+            mask |= 1 << d
+    return mask
+
+
+class Search_Workspace:
+    """
+    Scratch buffers sized to one map, reused by every search on it.
+
+    A cell's g-score and parent are only valid when its stamp equals the
+    current generation, and it is closed when its closed stamp does, so
+    starting a new search is O(1) instead of clearing the arrays.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.g_score = array("d", [INF]) * size
+        self.parent = array("i", [-1]) * size
+        self.stamp = array("I", [0]) * size
+        self.closed = array("I", [0]) * size
+        self.generation = 0
+
+    def begin(self) -> int:
+        """Start a new search and return its generation number."""
+        self.generation += 1
+        if self.generation == 0xFFFFFFFF:
+            self.stamp = array("I", [0]) * self.size
+            self.closed = array("I", [0]) * self.size
+            self.generation = 1
+        return self.generation
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the score, parent and stamp storage."""
+        return sum(
+            len(scores) * scores.itemsize
+            for scores in (self.g_score, self.parent, self.stamp, self.closed)
+        )
+
+    def trace(self, index: int) -> List[int]:
+        """Follow parents back from index; returns the start-first path."""
+        parent = self.parent
+        path = []
+        while index != -1:
+            path.append(index)
+            index = parent[index]
+        path.reverse()
+        return path
+
+
+class _Defaulted(dict):
+    """dict that reads missing keys as a fixed default (without storing it)."""
+
+    __slots__ = ("default",)
+
+    def __init__(self, default):
+        super().__init__()
+        self.default = default
+
+    def __missing__(self, key):
+        return self.default
+
+
+class Sparse_Workspace(Search_Workspace):
+    """
+    Search_Workspace backed by dicts, holding only the cells a search
+    touches. Used for worlds too large for per-cell arrays (Tiled_Anvil);
+    each search starts by clearing the previous one's entries.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.g_score = _Defaulted(INF)
+        self.parent = _Defaulted(-1)
+        self.stamp = _Defaulted(0)
+        self.closed = _Defaulted(0)
+        self.generation = 0
+
+    def begin(self) -> int:
+        for scores in (self.g_score, self.parent, self.stamp, self.closed):
+            scores.clear()
+        self.generation += 1
+        return self.generation
+
+    def memory_bytes(self) -> int:
+        # Dict tables only; the float and int entries are mostly shared
+        return sum(
+            sys.getsizeof(scores)
+            for scores in (self.g_score, self.parent, self.stamp, self.closed)
+        )
+
+
+def new_workspace(world) -> Search_Workspace:
+    """Dense workspace for in-memory worlds, sparse one for paged worlds."""
+    size = world.width * world.height
+    return Sparse_Workspace(size) if world.lazy else Search_Workspace(size)
+
+
+def indexed_a_star(
+    world,
+    workspace: Search_Workspace,
+    start: int,
+    goal: int,
+    mode: str,
+    h_straight: float,
+    h_diagonal: float,
+    weight: float = 1.0,
+    closed_set: bool = True,
+    probe: Optional[Search_Probe] = None,
+    heuristic: Optional[Callable[[int], float]] = None,
+) -> Tuple[Optional[List[int]], Dict[str, int]]:
+    """
+    A* over flat cell indices.
+
+    The heuristic is octile: h_straight per straight step and h_diagonal
+    per diagonal step of the obstacle-free route to the goal, unless a
+    heuristic(cell index) such as Landmark_Atlas.heuristic is given.
+    Priorities are g + weight * h, so weight > 1 gives weighted A*. With
+    closed_set, a popped cell that was already expanded is a stale heap
+    entry and is skipped (lazy decrease-key); without it every pop is
+    expanded, as the reference engine originally did.
+
+    Returns the path as a list of indices (or None) together with the
+    search counters, including max_open_size.
+    """
+    if probe is not None and probe.time_phases:
+        return _timed_a_star(
+            world, workspace, start, goal, mode, h_straight, h_diagonal, weight, closed_set, probe,
+            heuristic,
+        )
+
+    # Expansions left until the probe's next sample (0 = no hook)
+    sample_every = probe.sample_every if probe is not None and probe.hook is not None else 0
+    countdown = sample_every
+
+    width = world.width
+    masks = world.direction_masks
+    costs = world.cost_grid
+    fewest_steps = mode == "fewest_steps"
+    moves = direction_moves(width)
+
+    g_score = workspace.g_score
+    parent = workspace.parent
+    stamp = workspace.stamp
+    closed = workspace.closed
+    generation = workspace.begin()
+
+    gx, gy = goal % width, goal // width
+    sx, sy = start % width, start // width
+
+    stamp[start] = generation
+    g_score[start] = 0.0
+    parent[start] = -1
+
+    # octile: h = h_straight * long_side + extra * short_side
+    extra = h_diagonal - h_straight
+
+    hx, hy = abs(sx - gx), abs(sy - gy)
+    if heuristic is None:
+        h_start = h_straight * max(hx, hy) + extra * min(hx, hy)
+    else:
+        h_start = heuristic(start)
+    open_set = [(weight * h_start, h_start, start)]
+    push, pop = heapq.heappush, heapq.heappop
+
+    pushes, pops, stale_pops, reexpansions = 1, 0, 0, 0
+    max_open = 1
+    found = False
+
+    while open_set:
+        if pushes - pops > max_open:
+            max_open = pushes - pops
+        _, _, current = pop(open_set)
+        pops += 1
+
+        if closed[current] == generation:
+            if closed_set:
+                stale_pops += 1
+                continue
+            reexpansions += 1
+        closed[current] = generation
+
+        if sample_every:
+            countdown -= 1
+            if not countdown:
+                countdown = sample_every
+                probe.sample(current, g_score[current], pushes - pops)
+
+        if current == goal:
+            found = True
+            break
+
+        cy, cx = divmod(current, width)
+        base = g_score[current]
+
+        for offset, dx, dy, penalty in moves[masks[current]]:
+            nb = current + offset
+            if closed_set and closed[nb] == generation:
+                continue
+
+            if fewest_steps:
+                tentative = base + 1.0
+            else:
+                tentative = base + costs[nb] + penalty
+
+            if stamp[nb] != generation or tentative < g_score[nb]:
+                stamp[nb] = generation
+                g_score[nb] = tentative
+                parent[nb] = current
+
+                if heuristic is not None:
+                    h = heuristic(nb)
+                else:
+                    nx = cx + dx
+                    ny = cy + dy
+                    hx = nx - gx if nx > gx else gx - nx
+                    hy = ny - gy if ny > gy else gy - ny
+                    if hx > hy:
+                        h = h_straight * hx + extra * hy
+                    else:
+                        h = h_straight * hy + extra * hx
+                push(open_set, (tentative + weight * h, h, nb))
+                pushes += 1
+
+    counters = {
+        "nodes_expanded": pops - stale_pops,
+        "pushes": pushes,
+        "pops": pops,
+        "stale_pops": stale_pops,
+        "reexpansions": reexpansions,
+        "max_open_size": max_open,
+    }
+
+    if not found:
+        return None, counters
+    return workspace.trace(goal), counters
+
+
+def _timed_a_star(
+    world,
+    workspace: Search_Workspace,
+    start: int,
+    goal: int,
+    mode: str,
+    h_straight: float,
+    h_diagonal: float,
+    weight: float,
+    closed_set: bool,
+    probe: Search_Probe,
+    estimate: Optional[Callable[[int], float]] = None,
+) -> Tuple[Optional[List[int]], Dict[str, int]]:
+    """
+    indexed_a_star with heuristic evaluation and neighbour generation
+    clocked apart into the probe. Each expansion first collects its
+    improved neighbours, then prices them, so the clock is read four
+    times per expansion rather than per neighbour. Same paths and
+    counters as the fast kernel; only meant for profiling.
+    """
+    clock = time.perf_counter
+    width = world.width
+    masks = world.direction_masks
+    costs = world.cost_grid
+    fewest_steps = mode == "fewest_steps"
+    moves = direction_moves(width)
+    extra = h_diagonal - h_straight
+    gy, gx = divmod(goal, width)
+
+    def heuristic(index: int) -> float:
+        y, x = divmod(index, width)
+        hx = x - gx if x > gx else gx - x
+        hy = y - gy if y > gy else gy - y
+        if hx > hy:
+            return h_straight * hx + extra * hy
+        return h_straight * hy + extra * hx
+
+    if estimate is not None:
+        heuristic = estimate
+
+    g_score = workspace.g_score
+    parent = workspace.parent
+    stamp = workspace.stamp
+    closed = workspace.closed
+    generation = workspace.begin()
+
+    stamp[start] = generation
+    g_score[start] = 0.0
+    parent[start] = -1
+
+    h_start = heuristic(start)
+    open_set = [(weight * h_start, h_start, start)]
+    push, pop = heapq.heappush, heapq.heappop
+
+    pushes, pops, stale_pops, reexpansions = 1, 0, 0, 0
+    max_open = 1
+    heuristic_time = neighbour_time = 0.0
+    countdown = probe.sample_every
+    found = False
+
+    while open_set:
+        max_open = max(max_open, len(open_set))
+        _, _, current = pop(open_set)
+        pops += 1
+
+        if closed[current] == generation:
+            if closed_set:
+                stale_pops += 1
+                continue
+            reexpansions += 1
+        closed[current] = generation
+
+        if probe.hook is not None:
+            countdown -= 1
+            if not countdown:
+                countdown = probe.sample_every
+                probe.sample(current, g_score[current], len(open_set))
+
+        if current == goal:
+            found = True
+            break
+
+        started = clock()
+        base = g_score[current]
+        improved = []
+        for offset, dx, dy, penalty in moves[masks[current]]:
+            nb = current + offset
+            if closed_set and closed[nb] == generation:
+                continue
+            tentative = base + 1.0 if fewest_steps else base + costs[nb] + penalty
+            if stamp[nb] != generation or tentative < g_score[nb]:
+                stamp[nb] = generation
+                g_score[nb] = tentative
+                parent[nb] = current
+                improved.append((tentative, nb))
+        checked = clock()
+        priced = [(tentative, heuristic(nb), nb) for tentative, nb in improved]
+        heuristic_time += clock() - checked
+        neighbour_time += checked - started
+
+        for tentative, h, nb in priced:
+            push(open_set, (tentative + weight * h, h, nb))
+        pushes += len(priced)
+
+    probe.heuristic_time += heuristic_time
+    probe.neighbour_time += neighbour_time
+    counters = {
+        "nodes_expanded": pops - stale_pops,
+        "pushes": pushes,
+        "pops": pops,
+        "stale_pops": stale_pops,
+        "reexpansions": reexpansions,
+        "max_open_size": max_open,
+    }
+
+    if not found:
+        return None, counters
+    return workspace.trace(goal), counters
+
+
+def dijkstra_tree(
+    world,
+    workspace: Search_Workspace,
+    source: int,
+    mode: str,
+    reverse: bool = False,
+    targets: Optional[Iterable[int]] = None,
+    probe: Optional[Search_Probe] = None,
+) -> Dict[str, int]:
+    """
+    Dijkstra from source that leaves its shortest-path tree in workspace.
+
+    Forward, g_score is the cost source -> cell and parent points back
+    towards source. With reverse, g_score is the cost cell -> source and
+    parent is the next step towards source, so a path is read by
+    following parents from any settled cell. Cells on impassable terrain
+    get labelled in reverse (they may be starts) but are never entered.
+
+    Stops once every cell in targets is settled; without targets the
+    whole reachable region is settled. A probe's hook is called every
+    sample_every settled cells (phases are not timed).
+    """
+    sample_every = probe.sample_every if probe is not None and probe.hook is not None else 0
+    countdown = sample_every
+
+    width, height = world.width, world.height
+    passable = world.passable_bits
+    masks = world.direction_masks
+    costs = world.cost_grid
+    fewest_steps = mode == "fewest_steps"
+    moves = direction_moves(width)
+
+    g_score = workspace.g_score
+    parent = workspace.parent
+    stamp = workspace.stamp
+    closed = workspace.closed
+    generation = workspace.begin()
+
+    stamp[source] = generation
+    g_score[source] = 0.0
+    parent[source] = -1
+
+    pending = set(targets) if targets is not None else None
+    open_set = [(0.0, source)]
+    push, pop = heapq.heappush, heapq.heappop
+    pushes, pops, stale_pops = 1, 0, 0
+
+    while open_set:
+        base, current = pop(open_set)
+        pops += 1
+
+        if closed[current] == generation:
+            stale_pops += 1
+            continue
+        closed[current] = generation
+
+        if sample_every:
+            countdown -= 1
+            if not countdown:
+                countdown = sample_every
+                probe.sample(current, base, len(open_set))
+
+        if pending is not None:
+            pending.discard(current)
+            if not pending:
+                break
+
+        if reverse:
+            # Any neighbour, even a wall start, may step into an open cell
+            if not passable[current >> 3] >> (current & 7) & 1:
+                continue
+            cy, cx = divmod(current, width)
+            if 0 < cx < width - 1 and 0 < cy < height - 1:
+                allowed = moves[0xFF]
+            else:
+                allowed = moves[bounds_mask(cx, cy, width, height)]
+        else:
+            allowed = moves[masks[current]]
+
+        for offset, dx, dy, penalty in allowed:
+            nb = current + offset
+            if closed[nb] == generation:
+                continue
+
+            if fewest_steps:
+                tentative = base + 1.0
+            else:
+                tentative = base + costs[current if reverse else nb] + penalty
+
+            if stamp[nb] != generation or tentative < g_score[nb]:
+                stamp[nb] = generation
+                g_score[nb] = tentative
+                parent[nb] = current
+                push(open_set, (tentative, nb))
+                pushes += 1
+
+    return {
+        "nodes_expanded": pops - stale_pops,
+        "pushes": pushes,
+        "pops": pops,
+        "stale_pops": stale_pops,
+        "reexpansions": 0,
+    }
+
+
+def distance_map(
+    world,
+    source: int,
+    mode: str = "lowest_energy",
+    reverse: bool = False,
+    workspace: Optional[Search_Workspace] = None,
+) -> array:
+    """
+    float32 cost of reaching every cell from source (or of reaching
+    source from every cell, with reverse), priced like chart_course:
+    the terrain cost of the cell entered plus the diagonal penalty, or
+    one per step for fewest_steps. Cells with no path hold INF. One
+    Dijkstra over the whole map (see dijkstra_tree).
+    """
+    if workspace is None:
+        workspace = new_workspace(world)
+    dijkstra_tree(world, workspace, source, mode, reverse=reverse)
+
+    if isinstance(workspace, Sparse_Workspace):
+        costs = array("f", [INF]) * (world.width * world.height)
+        for index, score in workspace.g_score.items():
+            costs[index] = score
+        return costs
+
+    generation = workspace.generation
+    return array("f", [
+        score if stamp == generation else INF
+        for score, stamp in zip(workspace.g_score, workspace.stamp)
+    ])
+
+
+def nearest_target_a_star(
+    world,
+    workspace: Search_Workspace,
+    start: int,
+    targets: Iterable[int],
+    mode: str,
+    h_straight: float,
+    h_diagonal: float,
+) -> Tuple[Optional[List[int]], Optional[int], Dict[str, int]]:
+    """
+    Cheapest path from start to whichever of targets is nearest, found
+    by one backward A* seeded with every target at g = 0 and guided by
+    the octile distance to start. g_score is the cost cell -> nearest
+    target and parent the next step towards it, so the search can stop
+    as soon as start is settled. A start on impassable terrain is
+    reached from its passable neighbours; targets on it are skipped.
+
+    Returns the start-to-target index path (or None), the target it
+    ends at, and the search counters.
+    """
+    width = world.width
+    passable = world.passable_bits
+    masks = world.direction_masks
+    costs = world.cost_grid
+    fewest_steps = mode == "fewest_steps"
+    moves = direction_moves(width)
+    extra = h_diagonal - h_straight
+    sy, sx = divmod(start, width)
+
+    g_score = workspace.g_score
+    parent = workspace.parent
+    stamp = workspace.stamp
+    closed = workspace.closed
+    generation = workspace.begin()
+
+    open_set = []
+    for target in targets:
+        if stamp[target] == generation or not passable[target >> 3] >> (target & 7) & 1:
+            continue
+        stamp[target] = generation
+        g_score[target] = 0.0
+        parent[target] = -1
+        ty, tx = divmod(target, width)
+        hx, hy = abs(tx - sx), abs(ty - sy)
+        h = h_straight * max(hx, hy) + extra * min(hx, hy)
+        open_set.append((h, h, target))
+    heapq.heapify(open_set)
+
+    # The moves a wall start is entered by, keyed by the cell they leave
+    wall_start = not passable[start >> 3] >> (start & 7) & 1
+    into_start: Dict[int, Move] = {}
+    if wall_start:
+        for d, (offset, dx, dy, penalty) in enumerate(moves[0xFF]):
+            if masks[start] >> d & 1:
+                into_start[start + offset] = (-offset, -dx, -dy, penalty)
+
+    push, pop = heapq.heappush, heapq.heappop
+    pushes, pops, stale_pops = len(open_set), 0, 0
+    max_open = len(open_set)
+    found = False
+
+    while open_set:
+        if pushes - pops > max_open:
+            max_open = pushes - pops
+        _, _, current = pop(open_set)
+        pops += 1
+
+        if closed[current] == generation:
+            stale_pops += 1
+            continue
+        closed[current] = generation
+
+        if current == start:
+            found = True
+            break
+
+        cy, cx = divmod(current, width)
+        base = g_score[current]
+        allowed = moves[masks[current]]
+        if current in into_start:
+            allowed = allowed + (into_start[current],)
+
+        for offset, dx, dy, penalty in allowed:
+            nb = current + offset
+            if closed[nb] == generation:
+                continue
+
+            # Stepping nb -> current pays for entering current
+            if fewest_steps:
+                tentative = base + 1.0
+            else:
+                tentative = base + costs[current] + penalty
+
+            if stamp[nb] != generation or tentative < g_score[nb]:
+                stamp[nb] = generation
+                g_score[nb] = tentative
+                parent[nb] = current
+
+                nx = cx + dx
+                ny = cy + dy
+                hx = nx - sx if nx > sx else sx - nx
+                hy = ny - sy if ny > sy else sy - ny
+                if hx > hy:
+                    h = h_straight * hx + extra * hy
+                else:
+                    h = h_straight * hy + extra * hx
+                push(open_set, (tentative + h, h, nb))
+                pushes += 1
+
+    counters = {
+        "nodes_expanded": pops - stale_pops,
+        "pushes": pushes,
+        "pops": pops,
+        "stale_pops": stale_pops,
+        "reexpansions": 0,
+        "max_open_size": max_open,
+    }
+
+    if not found:
+        return None, None, counters
+
+    path = []
+    index = start
+    while index != -1:
+        path.append(index)
+        index = parent[index]
+    return path, path[-1], counters
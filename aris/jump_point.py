@@ -0,0 +1,205 @@
+"""
+jump_point.py
+-------------
+Jump Point Search for fewest_steps mode.
+
+Every move costs 1 in fewest_steps mode, so many equally short paths
+differ only in the order of their moves. JPS keeps one canonical order
+by pruning symmetric neighbours and "jumping" along straight and
+diagonal lines until something interesting (the goal or a forced
+neighbour next to a wall) appears. Only those jump points enter the
+open list.
+
+Diagonal moves may pass between walls, exactly as Map_Anvil.neighbours
+allows, so the forced-neighbour rules are the classic ones from Harabor
+and Grastien (2011).
+"""
+
+from typing import Dict, List, Optional, Tuple
+import heapq
+
+from aris.index_kernel import DIRECTIONS, Search_Workspace
+
+
+def jump_point_search(
+    world,
+    workspace: Search_Workspace,
+    start: int,
+    goal: int,
+) -> Tuple[Optional[List[int]], Dict[str, int]]:
+    """
+    JPS over flat cell indices with unit step costs.
+
+    Returns the full cell-by-cell path (jump points joined by straight or
+    diagonal runs) or None, together with the search counters.
+    """
+    width, height = world.width, world.height
+    passable = world.passable_bits
+
+    def free(x: int, y: int) -> bool:
+        if x < 0 or y < 0 or x >= width or y >= height:
+            return False
+        index = y * width + x
+        return passable[index >> 3] >> (index & 7) & 1 == 1
+
+    gx, gy = goal % width, goal // width
+    scanned = 0
+
+    def jump_straight(x: int, y: int, dx: int, dy: int) -> int:
+        """Run along a row or column; returns a jump point index or -1."""
+        nonlocal scanned
+        while True:
+            x += dx
+            y += dy
+            scanned += 1
+            if not free(x, y):
+                return -1
+            if x == gx and y == gy:
+                return y * width + x
+            if dx:
+                if (not free(x, y - 1) and free(x + dx, y - 1)) or \
+                   (not free(x, y + 1) and free(x + dx, y + 1)):
+                    return y * width + x
+            else:
+                if (not free(x - 1, y) and free(x - 1, y + dy)) or \
+                   (not free(x + 1, y) and free(x + 1, y + dy)):
+                    return y * width + x
+
+    def jump(x: int, y: int, dx: int, dy: int) -> int:
+        """Jump from (x, y) in direction (dx, dy); returns an index or -1."""
+        nonlocal scanned
+        if not dx or not dy:
+            return jump_straight(x, y, dx, dy)
+
+        while True:
+            x += dx
+            y += dy
+            scanned += 1
+            if not free(x, y):
+                return -1
+            if x == gx and y == gy:
+                return y * width + x
+            if (not free(x - dx, y) and free(x - dx, y + dy)) or \
+               (not free(x, y - dy) and free(x + dx, y - dy)):
+                return y * width + x
+            if jump_straight(x, y, dx, 0) != -1 or jump_straight(x, y, 0, dy) != -1:
+                return y * width + x
+
+    def successors_directions(x: int, y: int, parent: int) -> List[Tuple[int, int]]:
+        """Natural and forced directions for a node reached from parent."""
+        if parent == -1:
+            return list(DIRECTIONS)
+
+        px, py = parent % width, parent // width
+        dx = (x > px) - (x < px)
+        dy = (y > py) - (y < py)
+        directions = []
+
+        if dx and dy:
+            directions.append((dx, dy))
+            directions.append((dx, 0))
+            directions.append((0, dy))
+            if not free(x - dx, y):
+                directions.append((-dx, dy))
+            if not free(x, y - dy):
+                directions.append((dx, -dy))
+        elif dx:
+            directions.append((dx, 0))
+            if not free(x, y - 1):
+                directions.append((dx, -1))
+            if not free(x, y + 1):
+                directions.append((dx, 1))
+        else:
+            directions.append((0, dy))
+            if not free(x - 1, y):
+                directions.append((-1, dy))
+            if not free(x + 1, y):
+                directions.append((1, dy))
+
+        return directions
+
+    g_score = workspace.g_score
+    parent = workspace.parent
+    stamp = workspace.stamp
+    closed = workspace.closed
+    generation = workspace.begin()
+
+    stamp[start] = generation
+    g_score[start] = 0.0
+    parent[start] = -1
+
+    sx, sy = start % width, start // width
+    h_start = float(max(abs(sx - gx), abs(sy - gy)))
+    open_set = [(h_start, h_start, start)]
+    push, pop = heapq.heappush, heapq.heappop
+
+    pushes, pops, stale_pops = 1, 0, 0
+    found = False
+
+    while open_set:
+        _, _, current = pop(open_set)
+        pops += 1
+
+        if closed[current] == generation:
+            stale_pops += 1
+            continue
+        closed[current] = generation
+
+        if current == goal:
+            found = True
+            break
+
+        cy, cx = divmod(current, width)
+        base = g_score[current]
+
+        for dx, dy in successors_directions(cx, cy, parent[current]):
+            point = jump(cx, cy, dx, dy)
+            if point == -1 or closed[point] == generation:
+                continue
+
+            jy, jx = divmod(point, width)
+            run = abs(jx - cx)
+            if abs(jy - cy) > run:
+                run = abs(jy - cy)
+            tentative = base + run
+
+            if stamp[point] != generation or tentative < g_score[point]:
+                stamp[point] = generation
+                g_score[point] = tentative
+                parent[point] = current
+
+                hx, hy = abs(jx - gx), abs(jy - gy)
+                h = float(hx if hx > hy else hy)
+                push(open_set, (tentative + h, h, point))
+                pushes += 1
+
+    counters = {
+        "nodes_expanded": pops - stale_pops,
+        "pushes": pushes,
+        "pops": pops,
+        "stale_pops": stale_pops,
+        "reexpansions": 0,
+        "cells_scanned": scanned,
+    }
+
+    if not found:
+        return None, counters
+    return _unroll(workspace.trace(goal), width), counters
+
+
+def _unroll(jump_points: List[int], width: int) -> List[int]:
+    """Fill in every cell between consecutive (collinear) jump points."""
+    path = [jump_points[0]]
+
+    for a, b in zip(jump_points, jump_points[1:]):
+        ay, ax = divmod(a, width)
+        by, bx = divmod(b, width)
+        dx = (bx > ax) - (bx < ax)
+        dy = (by > ay) - (by < ay)
+        offset = dy * width + dx
+        cell = a
+        while cell != b:
+            cell += offset
+            path.append(cell)
+
+    return path
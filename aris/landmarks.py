@@ -0,0 +1,200 @@
+"""
+landmarks.py
+------------
+ALT heuristic (A*, Landmarks, Triangle inequality) for one Map_Anvil.
+
+A few landmark cells are chosen far apart, and the exact travel cost to
+and from each of them is stored for every cell. For any landmark L and
+any cells v and t, the triangle inequality gives
+
+    cost(v -> t) >= cost(L -> t) - cost(L -> v)
+    cost(v -> t) >= cost(v -> L) - cost(t -> L)
+
+so the largest of these differences is an admissible heuristic that,
+unlike the octile distance, sees walls and expensive terrain. A move is
+priced by the cell it enters, so the two directions differ and both
+tables are kept.
+
+Landmarks are picked by farthest-point selection: the first is the cell
+farthest from a cell of the largest region, each next one the cell
+farthest from every landmark so far. Tables are float32 arrays, built
+per mode on first use (count * 8 bytes per cell and mode). Rounding to
+float32 could push a bound slightly above the true cost, so bounds are
+lowered by a tolerance of a few float32 steps of the largest distance.
+
+A query consults only the `active` landmarks that give the best bound
+at its start, and never estimates less than the octile distance.
+"""
+
+from array import array
+from typing import Callable, Dict, List, Tuple
+import threading
+import time
+
+from aris.index_kernel import INF, Search_Workspace, distance_map
+
+MODES = ("fewest_steps", "lowest_energy")
+
+# Bounds are lowered by this share of the largest stored distance
+# (a float32 keeps 24 significant bits)
+FLOAT32_TOLERANCE = 2.0 ** -22
+
+
+class Landmark_Atlas:
+    """
+    Landmarks of one world and their float32 distance tables.
+
+    Attributes:
+        version (int): world version the tables were built from
+        build_stats (dict): mode -> build_seconds, landmarks, table_bytes
+    """
+
+    def __init__(self, world, count: int = 8, active: int = 4):
+        if count < 1:
+            raise ValueError("count must be at least 1")
+        if active < 1:
+            raise ValueError("active must be at least 1")
+        if world.lazy:
+            raise ValueError("Tiled worlds are paged from disk; landmarks need the whole map")
+
+        self.world = world
+        self.count = count
+        self.active = active
+        self.version = world.version
+
+        # mode -> (landmark cells, forward tables, backward tables, tolerance)
+        self._tables: Dict[str, Tuple[List[int], List[array], List[array], float]] = {}
+        self.build_stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------
+    # PUBLIC METHODS
+    # ------------------------------------------------------------
+    def landmarks(self, mode: str) -> List[int]:
+        """Landmark cell indices for mode (building the tables if needed)."""
+        return list(self._tables_for(mode)[0])
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the distance tables built so far."""
+        return sum(stats["table_bytes"] for stats in self.build_stats.values())
+
+    def heuristic(
+        self,
+        start: int,
+        goal: int,
+        mode: str,
+        h_straight: float,
+        h_diagonal: float,
+    ) -> Callable[[int], float]:
+        """
+        Estimate of the cost from a cell to goal: the octile distance
+        (h_straight / h_diagonal per step) or the best landmark bound,
+        whichever is larger.
+        """
+        _, forward, backward, tolerance = self._tables_for(mode)
+
+        # Landmarks in another region than the goal bound nothing
+        terms = []
+        for ahead, behind in zip(forward, backward):
+            to_goal, from_goal = ahead[goal], behind[goal]
+            if to_goal < INF and from_goal < INF:
+                terms.append((ahead, behind, to_goal - tolerance, from_goal + tolerance))
+
+        def bound_at(term) -> float:
+            ahead, behind, to_goal, from_goal = term
+            return max(to_goal - ahead[start], behind[start] - from_goal)
+
+        terms.sort(key=bound_at, reverse=True)
+        chosen = tuple(terms[:self.active])
+
+        width = self.world.width
+        gy, gx = divmod(goal, width)
+        extra = h_diagonal - h_straight
+
+        def estimate(index: int) -> float:
+            y, x = divmod(index, width)
+            hx = x - gx if x > gx else gx - x
+            hy = y - gy if y > gy else gy - y
+            if hx > hy:
+                h = h_straight * hx + extra * hy
+            else:
+                h = h_straight * hy + extra * hx
+            for ahead, behind, to_goal, from_goal in chosen:
+                bound = to_goal - ahead[index]
+                if bound > h:
+                    h = bound
+                bound = behind[index] - from_goal
+                if bound > h:
+                    h = bound
+            return h
+
+        return estimate
+
+    # ------------------------------------------------------------
+    # BUILD
+    # ------------------------------------------------------------
+    def _tables_for(self, mode: str) -> Tuple[List[int], List[array], List[array], float]:
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode: {mode}")
+        tables = self._tables.get(mode)
+        if tables is None:
+            with self._lock:
+                tables = self._tables.get(mode)
+                if tables is None:
+                    tables = self._tables[mode] = self._build(mode)
+        return tables
+
+    def _build(self, mode: str) -> Tuple[List[int], List[array], List[array], float]:
+        started = time.perf_counter()
+        world = self.world
+        workspace = Search_Workspace(world.width * world.height)
+
+        landmarks: List[int] = []
+        forward: List[array] = []
+        backward: List[array] = []
+
+        seed = self._seed_cell()
+        if seed is not None:
+            nearest = distance_map(world, seed, mode, workspace=workspace)
+
+            while len(landmarks) < self.count:
+                farthest = max(
+                    (distance, index)
+                    for index, distance in enumerate(nearest)
+                    if distance < INF
+                )
+                # Every reachable cell is already a landmark
+                if farthest[0] == 0.0 and landmarks:
+                    break
+                landmark = farthest[1]
+                landmarks.append(landmark)
+
+                forward.append(distance_map(world, landmark, mode, workspace=workspace))
+                backward.append(
+                    distance_map(world, landmark, mode, reverse=True, workspace=workspace)
+                )
+
+                table = forward[-1]
+                nearest = table if len(landmarks) == 1 else array(
+                    "f", map(min, nearest, table)
+                )
+
+        largest = max(
+            (distance for table in forward + backward for distance in table if distance < INF),
+            default=0.0,
+        )
+        table_bytes = sum(len(table) * table.itemsize for table in forward + backward)
+        self.build_stats[mode] = {
+            "build_seconds": time.perf_counter() - started,
+            "landmarks": len(landmarks),
+            "table_bytes": table_bytes,
+        }
+        return landmarks, forward, backward, largest * FLOAT32_TOLERANCE
+
+    def _seed_cell(self):
+        """A passable cell of the largest connected region, or None."""
+        components = self.world.components()
+        if not components.sizes:
+            return None
+        label = max(components.sizes, key=components.sizes.__getitem__)
+        return components.labels.index(label)
@@ -0,0 +1,171 @@
+"""
+parallel.py
+-----------
+Process-pool runner for bulk path queries.
+
+The map is written once into shared memory: the compact layers of
+Map_Anvil (terrain codes, costs, passability bitmap, direction masks;
+see LAYER_FORMATS) go into a single block. Each worker process maps that
+block and wraps it with Map_Anvil.from_layers, so no worker re-reads or
+re-parses the JSON and the grid is not pickled per task. Queries are
+sent in chunks, and results can be streamed back in input order or as
+chunks complete.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import os
+import time
+
+from aris.saladin_pathfinder import Saladin_Pathfinder
+from runes.runes import PathGlyph
+from world.cost_profiles import Cost_Profile
+from world.grid_forge import Map_Anvil
+
+# One result: (input position, path or None, per-query stats)
+Course_Result = Tuple[int, Optional[List[PathGlyph]], Dict[str, object]]
+
+# Per-process state, set up once by _attach_worker
+_WORKER: Dict[str, object] = {}
+
+
+def _attach_worker(
+    block_name: str,
+    width: int,
+    height: int,
+    layout: List[Tuple[str, int, int]],
+    profile: Cost_Profile,
+    options: Dict[str, object],
+) -> None:
+    """Pool initializer: map the shared block and build a pathfinder on it."""
+    block = shared_memory.SharedMemory(name=block_name)
+    buffer = block.buf
+    layers = {name: buffer[start:start + size] for name, start, size in layout}
+
+    world = Map_Anvil.from_layers(
+        width, height, layers, source=f"<shared:{block_name}>", profile=profile
+    )
+    _WORKER["block"] = block
+    _WORKER["pathfinder"] = Saladin_Pathfinder(world, **options)
+
+
+def _run_chunk(chunk: List[Tuple[int, int, int, int, int]]):
+    """Answer one chunk of (position, hx, hy, px, py) queries."""
+    started = time.perf_counter()
+    pathfinder = _WORKER["pathfinder"]
+    results = []
+
+    for position, hx, hy, px, py in chunk:
+        path = pathfinder.chart_course(PathGlyph(hx, hy), PathGlyph(px, py))
+        coords = None if path is None else [glyph.coords() for glyph in path]
+        results.append((position, coords, pathfinder.last_run_stats))
+
+    return os.getpid(), time.perf_counter() - started, results
+
+
+class Parallel_Navigator:
+    """
+    Runs chart_course for many journeys across a ProcessPoolExecutor.
+
+    Use as a context manager (or call close()) so the worker processes
+    and the shared memory block are released.
+    """
+
+    def __init__(
+        self,
+        world: Map_Anvil,
+        workers: Optional[int] = None,
+        chunk_size: int = 64,
+        **pathfinder_options,
+    ):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+
+        self.world = world
+        self.chunk_size = chunk_size
+        self.workers = workers or os.cpu_count() or 1
+
+        layers = world.layers()
+        layout = []
+        offset = 0
+        for name, view in layers.items():
+            layout.append((name, offset, view.nbytes))
+            offset += view.nbytes
+
+        self._block = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for (name, start, size) in layout:
+            self._block.buf[start:start + size] = layers[name]
+
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_attach_worker,
+            initargs=(
+                self._block.name, world.width, world.height, layout, world.profile,
+                pathfinder_options,
+            ),
+        )
+
+        # Throughput and utilisation of the last completed run()
+        self.last_run_report: Dict[str, object] = {}
+
+    def run(
+        self,
+        journeys: Sequence[Tuple[PathGlyph, PathGlyph]],
+        ordered: bool = True,
+    ) -> Iterator[Course_Result]:
+        """
+        Yield (position, path, stats) for every journey. ordered=True keeps
+        input order; ordered=False yields each chunk as soon as it is done.
+        last_run_report is filled in once the iterator is exhausted.
+        """
+        started = time.perf_counter()
+        chunks = []
+        for first in range(0, len(journeys), self.chunk_size):
+            chunk = []
+            for position in range(first, min(first + self.chunk_size, len(journeys))):
+                hearth, pythonia = journeys[position]
+                chunk.append((position, hearth.x, hearth.y, pythonia.x, pythonia.y))
+            chunks.append(chunk)
+
+        futures = [self._pool.submit(_run_chunk, chunk) for chunk in chunks]
+        busy: Dict[int, float] = {}
+        answered = 0
+
+        for future in (futures if ordered else as_completed(futures)):
+            pid, seconds, results = future.result()
+            busy[pid] = busy.get(pid, 0.0) + seconds
+            for position, coords, stats in results:
+                answered += 1
+                path = None if coords is None else [PathGlyph(x, y) for x, y in coords]
+                yield position, path, stats
+
+        elapsed = time.perf_counter() - started
+        self.last_run_report = {
+            "queries": answered,
+            "chunks": len(chunks),
+            "wall_seconds": elapsed,
+            "queries_per_second": answered / elapsed if elapsed > 0 else 0.0,
+            "worker_busy_seconds": busy,
+            "worker_utilisation": {
+                pid: seconds / elapsed if elapsed > 0 else 0.0 for pid, seconds in busy.items()
+            },
+        }
+
+    def chart_courses(
+        self,
+        journeys: Sequence[Tuple[PathGlyph, PathGlyph]],
+    ) -> List[Optional[List[PathGlyph]]]:
+        """All paths, in input order."""
+        return [path for _, path, _ in self.run(journeys)]
+
+    def close(self) -> None:
+        self._pool.shutdown()
+        self._block.close()
+        self._block.unlink()
+
+    def __enter__(self) -> "Parallel_Navigator":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
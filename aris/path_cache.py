@@ -0,0 +1,168 @@
+"""
+path_cache.py
+-------------
+Memoised chart_course answers for one Map_Anvil.
+
+Entries are tied to the world's version number. Any terrain change bumps
+the version, and the next lookup drops every entry cached for the old
+map. Optimal paths are indexed cell by cell, because any stretch of an
+optimal path is itself optimal. A query whose start and goal both lie on
+a cached optimal path, in that order, is answered by slicing it, even
+though that exact pair was never asked before.
+
+Entries are evicted least-recently-used first once max_paths is exceeded.
+One cache may be shared by several pathfinders and threads.
+"""
+
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+import threading
+
+from runes.runes import PathGlyph
+
+
+class Course_Cache:
+    """
+    Bounded LRU cache of paths for a single world.
+    """
+
+    def __init__(self, world, max_paths: int = 1024):
+        if max_paths < 1:
+            raise ValueError("max_paths must be at least 1")
+
+        self.world = world
+        self.max_paths = max_paths
+        self.version = world.version
+
+        # entry id -> (config, hearth, pythonia, path or None, reusable)
+        self._entries: "OrderedDict[int, Tuple]" = OrderedDict()
+        self._by_query: Dict[Tuple[Hashable, PathGlyph, PathGlyph], int] = {}
+        # (config, cell) -> ids of reusable paths through that cell
+        self._through: Dict[Tuple[Hashable, PathGlyph], Set[int]] = {}
+        # entry id -> cell -> position along that path
+        self._positions: Dict[int, Dict[PathGlyph, int]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+        self.lookups = 0
+        self.hits = 0
+        self.subpath_hits = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    # ------------------------------------------------------------
+    # PUBLIC METHODS
+    # ------------------------------------------------------------
+    def lookup(
+        self,
+        config: Hashable,
+        hearth: PathGlyph,
+        pythonia: PathGlyph,
+    ) -> Tuple[str, Optional[List[PathGlyph]]]:
+        """
+        (outcome, path) for the query. outcome is "hit", "subpath" or
+        "miss"; a hit may carry None for a pair known to be unreachable.
+        config separates cost models and engines whose answers must not
+        be mixed (e.g. mode, or epsilon for inexact searches).
+        """
+        with self._lock:
+            self._check_version()
+            self.lookups += 1
+
+            entry_id = self._by_query.get((config, hearth, pythonia))
+            if entry_id is not None:
+                self.hits += 1
+                self._entries.move_to_end(entry_id)
+                path = self._entries[entry_id][3]
+                return "hit", None if path is None else list(path)
+
+            for entry_id in self._through.get((config, hearth), ()):
+                positions = self._positions[entry_id]
+                end = positions.get(pythonia)
+                if end is not None and end > positions[hearth]:
+                    self.hits += 1
+                    self.subpath_hits += 1
+                    self._entries.move_to_end(entry_id)
+                    return "subpath", list(self._entries[entry_id][3][positions[hearth]:end + 1])
+
+            return "miss", None
+
+    def store(
+        self,
+        config: Hashable,
+        hearth: PathGlyph,
+        pythonia: PathGlyph,
+        path: Optional[List[PathGlyph]],
+        optimal: bool,
+        version: Optional[int] = None,
+    ) -> None:
+        """
+        Remember an answer; optimal paths also serve their sub-paths.
+        Pass the world version the search started on so that an answer
+        overtaken by a terrain edit is dropped instead of cached.
+        """
+        with self._lock:
+            self._check_version()
+            if version is not None and version != self.version:
+                return
+            if (config, hearth, pythonia) in self._by_query:
+                return
+
+            entry_id = self._next_id
+            self._next_id += 1
+            reusable = optimal and path is not None
+            self._entries[entry_id] = (config, hearth, pythonia, path, reusable)
+            self._by_query[(config, hearth, pythonia)] = entry_id
+
+            if reusable:
+                positions = {}
+                for position, cell in enumerate(path):
+                    positions.setdefault(cell, position)
+                    self._through.setdefault((config, cell), set()).add(entry_id)
+                self._positions[entry_id] = positions
+
+            while len(self._entries) > self.max_paths:
+                self._forget(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "cache_lookups": self.lookups,
+                "cache_hits": self.hits,
+                "cache_subpath_hits": self.subpath_hits,
+                "cache_hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+                "cache_evictions": self.evictions,
+                "cache_invalidations": self.invalidations,
+                "cache_entries": len(self._entries),
+            }
+
+    # ------------------------------------------------------------
+    # INTERNAL UTILITIES
+    # ------------------------------------------------------------
+    def _check_version(self) -> None:
+        if self.world.version != self.version:
+            self.version = self.world.version
+            if self._entries:
+                self.invalidations += 1
+            self._clear()
+
+    def _clear(self) -> None:
+        self._entries.clear()
+        self._by_query.clear()
+        self._through.clear()
+        self._positions.clear()
+
+    def _forget(self, entry_id: int) -> None:
+        config, hearth, pythonia, path, reusable = self._entries.pop(entry_id)
+        del self._by_query[(config, hearth, pythonia)]
+        if reusable:
+            for cell in self._positions.pop(entry_id):
+                holders = self._through[(config, cell)]
+                holders.discard(entry_id)
+                if not holders:
+                    del self._through[(config, cell)]
@@ -4,12 +4,51 @@ saladin_pathfinder.py
 A* Pathfinder for Aris' world.
 """
 
-from typing import Dict, List, Optional
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
 import heapq
+import sys
+import threading
+import time
 
+from aris.anytime import anytime_a_star
+from aris.bidirectional import bidirectional_a_star
+from aris.flow_field import Flow_Field
+from aris.hierarchy import Cluster_Atlas
+from aris.index_kernel import (
+    Search_Workspace,
+    dijkstra_tree,
+    distance_map,
+    indexed_a_star,
+    nearest_target_a_star,
+    new_workspace,
+)
+from aris.jump_point import jump_point_search
+from aris.landmarks import Landmark_Atlas
+from aris.path_cache import Course_Cache
+from aris.search_stats import Course_Report, Expansion_Hook, Search_Probe, Search_Stats
 from runes.runes import PathGlyph
+from world.cost_profiles import Profile_Spec, resolve_profile
 from world.grid_forge import Map_Anvil
-from world.terrain_legends import minimum_traversable_cost
+from world.terrain_legends import DIAGONAL_PENALTY
+
+ENGINES = ("indexed", "glyph", "jps", "hpa", "bidirectional")
+
+HEURISTICS = ("octile", "landmarks")
+
+# First inflation of chart_course_anytime
+ANYTIME_EPSILON = 3.0
+
+# Flow fields kept per pathfinder (each holds two arrays the size of the map)
+FLOW_FIELD_LIMIT = 8
+
+
+class Nearest_Course(NamedTuple):
+    """A chart_nearest answer: the goal reached, its position among the goals, the path."""
+    goal: PathGlyph
+    position: int
+    path: List[PathGlyph]
 
 
 class Saladin_Pathfinder:
@@ -18,14 +57,118 @@ class Saladin_Pathfinder:
     Supports:
         - lowest_energy  (terrain cost + diagonal penalty)
         - fewest_steps   (each move cost = 1)
+
+    Engines:
+        - indexed  (default; flat cell indices, reusable score arrays)
+        - glyph    (reference A* keyed by PathGlyph)
+        - jps      (Jump Point Search; fewest_steps only, lowest_energy
+                    queries fall back to the indexed engine)
+        - hpa      (hierarchical search over a Cluster_Atlas; pass one in
+                    via atlas= or a default one is built on first use)
+        - bidirectional (forward and backward A* meeting in the middle)
+
+    closed_set=True skips heap entries for cells that were already
+    expanded (lazy decrease-key). closed_set=False re-expands them, which
+    is only useful for measuring the wasted work.
+
+    epsilon > 1 runs weighted A*: faster, with path cost at most epsilon
+    times the optimum (reported as suboptimality_bound).
+
+    chart_nearest finds the cheapest path to the nearest of many goals
+    with a single search.
+
+    chart_course_anytime runs ARA* under a time or expansion budget and
+    returns the best path found so far with its proven bound.
+
+    heuristic="landmarks" gives the indexed and anytime searches the ALT
+    heuristic of a Landmark_Atlas (pass one in via landmarks= or a
+    default one is built on first use), which sees walls and costly
+    terrain that the octile distance ignores. Paths stay optimal.
+
+    Queries whose goal lies in another connected region than the start
+    are answered None without a search (last_run_stats["unreachable"]),
+    using the world's Component_Index.
+
+    course_cache (a Course_Cache for the same world) memoises answers,
+    including sub-paths of earlier optimal paths, until the map changes.
+
+    profile prices the terrain for this pathfinder: a Cost_Profile, the
+    name of a registered one, or a terrain -> cost mapping overriding the
+    standard costs. The world's compiled view for it is reused, and the
+    heuristic is priced with the profile's cheapest terrain.
+
+    One pathfinder may serve several threads: scratch arrays,
+    last_run_stats and last_batch_stats are kept per thread, and
+    chart_course_report returns each query's Search_Stats with its path.
     """
 
-    def __init__(self, world: Map_Anvil, mode: str = "lowest_energy"):
-        self.world = world
+    def __init__(
+        self,
+        world: Map_Anvil,
+        mode: str = "lowest_energy",
+        engine: str = "indexed",
+        closed_set: bool = True,
+        epsilon: float = 1.0,
+        atlas: Optional[Cluster_Atlas] = None,
+        course_cache: Optional[Course_Cache] = None,
+        profile: Profile_Spec = None,
+        heuristic: str = "octile",
+        landmarks: Optional[Landmark_Atlas] = None,
+    ):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine: {engine}")
+        if heuristic not in HEURISTICS:
+            raise ValueError(f"Unknown heuristic: {heuristic}")
+        if epsilon < 1.0:
+            raise ValueError("epsilon must be at least 1.0")
+        if course_cache is not None and course_cache.world is not world:
+            raise ValueError("course_cache belongs to a different world")
+
+        self.profile = world.profile if profile is None else resolve_profile(profile)
+        self.world = world.with_profile(self.profile)
+        if landmarks is not None and landmarks.world is not self.world:
+            raise ValueError("landmarks belong to a different world or profile")
+        if atlas is not None and atlas.world is not self.world:
+            raise ValueError("atlas belongs to a different world or profile")
         self.mode = mode
+        self.engine = engine
+        self.closed_set = closed_set
+        self.epsilon = epsilon
+        self.atlas = atlas
+        self.course_cache = course_cache
+        self.heuristic = heuristic
+        self.landmarks = landmarks
+
+        # Heuristic constants, fixed for the lifetime of the pathfinder
+        self._min_cost = self.profile.minimum_cost
+        self._diagonal_min_cost = self.profile.diagonal_minimum_cost
+
+        # Per-thread scratch arrays (allocated on first use) and metrics
+        self._local = threading.local()
+
+        # (goal index, mode) -> Flow_Field, most recently used last
+        self._flow_fields: "OrderedDict[Tuple[int, str], Flow_Field]" = OrderedDict()
+
+        # Guards the flow fields, atlas and landmarks shared by all threads
+        self._lock = threading.RLock()
+
+    @property
+    def last_run_stats(self) -> Dict[str, object]:
+        """Metrics of the calling thread's last completed search."""
+        return self._local.__dict__.get("stats", {})
+
+    @last_run_stats.setter
+    def last_run_stats(self, stats: Dict[str, object]) -> None:
+        self._local.stats = stats
 
-        # Stores metrics for the last completed search
-        self.last_run_stats = {}
+    @property
+    def last_batch_stats(self) -> List[Dict[str, object]]:
+        """Per-query metrics of the calling thread's last chart_courses batch."""
+        return self._local.__dict__.get("batch_stats", [])
+
+    @last_batch_stats.setter
+    def last_batch_stats(self, batch_stats: List[Dict[str, object]]) -> None:
+        self._local.batch_stats = batch_stats
 
     # ----------------------------------------------------------------------
     # PUBLIC METHOD (used by tests)
@@ -36,20 +179,672 @@ class Saladin_Pathfinder:
         pythonia: PathGlyph,
         mode: Optional[str] = None
     ) -> Optional[List[PathGlyph]]:
+        return self._chart(hearth, pythonia, mode, None)
+
+    def chart_course_report(
+        self,
+        hearth: PathGlyph,
+        pythonia: PathGlyph,
+        mode: Optional[str] = None,
+        hook: Optional[Expansion_Hook] = None,
+        sample_every: int = 1,
+        time_phases: bool = False,
+    ) -> Course_Report:
+        """
+        chart_course returning the path with its Search_Stats.
+
+        hook(cell index, g, open-set size) is called for every
+        sample_every-th expansion of the indexed, glyph and bidirectional
+        engines. time_phases times heuristic evaluation and neighbour
+        generation (indexed and glyph engines); it slows the search, so
+        compare its times with each other, not with normal runs.
+        """
+        probe = None
+        if hook is not None or time_phases:
+            probe = Search_Probe(hook, sample_every, time_phases)
+
+        path = self._chart(hearth, pythonia, mode, probe)
+        stats = self.last_run_stats
+        if probe is not None:
+            stats["expansions_sampled"] = probe.samples
+            if time_phases:
+                stats["heuristic_time"] = probe.heuristic_time
+                stats["neighbour_time"] = probe.neighbour_time
+        return Course_Report(path, Search_Stats.from_dict(stats))
+
+    def chart_course_anytime(
+        self,
+        hearth: PathGlyph,
+        pythonia: PathGlyph,
+        mode: Optional[str] = None,
+        time_budget: Optional[float] = None,
+        deadline: Optional[float] = None,
+        node_budget: Optional[int] = None,
+        epsilon: float = ANYTIME_EPSILON,
+        epsilon_step: float = 0.5,
+    ) -> Optional[List[PathGlyph]]:
+        """
+        Anytime search (ARA*): a quick path with the heuristic inflated by
+        epsilon, then better ones as epsilon drops by epsilon_step per
+        pass, until the path is proven optimal or time_budget (seconds
+        from now), deadline (time.monotonic() seconds) or node_budget
+        (expansions) runs out.
+
+        Returns the best path found, or None if there was none in time.
+        last_run_stats holds its suboptimality_bound (None if the pass
+        that found it did not complete), passes, stopped (why the search
+        ended early, or None) and solutions, the improvements over time.
+        The course cache is not used.
+        """
+        started = time.perf_counter()
+        if mode is None:
+            mode = self.mode
+        if time_budget is not None:
+            until = time.monotonic() + time_budget
+            deadline = until if deadline is None else min(deadline, until)
+
+        path = self._anytime_search(
+            hearth, pythonia, mode, deadline, node_budget, epsilon, epsilon_step
+        )
+        self.last_run_stats["wall_time"] = time.perf_counter() - started
+        return path
+
+    def chart_nearest(
+        self,
+        hearth: PathGlyph,
+        goals: Sequence[PathGlyph],
+        mode: Optional[str] = None,
+    ) -> Optional[Nearest_Course]:
+        """
+        Optimal path from hearth to whichever of goals is cheapest to
+        reach, in one backward A* seeded with every goal (whatever the
+        engine). Returns a Nearest_Course naming the winning goal and its
+        position in goals (the first one, if listed twice), or None if
+        no goal can be reached. A goal at hearth wins with the path
+        [hearth]; other goals on impassable terrain never win. Goals
+        outside the map raise ValueError.
+        """
+        started = time.perf_counter()
+        if mode is None:
+            mode = self.mode
+        self._check_on_map(hearth, "Start")
+        for goal in goals:
+            self._check_on_map(goal, "Goal")
+
+        answer = self._nearest_search(hearth, goals, mode)
+        self.last_run_stats["goals"] = len(goals)
+        self.last_run_stats["wall_time"] = time.perf_counter() - started
+        return answer
+
+    def distance_map(
+        self,
+        hearth: PathGlyph,
+        mode: Optional[str] = None,
+        reverse: bool = False,
+    ) -> array:
+        """
+        Cost of every cell from hearth as one float32 array (row-major,
+        index = y * width + x), priced like _movement_cost for this
+        pathfinder's profile; INF where no path leads. With reverse,
+        the cost from every cell to hearth instead.
+        """
+        self._check_on_map(hearth, "Start")
+        if mode is None:
+            mode = self.mode
+        world = self.world
+        return distance_map(
+            world, world.index_of(hearth.x, hearth.y), mode, reverse, self._scratch()
+        )
+
+    def _chart(
+        self,
+        hearth: PathGlyph,
+        pythonia: PathGlyph,
+        mode: Optional[str],
+        probe: Optional[Search_Probe],
+    ) -> Optional[List[PathGlyph]]:
+        """chart_course, with the wall time of the whole call recorded."""
+        started = time.perf_counter()
+        path = self._answer(hearth, pythonia, mode, probe)
+        self.last_run_stats["wall_time"] = time.perf_counter() - started
+        return path
+
+    def _answer(
+        self,
+        hearth: PathGlyph,
+        pythonia: PathGlyph,
+        mode: Optional[str],
+        probe: Optional[Search_Probe],
+    ) -> Optional[List[PathGlyph]]:
+
+        if not self._on_map(hearth, pythonia):
+            return None
 
         if hearth == pythonia:
-            self.last_run_stats = {
-                "nodes_expanded": 0,
-                "path_length": 0,
-                "total_energy": 0.0,
-                "success": True,
-            }
+            self.last_run_stats = self._fresh_stats()
+            self.last_run_stats["success"] = True
             return [hearth]
 
         if mode is None:
             mode = self.mode
 
-        return self._a_star(hearth, pythonia, mode)
+        cache = self.course_cache
+        if cache is None:
+            return self._search(hearth, pythonia, mode, probe)
+
+        config = self._cache_config(mode)
+        outcome, path = cache.lookup(config, hearth, pythonia)
+        if outcome == "miss":
+            version = self.world.version
+            path = self._search(hearth, pythonia, mode, probe)
+            cache.store(config, hearth, pythonia, path, config[0] == "exact", version)
+        else:
+            self.last_run_stats = self._fresh_stats()
+            if path is not None:
+                self._record_path(path, self.last_run_stats)
+            # The bound of the engine that stored the answer
+            if config[0] == "weighted":
+                self.last_run_stats["suboptimality_bound"] = config[3]
+            elif config[0] == "hpa":
+                self.last_run_stats["suboptimality_bound"] = None
+
+        self.last_run_stats["cache"] = outcome
+        self.last_run_stats.update(cache.stats())
+        return path
+
+    def chart_courses(
+        self,
+        journeys: Sequence[Tuple[PathGlyph, PathGlyph]],
+        mode: Optional[str] = None,
+        group_by: str = "auto",
+    ) -> List[Optional[List[PathGlyph]]]:
+        """
+        Answer many (hearth, pythonia) pairs with shared search trees.
+
+        group_by="goal" runs one reverse Dijkstra per distinct goal and
+        reads every path off its tree; group_by="start" runs one forward
+        Dijkstra per distinct start; "auto" picks whichever needs fewer
+        searches. Each tree stops as soon as all of its queries are
+        settled. Paths are optimal, so their costs match chart_course.
+
+        Journeys with an end off the map get None. Per-query metrics are
+        stored in last_batch_stats, in input order.
+        """
+        if group_by not in ("auto", "goal", "start"):
+            raise ValueError(f"Unknown grouping: {group_by}")
+        if mode is None:
+            mode = self.mode
+
+        world = self.world
+        if group_by == "auto":
+            goals = {pythonia for _, pythonia in journeys}
+            starts = {hearth for hearth, _ in journeys}
+            group_by = "goal" if len(goals) <= len(starts) else "start"
+        reverse = group_by == "goal"
+
+        paths: List[Optional[List[PathGlyph]]] = [None] * len(journeys)
+        batch_stats: List[Dict[str, object]] = [{} for _ in journeys]
+
+        groups: Dict[int, List[int]] = {}
+        for position, (hearth, pythonia) in enumerate(journeys):
+            if not self._on_map(hearth, pythonia):
+                batch_stats[position] = self.last_run_stats
+                continue
+            root = pythonia if reverse else hearth
+            groups.setdefault(world.index_of(root.x, root.y), []).append(position)
+        workspace = self._scratch()
+
+        for root, positions in groups.items():
+            leaves = {}
+            for position in positions:
+                hearth, pythonia = journeys[position]
+                leaf = hearth if reverse else pythonia
+                leaves[position] = world.index_of(leaf.x, leaf.y)
+
+            counters = dijkstra_tree(
+                world, workspace, root, mode, reverse=reverse, targets=leaves.values()
+            )
+
+            for position, leaf in leaves.items():
+                stats = self._fresh_stats()
+                stats["shared_nodes_expanded"] = counters["nodes_expanded"]
+                stats["group_size"] = len(positions)
+
+                if workspace.closed[leaf] != workspace.generation:
+                    batch_stats[position] = stats
+                    continue
+
+                indices = workspace.trace(leaf)
+                if reverse:
+                    indices.reverse()
+                paths[position] = [world.glyph_at_index(i) for i in indices]
+                self._record_path(paths[position], stats)
+                batch_stats[position] = stats
+
+        self.last_batch_stats = batch_stats
+        return paths
+
+    def flow_field(
+        self,
+        pythonia: PathGlyph,
+        mode: Optional[str] = None,
+        probe: Optional[Search_Probe] = None,
+    ) -> Flow_Field:
+        """
+        Flow_Field towards pythonia, built once per world version and
+        cached. While cached, chart_course answers queries to that goal
+        by reading the field. A probe watches the build (see Flow_Field).
+        """
+        self._check_on_map(pythonia, "Goal")
+        if mode is None:
+            mode = self.mode
+
+        key = (self.world.index_of(pythonia.x, pythonia.y), mode)
+        with self._lock:
+            field = self._flow_fields.get(key)
+            if field is not None and field.version == self.world.version:
+                self._flow_fields.move_to_end(key)
+                return field
+
+        # Built outside the lock so searches on this pathfinder keep going
+        field = Flow_Field(self.world, pythonia, mode, probe)
+        with self._lock:
+            self._flow_fields[key] = field
+            self._flow_fields.move_to_end(key)
+            if len(self._flow_fields) > FLOW_FIELD_LIMIT:
+                self._flow_fields.popitem(last=False)
+        return field
+
+    # ----------------------------------------------------------------------
+    # INTERNAL: ENGINE DISPATCH
+    # ----------------------------------------------------------------------
+    def _search(
+        self,
+        hearth: PathGlyph,
+        pythonia: PathGlyph,
+        mode: str,
+        probe: Optional[Search_Probe] = None,
+    ) -> Optional[List[PathGlyph]]:
+
+        if not self._reachable(hearth, pythonia):
+            self.last_run_stats = self._fresh_stats()
+            self.last_run_stats["unreachable"] = True
+            return None
+
+        if not self.world.lazy:
+            return self._dispatch(hearth, pythonia, mode, probe)
+
+        # Paged worlds also report how many tiles the search pulled in
+        tiles = self.world.tiles
+        loads_before = tiles.loads
+        path = self._dispatch(hearth, pythonia, mode, probe)
+        self.last_run_stats.update(tiles.stats())
+        self.last_run_stats["tile_loads"] = tiles.loads - loads_before
+        return path
+
+    def _on_map(self, *glyphs: PathGlyph) -> bool:
+        """
+        False, with last_run_stats marking the query out_of_bounds, if a
+        glyph lies off the map (flat indices would wrap onto other cells).
+        """
+        world = self.world
+        if all(world.in_bounds(glyph.x, glyph.y) for glyph in glyphs):
+            return True
+        self.last_run_stats = self._fresh_stats()
+        self.last_run_stats["out_of_bounds"] = True
+        return False
+
+    def _check_on_map(self, glyph: PathGlyph, role: str) -> None:
+        """Raise ValueError for a glyph off the map."""
+        if not self.world.in_bounds(glyph.x, glyph.y):
+            raise ValueError(f"{role} outside the map: ({glyph.x}, {glyph.y})")
+
+    def _reachable(self, hearth: PathGlyph, pythonia: PathGlyph) -> bool:
+        """
+        False if the goal lies outside every region the start can step
+        into (a constant-time label lookup), or either is off the map.
+        Tiled worlds are not labelled and always go to the search.
+        """
+        world = self.world
+        if not (world.in_bounds(hearth.x, hearth.y) and world.in_bounds(pythonia.x, pythonia.y)):
+            return False
+        if world.lazy:
+            return True
+        return world.components().reachable(
+            world.index_of(hearth.x, hearth.y), world.index_of(pythonia.x, pythonia.y)
+        )
+
+    def _dispatch(
+        self,
+        hearth: PathGlyph,
+        pythonia: PathGlyph,
+        mode: str,
+        probe: Optional[Search_Probe],
+    ) -> Optional[List[PathGlyph]]:
+
+        key = (self.world.index_of(pythonia.x, pythonia.y), mode)
+        with self._lock:
+            field = self._flow_fields.get(key)
+            if field is not None and field.version != self.world.version:
+                del self._flow_fields[key]
+                field = None
+        if field is not None:
+            return self._follow_flow_field(field, hearth)
+
+        if self.engine == "glyph":
+            return self._a_star(hearth, pythonia, mode, probe)
+
+        if self.engine == "jps" and mode == "fewest_steps":
+            return self._jump_point_search(hearth, pythonia)
+
+        if self.engine == "hpa":
+            return self._hierarchical_search(hearth, pythonia, mode)
+
+        if self.engine == "bidirectional":
+            return self._bidirectional_search(hearth, pythonia, mode, probe)
+
+        return self._indexed_a_star(hearth, pythonia, mode, probe)
+
+    def _cache_config(self, mode: str) -> Tuple:
+        """
+        Course_Cache key for answers of this pathfinder. Every optimal
+        engine shares ("exact", mode, costs) so they can reuse each
+        other's paths; the profile's costs keep travellers apart.
+        """
+        costs = self.profile.costs
+        if self.engine == "hpa":
+            atlas = self._atlas()
+            if atlas.exact:
+                return ("exact", mode, costs)
+            return ("hpa", mode, costs, atlas.cluster_size, atlas.smooth)
+        if self.engine == "bidirectional" or (self.engine == "jps" and mode == "fewest_steps"):
+            return ("exact", mode, costs)
+        if self.epsilon == 1.0:
+            return ("exact", mode, costs)
+        return ("weighted", mode, costs, self.epsilon)
+
+    # ----------------------------------------------------------------------
+    # INTERNAL: FLOW FIELD LOOKUP
+    # ----------------------------------------------------------------------
+    def _follow_flow_field(self, field: Flow_Field, hearth: PathGlyph) -> Optional[List[PathGlyph]]:
+
+        stats = self._fresh_stats()
+        stats["flow_field"] = True
+
+        path = field.path_from(hearth)
+        if path is None:
+            self.last_run_stats = stats
+            return None
+
+        return self._finish(path, stats)
+
+    # ----------------------------------------------------------------------
+    # INTERNAL: INDEXED A* (flat cell indices)
+    # ----------------------------------------------------------------------
+    def _indexed_a_star(
+        self,
+        start: PathGlyph,
+        goal: PathGlyph,
+        mode: str,
+        probe: Optional[Search_Probe] = None,
+    ) -> Optional[List[PathGlyph]]:
+
+        world = self.world
+        workspace = self._scratch()
+        h_straight, h_diagonal = self._octile_weights(mode)
+        start_index = world.index_of(start.x, start.y)
+        goal_index = world.index_of(goal.x, goal.y)
+
+        estimate = None
+        if self.heuristic == "landmarks":
+            estimate = self._landmarks().heuristic(
+                start_index, goal_index, mode, h_straight, h_diagonal
+            )
+
+        indices, counters = indexed_a_star(
+            world,
+            workspace,
+            start_index,
+            goal_index,
+            mode,
+            h_straight,
+            h_diagonal,
+            weight=self.epsilon,
+            closed_set=self.closed_set,
+            probe=probe,
+            heuristic=estimate,
+        )
+
+        stats = self._fresh_stats()
+        stats.update(counters)
+        stats["suboptimality_bound"] = self.epsilon
+        stats["score_memory_bytes"] = workspace.memory_bytes()
+
+        if indices is None:
+            self.last_run_stats = stats
+            return None
+
+        path = [world.glyph_at_index(i) for i in indices]
+        return self._finish(path, stats)
+
+    # ----------------------------------------------------------------------
+    # INTERNAL: NEAREST OF MANY GOALS
+    # ----------------------------------------------------------------------
+    def _nearest_search(
+        self,
+        start: PathGlyph,
+        goals: Sequence[PathGlyph],
+        mode: str,
+    ) -> Optional[Nearest_Course]:
+
+        world = self.world
+        positions: Dict[int, int] = {}
+        for position, goal in enumerate(goals):
+            positions.setdefault(world.index_of(goal.x, goal.y), position)
+
+        # Already there, even on a wall, as chart_course(start, start) is
+        here = positions.get(world.index_of(start.x, start.y))
+        if here is not None:
+            stats = self._fresh_stats()
+            stats["goal_position"] = here
+            self._finish([start], stats)
+            return Nearest_Course(start, here, [start])
+
+        # Goals in other regions are dropped before the search
+        reachable = [
+            index for index in positions
+            if self._reachable(start, world.glyph_at_index(index))
+        ]
+        stats = self._fresh_stats()
+        stats["goals_reachable"] = len(reachable)
+        if not reachable:
+            self.last_run_stats = stats
+            return None
+
+        workspace = self._scratch()
+        h_straight, h_diagonal = self._octile_weights(mode)
+        indices, target, counters = nearest_target_a_star(
+            world,
+            workspace,
+            world.index_of(start.x, start.y),
+            reachable,
+            mode,
+            h_straight,
+            h_diagonal,
+        )
+        stats.update(counters)
+        stats["score_memory_bytes"] = workspace.memory_bytes()
+
+        if indices is None:
+            self.last_run_stats = stats
+            return None
+
+        path = [world.glyph_at_index(i) for i in indices]
+        stats["goal_position"] = positions[target]
+        self._finish(path, stats)
+        return Nearest_Course(path[-1], positions[target], path)
+
+    # ----------------------------------------------------------------------
+    # INTERNAL: ANYTIME A* (ARA*)
+    # ----------------------------------------------------------------------
+    def _anytime_search(
+        self,
+        start: PathGlyph,
+        goal: PathGlyph,
+        mode: str,
+        deadline: Optional[float],
+        node_budget: Optional[int],
+        epsilon: float,
+        epsilon_step: float,
+    ) -> Optional[List[PathGlyph]]:
+
+        if not self._on_map(start, goal):
+            return None
+        if start == goal:
+            return self._finish([start], self._fresh_stats())
+        if not self._reachable(start, goal):
+            self.last_run_stats = self._fresh_stats()
+            self.last_run_stats["unreachable"] = True
+            return None
+
+        world = self.world
+        workspace = self._scratch()
+        h_straight, h_diagonal = self._octile_weights(mode)
+        start_index = world.index_of(start.x, start.y)
+        goal_index = world.index_of(goal.x, goal.y)
+
+        estimate = None
+        if self.heuristic == "landmarks":
+            estimate = self._landmarks().heuristic(
+                start_index, goal_index, mode, h_straight, h_diagonal
+            )
+
+        indices, counters = anytime_a_star(
+            world,
+            workspace,
+            start_index,
+            goal_index,
+            mode,
+            h_straight,
+            h_diagonal,
+            epsilon=epsilon,
+            epsilon_step=epsilon_step,
+            deadline=deadline,
+            node_budget=node_budget,
+            heuristic=estimate,
+        )
+
+        stats = self._fresh_stats()
+        stats.update(counters)
+        stats["score_memory_bytes"] = workspace.memory_bytes()
+
+        if indices is None:
+            self.last_run_stats = stats
+            return None
+
+        path = [world.glyph_at_index(i) for i in indices]
+        return self._finish(path, stats)
+
+    # ----------------------------------------------------------------------
+    # INTERNAL: JUMP POINT SEARCH (fewest_steps)
+    # ----------------------------------------------------------------------
+    def _jump_point_search(
+        self,
+        start: PathGlyph,
+        goal: PathGlyph
+    ) -> Optional[List[PathGlyph]]:
+
+        world = self.world
+        workspace = self._scratch()
+        indices, counters = jump_point_search(
+            world,
+            workspace,
+            world.index_of(start.x, start.y),
+            world.index_of(goal.x, goal.y),
+        )
+
+        stats = self._fresh_stats()
+        stats.update(counters)
+        stats["score_memory_bytes"] = workspace.memory_bytes()
+
+        if indices is None:
+            self.last_run_stats = stats
+            return None
+
+        path = [world.glyph_at_index(i) for i in indices]
+        return self._finish(path, stats)
+
+    # ----------------------------------------------------------------------
+    # INTERNAL: HIERARCHICAL SEARCH (HPA*)
+    # ----------------------------------------------------------------------
+    def _hierarchical_search(
+        self,
+        start: PathGlyph,
+        goal: PathGlyph,
+        mode: str
+    ) -> Optional[List[PathGlyph]]:
+
+        world = self.world
+        atlas = self._atlas()
+
+        indices, counters = atlas.chart(
+            world.index_of(start.x, start.y),
+            world.index_of(goal.x, goal.y),
+            mode,
+        )
+
+        stats = self._fresh_stats()
+        stats.update(counters)
+        if not atlas.exact:
+            stats["suboptimality_bound"] = None
+
+        if indices is None:
+            self.last_run_stats = stats
+            return None
+
+        path = [world.glyph_at_index(i) for i in indices]
+        return self._finish(path, stats)
+
+    # ----------------------------------------------------------------------
+    # INTERNAL: BIDIRECTIONAL A*
+    # ----------------------------------------------------------------------
+    def _bidirectional_search(
+        self,
+        start: PathGlyph,
+        goal: PathGlyph,
+        mode: str,
+        probe: Optional[Search_Probe] = None,
+    ) -> Optional[List[PathGlyph]]:
+
+        world = self.world
+        forward = self._scratch()
+        backward = self._local.__dict__.get("backward_workspace")
+        if backward is None:
+            backward = self._local.backward_workspace = new_workspace(world)
+        h_straight, h_diagonal = self._octile_weights(mode)
+
+        indices, counters = bidirectional_a_star(
+            world,
+            forward,
+            backward,
+            world.index_of(start.x, start.y),
+            world.index_of(goal.x, goal.y),
+            mode,
+            h_straight,
+            h_diagonal,
+            probe=probe,
+        )
+
+        stats = self._fresh_stats()
+        stats.update(counters)
+        stats["score_memory_bytes"] = forward.memory_bytes() + backward.memory_bytes()
+
+        if indices is None:
+            self.last_run_stats = stats
+            return None
+
+        path = [world.glyph_at_index(i) for i in indices]
+        return self._finish(path, stats)
 
     # ----------------------------------------------------------------------
     # INTERNAL: A* SEARCH  (WITH METRICS)
@@ -58,43 +853,70 @@ class Saladin_Pathfinder:
         self,
         start: PathGlyph,
         goal: PathGlyph,
-        mode: str
+        mode: str,
+        probe: Optional[Search_Probe] = None,
     ) -> Optional[List[PathGlyph]]:
 
         # reset metrics
-        stats = {
-            "nodes_expanded": 0,
-            "path_length": 0,
-            "total_energy": 0.0,
-            "success": False,
-        }
+        stats = self._fresh_stats()
+        stats["pushes"] = 1
+        stats["suboptimality_bound"] = self.epsilon
+
+        # Instrumentation: a clock only when timing phases, a hook countdown
+        clock = time.perf_counter if probe is not None and probe.time_phases else None
+        sample_every = probe.sample_every if probe is not None and probe.hook is not None else 0
+        countdown = sample_every
+        max_open = 1
 
         open_set = []
         heapq.heappush(open_set, (0, start))
 
         came_from: Dict[PathGlyph, Optional[PathGlyph]] = {start: None}
         g_score: Dict[PathGlyph, float] = {start: 0}
+        closed = set()
+
+        def finish_stats() -> None:
+            stats["max_open_size"] = max_open
+            stats["score_memory_bytes"] = (
+                sys.getsizeof(g_score) + sys.getsizeof(came_from) + sys.getsizeof(closed)
+            )
 
         while open_set:
+            max_open = max(max_open, len(open_set))
             _, current = heapq.heappop(open_set)
+            stats["pops"] += 1
+
+            if current in closed:
+                if self.closed_set:
+                    stats["stale_pops"] += 1
+                    continue
+                stats["reexpansions"] += 1
+            closed.add(current)
             stats["nodes_expanded"] += 1
 
+            if sample_every:
+                countdown -= 1
+                if not countdown:
+                    countdown = sample_every
+                    probe.sample(
+                        self.world.index_of(current.x, current.y), g_score[current], len(open_set)
+                    )
+
             if current == goal:
+                finish_stats()
                 path = self._reconstruct_path(came_from, current)
+                return self._finish(path, stats)
 
-                stats["path_length"] = len(path) - 1
+            if clock is not None:
+                started = clock()
+            neighbours = self.world.neighbours(current)
+            if clock is not None:
+                probe.neighbour_time += clock() - started
 
-                # total energy cost
-                total_energy = 0.0
-                for i in range(1, len(path)):
-                    total_energy += self._movement_cost(path[i - 1], path[i])
-                stats["total_energy"] = total_energy
+            for neighbour in neighbours:
 
-                stats["success"] = True
-                self.last_run_stats = stats
-                return path
-
-            for neighbour in self.world.neighbours(current):
+                if self.closed_set and neighbour in closed:
+                    continue
 
                 if mode == "fewest_steps":
                     tentative = g_score[current] + 1
@@ -105,27 +927,115 @@ class Saladin_Pathfinder:
                     g_score[neighbour] = tentative
                     came_from[neighbour] = current
 
-                    priority = tentative + self._heuristic(neighbour, goal, mode)
+                    if clock is not None:
+                        started = clock()
+                        h = self._heuristic(neighbour, goal, mode)
+                        probe.heuristic_time += clock() - started
+                    else:
+                        h = self._heuristic(neighbour, goal, mode)
+
+                    priority = tentative + self.epsilon * h
                     heapq.heappush(open_set, (priority, neighbour))
+                    stats["pushes"] += 1
 
+        finish_stats()
         self.last_run_stats = stats
         return None
 
     # ----------------------------------------------------------------------
     # INTERNAL UTILITIES
     # ----------------------------------------------------------------------
+    def _octile_weights(self, mode: str) -> Tuple[float, float]:
+        """Heuristic price of one straight and one diagonal step."""
+        if mode == "fewest_steps":
+            return 1.0, 1.0
+        return self._min_cost, self._diagonal_min_cost
+
+    def _atlas(self) -> Cluster_Atlas:
+        """
+        The HPA* abstraction, built with default settings on first use and
+        rebuilt with the same settings after the terrain changes.
+        """
+        with self._lock:
+            atlas = self.atlas
+            if atlas is None:
+                self.atlas = Cluster_Atlas(self.world)
+            elif atlas.version != self.world.version:
+                self.atlas = Cluster_Atlas(
+                    self.world, atlas.cluster_size, exact=atlas.exact, smooth=atlas.smooth
+                )
+            return self.atlas
+
+    def _landmarks(self) -> Landmark_Atlas:
+        """
+        The ALT tables, built with default settings on first use and
+        rebuilt with the same settings after the terrain changes.
+        """
+        with self._lock:
+            landmarks = self.landmarks
+            if landmarks is None:
+                self.landmarks = Landmark_Atlas(self.world)
+            elif landmarks.version != self.world.version:
+                self.landmarks = Landmark_Atlas(self.world, landmarks.count, landmarks.active)
+            return self.landmarks
+
+    def _scratch(self) -> Search_Workspace:
+        """Score arrays for the index-based engines, allocated once per thread."""
+        workspace = self._local.__dict__.get("workspace")
+        if workspace is None:
+            workspace = self._local.workspace = new_workspace(self.world)
+        return workspace
+
+    @staticmethod
+    def _fresh_stats() -> Dict[str, object]:
+        """
+        Zeroed metrics. pops = nodes_expanded + stale_pops; reexpansions
+        counts pops of already-expanded cells when closed_set is off.
+        """
+        return {
+            "nodes_expanded": 0,
+            "pushes": 0,
+            "pops": 0,
+            "stale_pops": 0,
+            "reexpansions": 0,
+            "path_length": 0,
+            "total_energy": 0.0,
+            "success": False,
+            "suboptimality_bound": 1.0,
+        }
+
+    def _record_path(self, path: List[PathGlyph], stats: Dict[str, object]) -> None:
+        """Fill in the metrics of a found path."""
+        stats["path_length"] = len(path) - 1
+        stats["total_energy"] = self._path_energy(path)
+        stats["success"] = True
+
+    def _finish(self, path: List[PathGlyph], stats: Dict[str, object]) -> List[PathGlyph]:
+        """Record path metrics for a successful search and return the path."""
+        self._record_path(path, stats)
+        self.last_run_stats = stats
+        return path
+
     def _movement_cost(self, a: PathGlyph, b: PathGlyph) -> float:
         """
         Terrain cost + small diagonal penalty.
         """
         cost = self.world.cost_at(b)
         if a.is_diagonal_to(b):
-            cost += 0.4
+            cost += DIAGONAL_PENALTY
         return cost
 
+    def _path_energy(self, path: List[PathGlyph]) -> float:
+        """Total energy cost along a path."""
+        total_energy = 0.0
+        for i in range(1, len(path)):
+            total_energy += self._movement_cost(path[i - 1], path[i])
+        return total_energy
+
     def _heuristic(self, a: PathGlyph, b: PathGlyph, mode: str) -> float:
         """
-        Chebyshev distance heuristic.
+        Chebyshev distance for fewest_steps; octile distance priced at the
+        cheapest terrain (plus the diagonal penalty) for lowest_energy.
         """
         dx = abs(a.x - b.x)
         dy = abs(a.y - b.y)
@@ -133,7 +1043,8 @@ class Saladin_Pathfinder:
         if mode == "fewest_steps":
             return max(dx, dy)
         else:
-            return max(dx, dy) * minimum_traversable_cost()
+            diagonal = min(dx, dy)
+            return (max(dx, dy) - diagonal) * self._min_cost + diagonal * self._diagonal_min_cost
 
     def _reconstruct_path(
         self,
@@ -0,0 +1,166 @@
+"""
+search_stats.py
+---------------
+Per-query search metrics and the optional expansion probe.
+
+Search_Stats is the structured form of one query's metrics. The
+pathfinder hands it back together with the path (Course_Report), so
+callers never have to read shared pathfinder state afterwards.
+
+A Search_Probe rides along with one search. Its hook is called with
+(cell index, g, open-set size) for every sample_every-th expansion, and
+with time_phases the kernel times heuristic evaluation and neighbour
+generation separately. Without a probe the kernels do only one cheap
+check per expansion.
+
+Search_Budget is a ready-made hook that stops a search by raising
+Search_Cancelled once it has expanded too many nodes or run past its
+deadline.
+"""
+
+from dataclasses import dataclass, field, fields
+from typing import Callable, Dict, List, NamedTuple, Optional
+import time
+
+from runes.runes import PathGlyph
+
+# hook(cell index, g score, open-set size)
+Expansion_Hook = Callable[[int, float, int], None]
+
+
+class Search_Probe:
+    """
+    Instrumentation requested for one search.
+
+    Attributes:
+        hook: called for sampled expansions, or None
+        sample_every (int): call the hook on every n-th expansion
+        time_phases (bool): time heuristic and neighbour work
+        samples (int): hook calls made so far
+        heuristic_time (float): seconds spent computing heuristics
+        neighbour_time (float): seconds spent generating neighbours
+    """
+
+    __slots__ = ("hook", "sample_every", "time_phases", "samples", "heuristic_time", "neighbour_time")
+
+    def __init__(
+        self,
+        hook: Optional[Expansion_Hook] = None,
+        sample_every: int = 1,
+        time_phases: bool = False,
+    ):
+        if sample_every < 1:
+            raise ValueError("sample_every must be at least 1")
+        self.hook = hook
+        self.sample_every = sample_every
+        self.time_phases = time_phases
+        self.samples = 0
+        self.heuristic_time = 0.0
+        self.neighbour_time = 0.0
+
+    def sample(self, index: int, g: float, open_size: int) -> None:
+        """Forward one expansion to the hook."""
+        self.samples += 1
+        self.hook(index, g, open_size)
+
+
+class Search_Cancelled(Exception):
+    """
+    Raised out of a search stopped by its Search_Budget. reason is
+    "node_budget" or "deadline".
+    """
+
+    def __init__(self, reason: str, nodes_expanded: int):
+        super().__init__(f"search cancelled ({reason}) after {nodes_expanded} expansions")
+        self.reason = reason
+        self.nodes_expanded = nodes_expanded
+
+
+class Search_Budget:
+    """
+    Expansion hook that enforces a node budget and a deadline
+    (time.monotonic() seconds). Pass it with sample_every=check_every;
+    both limits are checked every check_every expansions, so a search
+    stops at most check_every nodes past its budget. The deadline
+    may be pushed back while the search runs (see extend).
+    """
+
+    def __init__(
+        self,
+        node_budget: Optional[int] = None,
+        deadline: Optional[float] = None,
+        check_every: int = 256,
+    ):
+        if node_budget is not None and node_budget < 1:
+            raise ValueError("node_budget must be at least 1")
+        self.node_budget = node_budget
+        self.deadline = deadline
+        self.check_every = check_every
+        self.expanded = 0
+
+    def extend(self, deadline: Optional[float]) -> None:
+        """Keep running until at least deadline (None: no deadline)."""
+        if self.deadline is not None:
+            self.deadline = None if deadline is None else max(self.deadline, deadline)
+
+    def check(self) -> None:
+        """Raise Search_Cancelled if the deadline has already passed."""
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise Search_Cancelled("deadline", self.expanded)
+
+    def __call__(self, index: int, g: float, open_size: int) -> None:
+        self.expanded += self.check_every
+        if self.node_budget is not None and self.expanded > self.node_budget:
+            raise Search_Cancelled("node_budget", self.expanded)
+        self.check()
+
+
+@dataclass
+class Search_Stats:
+    """
+    Metrics of one query.
+
+    wall_time covers the whole chart_course call, cache lookups included.
+    max_open_size is the largest open set (heap) seen, and
+    score_memory_bytes the memory of the g-score / parent storage the
+    search used. Fields an engine does not measure are None.
+    heuristic_time and neighbour_time are only set when phases were
+    timed. Engine-specific counters (cache, tiles, bidirectional sides,
+    ...) are kept in extra.
+    """
+    nodes_expanded: int = 0
+    pushes: int = 0
+    pops: int = 0
+    stale_pops: int = 0
+    reexpansions: int = 0
+    path_length: int = 0
+    total_energy: float = 0.0
+    success: bool = False
+    suboptimality_bound: Optional[float] = 1.0
+    wall_time: float = 0.0
+    max_open_size: Optional[int] = None
+    score_memory_bytes: Optional[int] = None
+    heuristic_time: Optional[float] = None
+    neighbour_time: Optional[float] = None
+    expansions_sampled: int = 0
+    extra: Dict[str, object] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, stats: Dict[str, object]) -> "Search_Stats":
+        """Build from a last_run_stats style dict; unknown keys go to extra."""
+        known = {f.name for f in fields(cls)} - {"extra"}
+        result = cls(**{key: value for key, value in stats.items() if key in known})
+        result.extra = {key: value for key, value in stats.items() if key not in known}
+        return result
+
+    def as_dict(self) -> Dict[str, object]:
+        """Flat dict in the last_run_stats layout."""
+        flat = {f.name: getattr(self, f.name) for f in fields(self) if f.name != "extra"}
+        flat.update(self.extra)
+        return flat
+
+
+class Course_Report(NamedTuple):
+    """A chart_course answer with the metrics of the search behind it."""
+    path: Optional[List[PathGlyph]]
+    stats: Search_Stats
@@ -0,0 +1,402 @@
+"""
+run_suite.py
+------------
+Reproducible benchmark suite for map loading and path search.
+
+For every map size and style (see world.map_smith) the suite generates a
+seeded map, writes it as JSON and in the binary format, and times
+Map_Anvil loading both. It then runs the same seeded journeys through
+chart_course for every engine in both modes, recording wall time,
+nodes expanded per second and path energy; preprocessing such as the
+HPA* atlas or landmark tables is timed separately. Peak Python memory
+is taken with tracemalloc in a separate pass, so it does not skew the
+timings. With --heuristics octile landmarks the indexed engine also runs
+with the ALT heuristic, and its saving in nodes expanded is reported.
+
+Results are written as JSON. Passing an earlier results file with
+--compare prints the speed ratio of every matching run, and flags runs
+whose paths cost a different total energy (a correctness regression,
+not a speed one).
+
+    python -m benchmarks.run_suite --sizes 64 128 256 --out bench.json
+    python -m benchmarks.run_suite --engines indexed --compare bench.json
+    python -m benchmarks.run_suite --engines indexed --heuristics octile landmarks
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import argparse
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from aris.hierarchy import Cluster_Atlas
+from aris.landmarks import Landmark_Atlas
+from aris.saladin_pathfinder import ENGINES, HEURISTICS, Saladin_Pathfinder
+from runes.runes import PathGlyph
+from world.grid_forge import Map_Anvil
+from world.map_smith import STYLES, forge_terrain, write_map
+from world.terrain_legends import TERRAIN_CODE_OF
+
+MODES = ("lowest_energy", "fewest_steps")
+
+# glyph is the slow reference engine; ask for it explicitly
+DEFAULT_ENGINES = ("indexed", "bidirectional", "jps", "hpa")
+DEFAULT_SIZES = (64, 128, 256)
+
+# Fields that identify one run when comparing results files
+RUN_KEY = ("size", "style", "engine", "heuristic", "mode")
+
+# Values of fields missing from older results files
+RUN_DEFAULTS = {"heuristic": "octile"}
+
+# Engines that can use a heuristic other than octile
+HEURISTIC_ENGINES = ("indexed",)
+
+_WALL = TERRAIN_CODE_OF["wall_of_ancients"]
+
+
+def run_suite(
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    styles: Sequence[str] = STYLES,
+    engines: Sequence[str] = DEFAULT_ENGINES,
+    queries: int = 20,
+    seed: int = 0,
+    wall_density: float = 0.2,
+    measure_memory: bool = True,
+    maps_dir: Optional[str] = None,
+    heuristics: Sequence[str] = ("octile",),
+) -> Dict[str, object]:
+    """
+    Run every (size, style) x engine x heuristic x mode combination and
+    return the results: {"meta": ..., "loads": [...], "runs": [...]}.
+    Heuristics other than octile only run on HEURISTIC_ENGINES.
+    """
+    for engine in engines:
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine: {engine}")
+    for heuristic in heuristics:
+        if heuristic not in HEURISTICS:
+            raise ValueError(f"Unknown heuristic: {heuristic}")
+
+    loads: List[Dict[str, object]] = []
+    runs: List[Dict[str, object]] = []
+
+    with tempfile.TemporaryDirectory() as scratch:
+        folder = Path(maps_dir or scratch)
+        folder.mkdir(parents=True, exist_ok=True)
+
+        for size in sizes:
+            for style in styles:
+                codes = forge_terrain(size, size, seed, style, wall_density)
+                name = f"{style}_{size}_s{seed}"
+                json_path = write_map(folder / f"{name}.json", codes, size, size)
+                binary_path = write_map(folder / f"{name}.anvil", codes, size, size)
+
+                world, load = _time_loads(json_path, binary_path, measure_memory)
+                load.update(size=size, style=style, wall_density=wall_density, seed=seed)
+                loads.append(load)
+
+                journeys = _journeys(codes, size, queries, seed)
+                for engine in engines:
+                    for heuristic in heuristics:
+                        if heuristic != "octile" and engine not in HEURISTIC_ENGINES:
+                            continue
+                        for mode in MODES:
+                            run = _time_queries(
+                                world, engine, mode, journeys, measure_memory, heuristic
+                            )
+                            run.update(size=size, style=style, wall_density=wall_density, seed=seed)
+                            runs.append(run)
+
+    return {"meta": _meta(queries, seed), "loads": loads, "runs": runs}
+
+
+def compare_results(
+    baseline: Dict[str, object],
+    current: Dict[str, object],
+) -> List[Dict[str, object]]:
+    """
+    Match runs of two results files by (size, style, engine, heuristic,
+    mode).
+    speedup > 1 means current is faster; energy_changed marks runs whose
+    summed path energy differs.
+    """
+    before = {_run_key(run): run for run in baseline["runs"]}
+    rows = []
+    for run in current["runs"]:
+        old = before.get(_run_key(run))
+        if old is None:
+            continue
+        rows.append({
+            **dict(zip(RUN_KEY, _run_key(run))),
+            "nodes_per_second": run["nodes_per_second"],
+            "baseline_nodes_per_second": old["nodes_per_second"],
+            "speedup": old["seconds"] / run["seconds"] if run["seconds"] else None,
+            "energy_changed": abs(old["total_energy"] - run["total_energy"]) > 1e-6 * max(1.0, old["total_energy"]),
+        })
+    return rows
+
+
+def heuristic_gains(results: Dict[str, object]) -> List[Dict[str, object]]:
+    """
+    For every run with a heuristic other than octile, its nodes expanded
+    against the octile run of the same map, engine and mode.
+    expansion_ratio < 1 means the heuristic saved work.
+    """
+    octile = {
+        _run_key(run): run for run in results["runs"] if _run_key(run)[3] == "octile"
+    }
+    rows = []
+    for run in results["runs"]:
+        size, style, engine, heuristic, mode = _run_key(run)
+        baseline = octile.get((size, style, engine, "octile", mode))
+        if heuristic == "octile" or baseline is None:
+            continue
+        rows.append({
+            "size": size,
+            "style": style,
+            "engine": engine,
+            "heuristic": heuristic,
+            "mode": mode,
+            "nodes_expanded": run["nodes_expanded"],
+            "baseline_nodes_expanded": baseline["nodes_expanded"],
+            "expansion_ratio": (
+                run["nodes_expanded"] / baseline["nodes_expanded"]
+                if baseline["nodes_expanded"] else None
+            ),
+            "speedup": baseline["seconds"] / run["seconds"] if run["seconds"] else None,
+            "preprocess_seconds": run["preprocess_seconds"],
+            "preprocess_bytes": run.get("preprocess_bytes", 0),
+        })
+    return rows
+
+
+def _run_key(run: Dict[str, object]) -> Tuple:
+    return tuple(run.get(key, RUN_DEFAULTS.get(key)) for key in RUN_KEY)
+
+
+# ---------------------------------------------------------------
+# INTERNAL: MEASUREMENTS
+# ---------------------------------------------------------------
+
+def _time_loads(
+    json_path: Path,
+    binary_path: Path,
+    measure_memory: bool,
+) -> Tuple[Map_Anvil, Dict[str, object]]:
+    started = time.perf_counter()
+    world = Map_Anvil(str(json_path))
+    json_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    Map_Anvil(str(binary_path))
+    binary_seconds = time.perf_counter() - started
+
+    load = {
+        "json_bytes": json_path.stat().st_size,
+        "json_load_seconds": json_seconds,
+        "binary_load_seconds": binary_seconds,
+    }
+    if measure_memory:
+        tracemalloc.start()
+        Map_Anvil(str(json_path))
+        load["json_load_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return world, load
+
+
+def _time_queries(
+    world: Map_Anvil,
+    engine: str,
+    mode: str,
+    journeys: Iterable[Tuple[PathGlyph, PathGlyph]],
+    measure_memory: bool,
+    heuristic: str = "octile",
+) -> Dict[str, object]:
+    journeys = list(journeys)
+
+    # The HPA* abstraction and landmark tables are built up front and
+    # timed on their own
+    atlas = landmarks = None
+    preprocess_seconds = 0.0
+    preprocess_bytes = 0
+    started = time.perf_counter()
+    if engine == "hpa":
+        atlas = Cluster_Atlas(world)
+        preprocess_bytes = atlas.build_stats["approx_bytes"]
+    if heuristic == "landmarks":
+        landmarks = Landmark_Atlas(world)
+        landmarks.landmarks(mode)
+        preprocess_bytes = landmarks.memory_bytes()
+    preprocess_seconds = time.perf_counter() - started
+
+    def new_pathfinder() -> Saladin_Pathfinder:
+        return Saladin_Pathfinder(
+            world, mode=mode, engine=engine, atlas=atlas, heuristic=heuristic, landmarks=landmarks
+        )
+
+    pathfinder = new_pathfinder()
+    nodes = 0
+    successes = 0
+    energy = 0.0
+
+    started = time.perf_counter()
+    for hearth, pythonia in journeys:
+        pathfinder.chart_course(hearth, pythonia)
+        stats = pathfinder.last_run_stats
+        nodes += stats["nodes_expanded"]
+        if stats["success"]:
+            successes += 1
+            energy += stats["total_energy"]
+    seconds = time.perf_counter() - started
+
+    run = {
+        "engine": engine,
+        "heuristic": heuristic,
+        "mode": mode,
+        "preprocess_seconds": preprocess_seconds,
+        "preprocess_bytes": preprocess_bytes,
+        "queries": len(journeys),
+        "successes": successes,
+        "seconds": seconds,
+        "mean_query_ms": 1000.0 * seconds / max(len(journeys), 1),
+        "nodes_expanded": nodes,
+        "nodes_per_second": nodes / seconds if seconds else 0.0,
+        "total_energy": energy,
+    }
+
+    if measure_memory:
+        # A fresh pathfinder, so its scratch arrays count towards the peak
+        # (prebuilt tables do not)
+        tracemalloc.start()
+        pathfinder = new_pathfinder()
+        for hearth, pythonia in journeys:
+            pathfinder.chart_course(hearth, pythonia)
+        run["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return run
+
+
+def _journeys(codes, size: int, count: int, seed: int) -> List[Tuple[PathGlyph, PathGlyph]]:
+    """count seeded (hearth, pythonia) pairs of passable cells."""
+    rng = random.Random(seed)
+    open_cells = [index for index, code in enumerate(codes) if code != _WALL]
+    journeys = []
+    for _ in range(count):
+        start, goal = rng.choice(open_cells), rng.choice(open_cells)
+        journeys.append((PathGlyph(start % size, start // size), PathGlyph(goal % size, goal // size)))
+    return journeys
+
+
+def _meta(queries: int, seed: int) -> Dict[str, object]:
+    meta = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "queries": queries,
+        "seed": seed,
+    }
+    try:
+        import resource
+    except ImportError:
+        return meta
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    meta["max_rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return meta
+
+
+def _print_runs(results: Dict[str, object]) -> None:
+    for load in results["loads"]:
+        print(
+            f"load  {load['style']:>5} {load['size']:>5}: "
+            f"json {load['json_load_seconds'] * 1000:8.1f} ms  "
+            f"binary {load['binary_load_seconds'] * 1000:8.1f} ms"
+        )
+    for run in results["runs"]:
+        print(
+            f"{_label(run):>17} {run['mode']:>13} {run['style']:>5} {run['size']:>5}: "
+            f"{run['mean_query_ms']:8.2f} ms/query  {run['nodes_per_second']:10.0f} nodes/s  "
+            f"{run['successes']}/{run['queries']} found"
+        )
+
+
+def _print_gains(rows: List[Dict[str, object]]) -> None:
+    for row in rows:
+        ratio = "   n/a" if row["expansion_ratio"] is None else f"{row['expansion_ratio']:6.2f}"
+        print(
+            f"{_label(row):>17} {row['mode']:>13} {row['style']:>5} {row['size']:>5}: "
+            f"nodes x{ratio} of octile  "
+            f"preprocess {row['preprocess_seconds'] * 1000:8.1f} ms "
+            f"{row['preprocess_bytes'] / 1024:8.0f} KiB"
+        )
+
+
+def _print_comparison(rows: List[Dict[str, object]]) -> None:
+    for row in rows:
+        speedup = "   n/a" if row["speedup"] is None else f"{row['speedup']:6.2f}x"
+        flag = "  ENERGY CHANGED" if row["energy_changed"] else ""
+        print(
+            f"{_label(row):>17} {row['mode']:>13} {row['style']:>5} {row['size']:>5}: "
+            f"{speedup}{flag}"
+        )
+
+
+def _label(run: Dict[str, object]) -> str:
+    """Engine name, with the heuristic unless it is octile."""
+    heuristic = run.get("heuristic", "octile")
+    return run["engine"] if heuristic == "octile" else f"{run['engine']}/{heuristic}"
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark map loading and path search.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--styles", nargs="+", choices=STYLES, default=list(STYLES))
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=list(DEFAULT_ENGINES))
+    parser.add_argument("--heuristics", nargs="+", choices=HEURISTICS, default=["octile"])
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--walls", type=float, default=0.2, help="target share of wall cells")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc passes")
+    parser.add_argument("--maps-dir", help="keep the generated maps here")
+    parser.add_argument("--out", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    results = run_suite(
+        sizes=args.sizes,
+        styles=args.styles,
+        engines=args.engines,
+        queries=args.queries,
+        seed=args.seed,
+        wall_density=args.walls,
+        measure_memory=not args.no_memory,
+        maps_dir=args.maps_dir,
+        heuristics=args.heuristics,
+    )
+    _print_runs(results)
+    gains = heuristic_gains(results)
+    if gains:
+        results["heuristic_gains"] = gains
+        _print_gains(gains)
+
+    status = 0
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        rows = compare_results(baseline, results)
+        results["comparison"] = rows
+        _print_comparison(rows)
+        if any(row["energy_changed"] for row in rows):
+            status = 1
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, indent=2))
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
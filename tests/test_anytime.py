@@ -0,0 +1,113 @@
+# tests/test_anytime.py
+"""
+Tests for the anytime (ARA*) search: optimal when left to finish,
+bounded best-so-far answers under expansion and time budgets.
+"""
+
+import random
+import time
+
+import pytest
+
+from runes.runes import PathGlyph
+from world.grid_forge import Map_Anvil
+from world.map_smith import forge_terrain, write_map
+from aris.saladin_pathfinder import Saladin_Pathfinder
+
+SIZE = 48
+
+@pytest.fixture
+def rooms(tmp_path):
+    codes = forge_terrain(SIZE, SIZE, seed=8, style="rooms", wall_density=0.25)
+    return Map_Anvil(str(write_map(tmp_path / "rooms.json", codes, SIZE, SIZE)))
+
+def _journeys(world, count):
+    """count seeded pairs of cells joined by some path."""
+    rng = random.Random(4)
+    cells = [i for i in range(SIZE * SIZE) if world.is_passable_index(i)]
+    journeys = []
+    while len(journeys) < count:
+        a, b = rng.sample(cells, 2)
+        if world.components().reachable(a, b):
+            journeys.append((world.glyph_at_index(a), world.glyph_at_index(b)))
+    return journeys
+
+@pytest.mark.parametrize("mode", ["lowest_energy", "fewest_steps"])
+def test_unbounded_search_ends_optimal(rooms, mode):
+    plain = Saladin_Pathfinder(rooms, mode=mode)
+    pf = Saladin_Pathfinder(rooms, mode=mode, heuristic="landmarks")
+    for hearth, pythonia in _journeys(rooms, 10):
+        expected = plain.chart_course(hearth, pythonia)
+        energy = plain.last_run_stats["total_energy"]
+
+        path = pf.chart_course_anytime(hearth, pythonia)
+        stats = pf.last_run_stats
+        assert path[0] == hearth and path[-1] == pythonia
+        assert len(path) == len(expected)
+        if mode == "lowest_energy":
+            assert stats["total_energy"] == pytest.approx(energy)
+        assert stats["suboptimality_bound"] == 1.0 and stats["stopped"] is None
+        assert stats["solutions"][-1]["cost"] == pytest.approx(
+            stats["total_energy"] if mode == "lowest_energy" else len(path) - 1
+        )
+
+def test_budgets_return_bounded_best_so_far(rooms):
+    pf = Saladin_Pathfinder(rooms)
+    hearth, pythonia = _journeys(rooms, 2)[1]
+    pf.chart_course(hearth, pythonia)
+    optimum = pf.last_run_stats["total_energy"]
+
+    improved = 0
+    for budget in (20, 100, 400, 1600):
+        path = pf.chart_course_anytime(hearth, pythonia, node_budget=budget)
+        stats = pf.last_run_stats
+        assert stats["nodes_expanded"] <= budget
+        if stats["stopped"] is None:
+            assert stats["suboptimality_bound"] == 1.0
+            break
+        assert stats["stopped"] == "node_budget"
+        if path is not None and stats["suboptimality_bound"] is not None:
+            improved += 1
+            assert stats["total_energy"] <= stats["suboptimality_bound"] * optimum + 1e-9
+            costs = [s["cost"] for s in stats["solutions"]]
+            assert costs == sorted(costs, reverse=True)
+    assert improved
+
+def test_deadline_stops_the_search(rooms):
+    pf = Saladin_Pathfinder(rooms)
+    hearth, pythonia = PathGlyph(0, 0), PathGlyph(SIZE - 1, SIZE - 1)
+    rooms.apply_edits([(hearth, "WG"), (pythonia, "WG")])
+
+    pf.chart_course_anytime(hearth, pythonia, deadline=time.monotonic() - 1)
+    stats = pf.last_run_stats
+    assert stats["stopped"] == "deadline" and stats["passes"] == 0
+    assert stats["nodes_expanded"] <= 256
+
+    assert pf.chart_course_anytime(hearth, pythonia, time_budget=5.0)[-1] == pythonia
+
+def test_trivial_and_unreachable_queries(tmp_path):
+    file = tmp_path / "walled.json"
+    file.write_text("""
+    [
+        ["WG", "WA", "WG"]
+    ]
+    """)
+    pf = Saladin_Pathfinder(Map_Anvil(str(file)))
+    assert pf.chart_course_anytime(PathGlyph(0, 0), PathGlyph(0, 0)) == [PathGlyph(0, 0)]
+    assert pf.chart_course_anytime(PathGlyph(0, 0), PathGlyph(2, 0)) is None
+    assert pf.last_run_stats["unreachable"] is True
+
+def test_diagonals_priced_on_narrow_maps(tmp_path):
+    # On a two-wide map a diagonal offset equals a straight one
+    codes = forge_terrain(2, 6, seed=3, style="open", wall_density=0.0)
+    world = Map_Anvil(str(write_map(tmp_path / "narrow.json", codes, 2, 6)))
+    pf = Saladin_Pathfinder(world)
+    for hearth, pythonia in [(PathGlyph(0, 5), PathGlyph(1, 1)), (PathGlyph(1, 0), PathGlyph(0, 5))]:
+        pf.chart_course(hearth, pythonia)
+        optimum = pf.last_run_stats["total_energy"]
+
+        path = pf.chart_course_anytime(hearth, pythonia)
+        stats = pf.last_run_stats
+        assert stats["stopped"] is None and stats["suboptimality_bound"] == 1.0
+        assert stats["total_energy"] == pytest.approx(optimum)
+        assert stats["solutions"][-1]["cost"] == pytest.approx(pf._path_energy(path))
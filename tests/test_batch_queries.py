@@ -0,0 +1,53 @@
+# tests/test_batch_queries.py
+"""
+Tests for Saladin_Pathfinder.chart_courses: batched queries must give
+the same answers as one chart_course call per pair.
+"""
+
+import pytest
+
+from runes.runes import PathGlyph
+from world.grid_forge import Map_Anvil
+from aris.saladin_pathfinder import Saladin_Pathfinder
+
+def _world(tmp_path):
+    file = tmp_path / "batch.json"
+    file.write_text("""
+    [
+        ["WG", "FR", "FR", "DD", "WG", "WG"],
+        ["WG", "WA", "WA", "DD", "MM", "WG"],
+        ["FL", "FR", "WA", "SM", "MM", "WG"],
+        ["WG", "FR", "WA", "WG", "WA", "FR"],
+        ["WG", "WG", "DD", "WA", "WA", "WG"]
+    ]
+    """)
+    return Map_Anvil(str(file))
+
+@pytest.mark.parametrize("group_by", ["goal", "start", "auto"])
+@pytest.mark.parametrize("mode", ["fewest_steps", "lowest_energy"])
+def test_batch_matches_single_queries(tmp_path, mode, group_by):
+    world = _world(tmp_path)
+    pf = Saladin_Pathfinder(world, mode=mode)
+
+    journeys = [
+        (PathGlyph(0, 0), PathGlyph(5, 4)),
+        (PathGlyph(3, 4), PathGlyph(5, 4)),
+        (PathGlyph(1, 1), PathGlyph(5, 4)),   # start on a wall
+        (PathGlyph(0, 4), PathGlyph(0, 0)),
+        (PathGlyph(5, 4), PathGlyph(5, 4)),
+        (PathGlyph(0, 0), PathGlyph(2, 2)),   # goal is a wall
+    ]
+
+    paths = pf.chart_courses(journeys, group_by=group_by)
+    batch_stats = pf.last_batch_stats
+
+    for (hearth, pythonia), path, stats in zip(journeys, paths, batch_stats):
+        expected = pf.chart_course(hearth, pythonia)
+        if expected is None:
+            assert path is None and stats["success"] is False
+            continue
+        assert path[0] == hearth and path[-1] == pythonia
+        if mode == "fewest_steps":
+            assert stats["path_length"] == pf.last_run_stats["path_length"]
+        else:
+            assert stats["total_energy"] == pytest.approx(pf.last_run_stats["total_energy"])
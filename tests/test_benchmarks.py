@@ -0,0 +1,68 @@
+# tests/test_benchmarks.py
+"""
+Tests for the procedural map generator and the benchmark runner.
+"""
+
+import json
+
+import pytest
+
+from world.grid_forge import Map_Anvil
+from world.map_smith import STYLES, forge_terrain, write_map
+from world.terrain_legends import TERRAIN_CODE_OF
+from benchmarks.run_suite import compare_results, heuristic_gains, main, run_suite
+
+WALL = TERRAIN_CODE_OF["wall_of_ancients"]
+
+@pytest.mark.parametrize("style", STYLES)
+def test_generator_is_seeded_and_loadable(tmp_path, style):
+    codes = forge_terrain(40, 30, seed=5, style=style, wall_density=0.25)
+    assert codes == forge_terrain(40, 30, seed=5, style=style, wall_density=0.25)
+    assert codes != forge_terrain(40, 30, seed=6, style=style, wall_density=0.25)
+    assert len(codes) == 40 * 30
+    assert codes.count(WALL) == pytest.approx(0.25 * 40 * 30, abs=1)
+
+    for name in ("map.json", "map.anvil"):
+        world = Map_Anvil(str(write_map(tmp_path / name, codes, 40, 30)))
+        assert (world.width, world.height) == (40, 30)
+        assert bytes(world.terrain_codes) == codes.tobytes()
+
+def test_terrain_weights_and_dense_maze():
+    codes = forge_terrain(20, 20, seed=1, wall_density=0.0, terrain_weights={"FR": 1})
+    assert set(codes) == {TERRAIN_CODE_OF["forest_of_reflections"]}
+
+    # A fully walled maze keeps every structural wall: odd x and odd y
+    maze = forge_terrain(21, 21, seed=1, style="maze", wall_density=1.0)
+    assert all(maze[y * 21 + x] == WALL for y in range(1, 21, 2) for x in range(1, 21, 2))
+
+    with pytest.raises(ValueError):
+        forge_terrain(10, 10, style="caves")
+    with pytest.raises(ValueError):
+        forge_terrain(10, 10, terrain_weights={"WA": 1})
+
+def test_suite_writes_comparable_results(tmp_path):
+    results = run_suite(sizes=[16], styles=["open"], engines=["indexed"], queries=3)
+    assert len(results["loads"]) == 1 and len(results["runs"]) == 2
+    run = results["runs"][0]
+    assert run["queries"] == 3 and run["peak_bytes"] > 0
+    assert run["nodes_per_second"] > 0
+
+    rows = compare_results(results, results)
+    assert len(rows) == 2 and not any(row["energy_changed"] for row in rows)
+
+    out = tmp_path / "bench.json"
+    assert main(["--sizes", "16", "--styles", "maze", "--engines", "jps", "--queries", "2",
+                 "--no-memory", "--out", str(out)]) == 0
+    assert json.loads(out.read_text())["runs"][0]["engine"] == "jps"
+
+def test_landmark_runs_report_their_gains():
+    results = run_suite(sizes=[16], styles=["rooms"], engines=["indexed", "jps"],
+                        heuristics=["octile", "landmarks"], queries=3, measure_memory=False)
+    # Landmarks only run on the indexed engine
+    assert len(results["runs"]) == 6
+
+    gains = heuristic_gains(results)
+    assert [row["mode"] for row in gains] == ["lowest_energy", "fewest_steps"]
+    for row in gains:
+        assert row["heuristic"] == "landmarks" and row["expansion_ratio"] <= 1.0
+        assert row["preprocess_seconds"] > 0 and row["preprocess_bytes"] > 0
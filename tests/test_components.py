@@ -0,0 +1,148 @@
+# tests/test_components.py
+"""
+Tests for the Component_Index: labels match flood fills, stay correct
+under terrain edits, and let the pathfinder reject impossible queries
+without searching.
+"""
+
+import random
+
+import pytest
+
+from runes.runes import PathGlyph
+from world.cost_profiles import Cost_Profile
+from world.grid_forge import Map_Anvil
+from world.map_codex import convert_to_tiled
+from world.map_smith import forge_terrain, write_map
+from world.tiled_anvil import Tiled_Anvil
+from aris.saladin_pathfinder import Saladin_Pathfinder
+
+def _regions(world):
+    """Flood-filled regions via neighbours(): cell index -> region id."""
+    region = {}
+    for y in range(world.height):
+        for x in range(world.width):
+            start = PathGlyph(x, y)
+            if not world.is_traversable(x, y) or world.index_of(x, y) in region:
+                continue
+            stack = [start]
+            region[world.index_of(x, y)] = len(region)
+            marker = region[world.index_of(x, y)]
+            while stack:
+                for near in world.neighbours(stack.pop()):
+                    index = world.index_of(near.x, near.y)
+                    if index not in region:
+                        region[index] = marker
+                        stack.append(near)
+    return region
+
+def _assert_matches(world):
+    index = world.components()
+    region = _regions(world)
+    pairs = set()
+    for cell in range(world.width * world.height):
+        label = index.label_at(cell)
+        assert (label == 0) == (cell not in region)
+        if label:
+            pairs.add((label, region[cell]))
+    # One label per region and one region per label
+    assert len(pairs) == len({l for l, _ in pairs}) == len({r for _, r in pairs})
+    assert index.component_count == len(pairs)
+
+@pytest.mark.parametrize("style", ["open", "rooms", "maze"])
+def test_labels_match_flood_fill(tmp_path, style):
+    codes = forge_terrain(37, 23, seed=5, style=style, wall_density=0.45)
+    world = Map_Anvil(str(write_map(tmp_path / "m.json", codes, 37, 23)))
+    _assert_matches(world)
+
+def test_labels_follow_edits(tmp_path):
+    codes = forge_terrain(24, 24, seed=9, style="open", wall_density=0.6)
+    world = Map_Anvil(str(write_map(tmp_path / "m.json", codes, 24, 24)))
+    index = world.components()
+    rng = random.Random(3)
+
+    for _ in range(80):
+        batch = [
+            (PathGlyph(rng.randrange(24), rng.randrange(24)), rng.choice(["WA", "WG", "MM"]))
+            for _ in range(rng.randint(1, 4))
+        ]
+        world.apply_edits(batch)
+        _assert_matches(world)
+
+    assert index.merges > 0 and index.rebuilds > 1
+
+def test_opening_a_gap_merges_regions(tmp_path):
+    file = tmp_path / "split.json"
+    file.write_text("""
+    [
+        ["WG", "WA", "WG"],
+        ["WG", "WA", "WG"],
+        ["WG", "WA", "WG"]
+    ]
+    """)
+    world = Map_Anvil(str(file))
+    index = world.components()
+    assert index.component_count == 2
+    assert not index.reachable(0, 2)
+
+    world.set_terrain(PathGlyph(1, 2), "WG")
+    assert index.component_count == 1 and index.reachable(0, 2)
+    assert index.rebuilds == 1
+
+    world.set_terrain(PathGlyph(1, 2), "WA")
+    assert index.component_count == 2
+
+def test_wall_start_and_wall_goal(tmp_path):
+    file = tmp_path / "walls.json"
+    file.write_text("""
+    [
+        ["WG", "WA", "WA", "WG"],
+        ["WG", "WA", "WA", "WG"]
+    ]
+    """)
+    index = Map_Anvil(str(file)).components()
+
+    assert index.reachable(2, 3)       # a wall start may step out east
+    assert not index.reachable(2, 0)
+    assert not index.reachable(0, 1)   # walls are never goals
+
+def test_pathfinder_rejects_without_searching(tmp_path):
+    codes = forge_terrain(30, 30, seed=1, style="open", wall_density=0.1)
+    codes[0] = codes[-1] = 0
+    world = Map_Anvil(str(write_map(tmp_path / "m.json", codes, 30, 30)))
+    world.apply_edits([(PathGlyph(15, y), "WA") for y in range(30)])
+
+    pf = Saladin_Pathfinder(world)
+    assert pf.chart_course(PathGlyph(0, 0), PathGlyph(29, 29)) is None
+    assert pf.last_run_stats["unreachable"] is True
+    assert pf.last_run_stats["nodes_expanded"] == 0
+
+    world.set_terrain(PathGlyph(15, 10), "WG")
+    assert pf.chart_course(PathGlyph(0, 0), PathGlyph(29, 29)) is not None
+
+def test_profile_views_have_their_own_regions(tmp_path):
+    file = tmp_path / "moat.json"
+    file.write_text("""
+    [
+        ["WG", "SM", "WG"]
+    ]
+    """)
+    world = Map_Anvil(str(file))
+    landlubber = world.with_profile(Cost_Profile.from_overrides("landlubber", {"SM": float("inf")}))
+
+    assert world.components().reachable(0, 2)
+    assert not landlubber.components().reachable(0, 2)
+    assert landlubber.components() is not world.components()
+
+    world.set_terrain(PathGlyph(1, 0), "WG")
+    assert landlubber.components().reachable(0, 2)
+
+def test_tiled_worlds_are_searched_unlabelled(tmp_path):
+    codes = forge_terrain(16, 16, seed=0)
+    codes[0] = codes[-1] = 0
+    file = write_map(tmp_path / "m.json", codes, 16, 16)
+    tiled = Tiled_Anvil(str(convert_to_tiled(file, tile_size=8)))
+
+    with pytest.raises(ValueError):
+        tiled.components()
+    assert Saladin_Pathfinder(tiled).chart_course(PathGlyph(0, 0), PathGlyph(15, 15))
@@ -0,0 +1,119 @@
+# tests/test_cost_profiles.py
+"""
+Tests for terrain cost profiles: compiled views of one loaded map priced
+for different travellers.
+"""
+
+import pytest
+
+from runes.runes import PathGlyph
+from world.cost_profiles import PROFILES, STANDARD, Cost_Profile, resolve_profile
+from world.grid_forge import Map_Anvil
+from aris.incremental_planner import Incremental_Planner
+from aris.path_cache import Course_Cache
+from aris.saladin_pathfinder import ENGINES, Saladin_Pathfinder
+
+# A ridge of shadow_mountain straight across the middle, grassland around it
+RIDGE_MAP = """
+[
+    ["WG", "WG", "WG", "WG", "WG", "WG", "WG"],
+    ["WG", "FR", "FR", "FR", "FR", "FR", "WG"],
+    ["SM", "SM", "SM", "SM", "SM", "SM", "SM"],
+    ["WG", "FR", "FR", "FR", "FR", "FR", "WG"],
+    ["WG", "WG", "WG", "WG", "WG", "WG", "WG"]
+]
+"""
+
+@pytest.fixture
+def ridge(tmp_path):
+    file = tmp_path / "ridge.json"
+    file.write_text(RIDGE_MAP)
+    return Map_Anvil(str(file))
+
+def test_profile_changes_route_without_touching_map(ridge):
+    hearth, pythonia = PathGlyph(3, 0), PathGlyph(3, 4)
+    standard = Saladin_Pathfinder(ridge)
+    goat = Saladin_Pathfinder(ridge, profile="mountain_goat")
+
+    goat.chart_course(hearth, pythonia)
+    assert goat.last_run_stats["total_energy"] == pytest.approx(2.0 + 1.5 + 2.0 + 1.0)
+    standard.chart_course(hearth, pythonia)
+    assert standard.last_run_stats["total_energy"] == pytest.approx(2.0 + 5.0 + 2.0 + 1.0)
+
+    assert ridge.cost_at(PathGlyph(0, 2)) == 5.0
+    assert ridge.with_profile(PROFILES["mountain_goat"]) is goat.world
+    assert ridge.with_profile(STANDARD) is ridge
+
+@pytest.mark.parametrize("engine", ["indexed", "glyph", "bidirectional", "hpa"])
+def test_profiled_engines_stay_optimal(ridge, engine):
+    """Engines with the profile's heuristic match a heuristic-free Dijkstra."""
+    profile = {"whispering_grassland": 3.0, "SM": 1.2}
+    pf = Saladin_Pathfinder(ridge, engine=engine, profile=profile)
+    assert pf._min_cost == pytest.approx(1.2)
+
+    journeys = [(PathGlyph(0, 0), PathGlyph(6, 4)), (PathGlyph(6, 0), PathGlyph(1, 3))]
+    pf.chart_courses(journeys)
+    for (hearth, pythonia), expected in zip(journeys, pf.last_batch_stats):
+        pf.chart_course(hearth, pythonia)
+        assert pf.last_run_stats["total_energy"] == pytest.approx(expected["total_energy"])
+
+def test_impassable_override_and_edits_follow_view(ridge):
+    view = ridge.with_profile(Cost_Profile.from_overrides("no_climb", {"SM": float("inf")}))
+    pf = Saladin_Pathfinder(ridge, profile=view.profile)
+    assert pf.chart_course(PathGlyph(3, 0), PathGlyph(3, 4)) is None
+
+    ridge.set_terrain(PathGlyph(6, 2), "WG")
+    assert view.version == ridge.version == 1
+    assert view.is_traversable(6, 2) and view.cost_at(PathGlyph(6, 2)) == 1.0
+    assert PathGlyph(6, 2) in pf.chart_course(PathGlyph(3, 0), PathGlyph(3, 4))
+
+def test_cache_keeps_profiles_apart(ridge):
+    cache = Course_Cache(ridge)
+    hearth, pythonia = PathGlyph(3, 0), PathGlyph(3, 4)
+
+    Saladin_Pathfinder(ridge, course_cache=cache).chart_course(hearth, pythonia)
+    goat = Saladin_Pathfinder(ridge, course_cache=cache, profile="mountain_goat")
+    goat.chart_course(hearth, pythonia)
+    assert goat.last_run_stats["cache"] == "miss"
+    assert goat.last_run_stats["total_energy"] == pytest.approx(6.5)
+
+def test_terrain_cheaper_than_diagonal_penalty(tmp_path):
+    # Two straight WG steps (0.2) undercut a penalised diagonal (0.5)
+    file = tmp_path / "cheap.json"
+    file.write_text("""
+    [
+        ["WG", "FR", "WG", "WG"],
+        ["WG", "WG", "WG", "WG"],
+        ["WA", "WG", "FR", "WG"],
+        ["WG", "WG", "WG", "FR"]
+    ]
+    """)
+    world = Map_Anvil(str(file))
+    cheap = Cost_Profile.from_overrides("cheap_grass", {"WG": 0.1})
+    assert cheap.diagonal_minimum_cost == pytest.approx(0.2)
+    hearth, pythonia = PathGlyph(2, 3), PathGlyph(3, 1)
+
+    pathfinders = [Saladin_Pathfinder(world, engine=engine, profile=cheap) for engine in ENGINES]
+    pathfinders += [
+        Saladin_Pathfinder(world, profile=cheap, heuristic="landmarks"),
+        Saladin_Pathfinder(world, profile=cheap, closed_set=False),
+    ]
+    for pf in pathfinders:
+        pf.chart_course(hearth, pythonia)
+        assert pf.last_run_stats["total_energy"] == pytest.approx(0.5)
+    pf.chart_course_anytime(hearth, pythonia)
+    assert pf.last_run_stats["total_energy"] == pytest.approx(0.5)
+
+    planner = Incremental_Planner(world.with_profile(cheap), hearth, pythonia)
+    assert pf._path_energy(planner.plan()) == pytest.approx(0.5)
+    planner.close()
+
+def test_bad_profiles_rejected():
+    with pytest.raises(ValueError):
+        resolve_profile("pegasus")
+    with pytest.raises(ValueError):
+        resolve_profile({"LAVA": 1.0})
+    with pytest.raises(ValueError):
+        resolve_profile({"WG": 0})
+    with pytest.raises(ValueError):
+        resolve_profile({"WG": "cheap"})
@@ -0,0 +1,127 @@
+# tests/test_course_service.py
+"""
+Tests for Course_Service: pooled searches, coalescing of identical
+requests, node budgets and timeouts.
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from runes.runes import PathGlyph
+from world.grid_forge import Map_Anvil
+from world.map_smith import forge_terrain, write_map
+from world.world_registry import World_Registry
+from aris import course_service
+from aris.course_service import Course_Service, Course_Timeout
+from aris.saladin_pathfinder import Saladin_Pathfinder
+from aris.search_stats import Search_Cancelled
+
+HEARTH, PYTHONIA = PathGlyph(0, 0), PathGlyph(39, 39)
+
+@pytest.fixture
+def map_path(tmp_path):
+    codes = forge_terrain(40, 40, seed=2, style="maze", wall_density=0.3)
+    codes[0] = codes[-1] = 0
+    return str(write_map(tmp_path / "maze.json", codes, 40, 40))
+
+def _block(service):
+    """Occupy a one-worker service until the returned event is set."""
+    gate = threading.Event()
+    service._pool.submit(gate.wait)
+    return gate
+
+def test_answers_match_direct_search(map_path):
+    expected = Saladin_Pathfinder(Map_Anvil(map_path)).chart_course(HEARTH, PYTHONIA)
+
+    with Course_Service(World_Registry(), workers=2) as service:
+        report = service.chart_sync(map_path, HEARTH, PYTHONIA, "lowest_energy")
+        assert report.path == expected
+
+        report = asyncio.run(service.chart(map_path, HEARTH, PYTHONIA, "lowest_energy", profile="standard"))
+        assert report.path == expected
+        assert service.stats()["completed"] == 2
+
+def test_identical_requests_share_one_search(map_path):
+    with Course_Service(World_Registry(), workers=1) as service:
+        gate = _block(service)
+        first = service.submit(map_path, HEARTH, PYTHONIA, "fewest_steps")
+        second = service.submit(map_path, HEARTH, PYTHONIA, "fewest_steps")
+        other = service.submit(map_path, HEARTH, PYTHONIA, "lowest_energy")
+        gate.set()
+
+        assert second is first and other is not first
+        assert first.result(5).path[-1] == PYTHONIA
+        other.result(5)
+        stats = service.stats()
+        assert stats["coalesced"] == 1 and stats["submitted"] == 3
+
+def test_node_budget_cancels_search(map_path):
+    with Course_Service(World_Registry(), workers=1) as service:
+        with pytest.raises(Search_Cancelled) as cancelled:
+            service.chart_sync(map_path, HEARTH, PYTHONIA, "lowest_energy", node_budget=20)
+        assert cancelled.value.reason == "node_budget"
+        assert cancelled.value.nodes_expanded <= 20 + 20
+        assert service.stats()["cancelled"] == 1
+
+def test_timeouts_free_the_worker(map_path):
+    with Course_Service(World_Registry(), workers=1) as service:
+        gate = _block(service)
+        with pytest.raises(Course_Timeout):
+            service.chart_sync(map_path, HEARTH, PYTHONIA, "lowest_energy", timeout=0.05)
+        with pytest.raises(Course_Timeout):
+            asyncio.run(service.chart(map_path, HEARTH, PYTHONIA, "fewest_steps", timeout=0.05))
+        gate.set()
+
+        # Both searches expired in the queue, so neither runs
+        service.chart_sync(map_path, PathGlyph(0, 0), PathGlyph(1, 0), "fewest_steps", timeout=5)
+        stats = service.stats()
+        assert stats["timeouts"] == 2 and stats["cancelled"] == 2 and stats["in_flight"] == 0
+
+def test_flow_fields_run_in_the_pool(map_path):
+    registry = World_Registry()
+    with Course_Service(registry, workers=1) as service:
+        gate = _block(service)
+        first = service.submit_flow_field(map_path, PYTHONIA)
+        second = service.submit_flow_field(map_path, PYTHONIA)
+        gate.set()
+        assert second is first
+
+        field = first.result(5)
+        expected = service.chart_sync(map_path, HEARTH, PYTHONIA, "lowest_energy")
+        assert field.path_from(HEARTH) == expected.path
+        assert service.flow_field_sync(map_path, PYTHONIA) is field
+
+        # Edits retire the field; budgets stop a rebuild
+        assert registry.fetch(map_path).set_terrain(PathGlyph(0, 0), "MM") is not None
+        with pytest.raises(Search_Cancelled) as cancelled:
+            service.flow_field_sync(map_path, PYTHONIA, node_budget=20)
+        assert cancelled.value.reason == "node_budget"
+        rebuilt = service.flow_field_sync(map_path, PYTHONIA)
+        assert rebuilt is not field and rebuilt.version == 1
+
+def test_pathfinder_builds_do_not_hold_the_service_lock(map_path, monkeypatch):
+    building, release = threading.Event(), threading.Event()
+
+    def slow_pathfinder(*args, **kwargs):
+        building.set()
+        release.wait(5)
+        return Saladin_Pathfinder(*args, **kwargs)
+
+    monkeypatch.setattr(course_service, "Saladin_Pathfinder", slow_pathfinder)
+    with Course_Service(World_Registry(), workers=2) as service:
+        first = service.submit(map_path, HEARTH, PYTHONIA, "lowest_energy")
+        assert building.wait(5)
+
+        # submit() and stats() go through while the build runs
+        futures = []
+        caller = threading.Thread(target=lambda: futures.append(
+            service.submit(map_path, HEARTH, PYTHONIA, "fewest_steps")
+        ))
+        caller.start()
+        caller.join(1)
+        assert futures and service.stats()["submitted"] == 2
+        release.set()
+        assert first.result(5).path[-1] == PYTHONIA
+        assert futures[0].result(5).path[-1] == PYTHONIA
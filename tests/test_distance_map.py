@@ -0,0 +1,60 @@
+# tests/test_distance_map.py
+"""
+Tests for whole-grid distance maps: one float32 array with the cost
+chart_course would report for every cell.
+"""
+
+import math
+import random
+
+import pytest
+
+from runes.runes import PathGlyph
+from world.grid_forge import Map_Anvil
+from world.map_smith import forge_terrain, write_map
+from aris.saladin_pathfinder import Saladin_Pathfinder
+
+SIZE = 32
+
+@pytest.fixture
+def rooms(tmp_path):
+    codes = forge_terrain(SIZE, SIZE, seed=5, style="rooms", wall_density=0.25)
+    return Map_Anvil(str(write_map(tmp_path / "rooms.json", codes, SIZE, SIZE)))
+
+@pytest.mark.parametrize("mode", ["lowest_energy", "fewest_steps"])
+@pytest.mark.parametrize("reverse", [False, True])
+def test_matches_chart_course(rooms, mode, reverse):
+    pf = Saladin_Pathfinder(rooms, mode=mode)
+    hearth = rooms.glyph_at_index(
+        next(i for i in range(SIZE * SIZE) if rooms.is_passable_index(i))
+    )
+    costs = pf.distance_map(hearth, reverse=reverse)
+    assert costs.typecode == "f" and len(costs) == SIZE * SIZE
+    assert costs[rooms.index_of(hearth.x, hearth.y)] == 0.0
+
+    for cell in random.Random(2).sample(range(SIZE * SIZE), 60):
+        glyph = rooms.glyph_at_index(cell)
+        path = pf.chart_course(glyph, hearth) if reverse else pf.chart_course(hearth, glyph)
+        if path is None:
+            assert math.isinf(costs[cell])
+        elif mode == "lowest_energy":
+            assert costs[cell] == pytest.approx(pf._path_energy(path), rel=1e-6)
+        else:
+            assert costs[cell] == len(path) - 1
+
+def test_wall_source_and_walled_off_cells(tmp_path):
+    file = tmp_path / "pen.json"
+    file.write_text("""
+    [
+        ["WA", "WG", "WA", "WG"],
+        ["SM", "WG", "WA", "WG"]
+    ]
+    """)
+    pf = Saladin_Pathfinder(Map_Anvil(str(file)))
+
+    # A wall start may step out; nothing steps into a wall
+    costs = pf.distance_map(PathGlyph(0, 0))
+    assert list(costs[:2]) == [0.0, 1.0]
+    assert costs[4] == pytest.approx(pf._path_energy([PathGlyph(0, 0), PathGlyph(0, 1)]))
+    assert costs[5] == pytest.approx(1.4)
+    assert all(math.isinf(costs[i]) for i in (2, 3, 6, 7))
@@ -3,6 +3,8 @@
 Edge case tests for Saladin_Pathfinder.
 """
 
+import pytest
+
 from runes.runes import PathGlyph
 from world.grid_forge import Map_Anvil
 from aris.saladin_pathfinder import Saladin_Pathfinder
@@ -55,4 +57,39 @@ def test_small_world(tmp_path):
     and handles all possible inputs, from the simplest to the most 
     frustrating!
     
-    """
\ No newline at end of file
+    """
+
+def test_glyphs_off_the_map(tmp_path):
+    file = tmp_path / "field.json"
+    file.write_text("""
+    [
+        ["WG", "WG", "WG"],
+        ["WG", "WG", "WG"]
+    ]
+    """)
+    world = Map_Anvil(str(file))
+    inside = PathGlyph(0, 0)
+    outside = [PathGlyph(3, 0), PathGlyph(-1, 1), PathGlyph(0, 2), PathGlyph(1, -1)]
+
+    # Flat indices would wrap these onto other cells
+    for engine in ("indexed", "glyph", "jps", "hpa", "bidirectional"):
+        pf = Saladin_Pathfinder(world, engine=engine)
+        for glyph in outside:
+            assert pf.chart_course(inside, glyph) is None
+            assert pf.last_run_stats["out_of_bounds"] is True
+            assert pf.chart_course(glyph, inside) is None
+            assert pf.chart_course(glyph, glyph) is None
+            assert pf.chart_course_anytime(inside, glyph) is None
+
+    pf = Saladin_Pathfinder(world)
+    paths = pf.chart_courses([(inside, PathGlyph(3, 0)), (inside, PathGlyph(2, 1))])
+    assert paths[0] is None and paths[1][-1] == PathGlyph(2, 1)
+    assert pf.last_batch_stats[0]["out_of_bounds"] is True
+    for call in (pf.flow_field, pf.distance_map, lambda g: pf.chart_nearest(g, [inside])):
+        with pytest.raises(ValueError):
+            call(PathGlyph(3, 0))
+
+    field = pf.flow_field(PathGlyph(2, 1))
+    for glyph in outside:
+        assert field.path_from(glyph) is None and field.next_step(glyph) is None
+        assert field.cost_from(glyph) == float("inf")
@@ -0,0 +1,165 @@
+# tests/test_engines.py
+"""
+Tests that every Saladin_Pathfinder engine agrees with the reference
+PathGlyph-keyed A* on path length and energy.
+"""
+
+import pytest
+
+from runes.runes import PathGlyph
+from world.grid_forge import Map_Anvil
+from aris.hierarchy import Cluster_Atlas
+from aris.saladin_pathfinder import Saladin_Pathfinder
+
+MIXED_MAP = """
+[
+    ["WG", "FR", "FR", "DD", "WG", "WG"],
+    ["WG", "WA", "WA", "DD", "MM", "WG"],
+    ["FL", "FR", "WA", "SM", "MM", "WG"],
+    ["WG", "FR", "WA", "WG", "WA", "FR"],
+    ["WG", "WG", "DD", "WG", "WA", "WG"]
+]
+"""
+
+@pytest.fixture
+def mixed_world(tmp_path):
+    file = tmp_path / "mixed.json"
+    file.write_text(MIXED_MAP)
+    return Map_Anvil(str(file))
+
+
+@pytest.mark.parametrize("mode", ["fewest_steps", "lowest_energy"])
+def test_indexed_matches_glyph_engine(mixed_world, mode):
+    """The indexed kernel must find paths as good as the reference A*."""
+    reference = Saladin_Pathfinder(mixed_world, mode=mode, engine="glyph")
+    indexed = Saladin_Pathfinder(mixed_world, mode=mode, engine="indexed")
+
+    hearth, pythonia = PathGlyph(0, 0), PathGlyph(5, 4)
+    expected = reference.chart_course(hearth, pythonia)
+    path = indexed.chart_course(hearth, pythonia)
+
+    assert path[0] == hearth and path[-1] == pythonia
+    if mode == "fewest_steps":
+        assert len(path) == len(expected)
+    else:
+        assert indexed.last_run_stats["total_energy"] == pytest.approx(
+            reference.last_run_stats["total_energy"]
+        )
+
+
+def test_unknown_engine_rejected(mixed_world):
+    with pytest.raises(ValueError):
+        Saladin_Pathfinder(mixed_world, engine="teleport")
+
+
+@pytest.mark.parametrize("engine", ["indexed", "glyph"])
+def test_closed_set_skips_stale_entries(mixed_world, engine):
+    """Stale heap entries are counted separately and never re-expanded."""
+    lazy = Saladin_Pathfinder(mixed_world, engine=engine)
+    naive = Saladin_Pathfinder(mixed_world, engine=engine, closed_set=False)
+
+    hearth, pythonia = PathGlyph(0, 0), PathGlyph(5, 4)
+    lazy.chart_course(hearth, pythonia)
+    naive.chart_course(hearth, pythonia)
+
+    stats = lazy.last_run_stats
+    assert stats["reexpansions"] == 0
+    assert stats["pops"] == stats["nodes_expanded"] + stats["stale_pops"]
+    assert naive.last_run_stats["stale_pops"] == 0
+    assert naive.last_run_stats["nodes_expanded"] >= stats["nodes_expanded"]
+    assert naive.last_run_stats["total_energy"] == pytest.approx(stats["total_energy"])
+
+
+def test_jps_matches_astar_lengths(mixed_world):
+    """JPS must return paths exactly as short as A* in fewest_steps mode."""
+    astar = Saladin_Pathfinder(mixed_world, mode="fewest_steps")
+    jps = Saladin_Pathfinder(mixed_world, mode="fewest_steps", engine="jps")
+
+    cells = [PathGlyph(x, y) for y in range(mixed_world.height)
+             for x in range(mixed_world.width)
+             if mixed_world.is_traversable(x, y)]
+
+    for hearth in cells[::3]:
+        for pythonia in cells[::2]:
+            expected = astar.chart_course(hearth, pythonia)
+            path = jps.chart_course(hearth, pythonia)
+            assert len(path) == len(expected)
+            assert all(max(abs(a.x - b.x), abs(a.y - b.y)) == 1
+                       for a, b in zip(path, path[1:]))
+
+
+@pytest.mark.parametrize("mode", ["fewest_steps", "lowest_energy"])
+def test_hpa_exact_atlas_is_optimal(mixed_world, mode):
+    """With every border crossing kept, HPA* matches flat A* exactly."""
+    atlas = Cluster_Atlas(mixed_world, cluster_size=2, exact=True)
+    flat = Saladin_Pathfinder(mixed_world, mode=mode)
+    hpa = Saladin_Pathfinder(mixed_world, mode=mode, engine="hpa", atlas=atlas)
+
+    for hearth, pythonia in [(PathGlyph(0, 0), PathGlyph(5, 4)),
+                             (PathGlyph(5, 0), PathGlyph(0, 4)),
+                             (PathGlyph(3, 4), PathGlyph(1, 2))]:
+        expected = flat.chart_course(hearth, pythonia)
+        path = hpa.chart_course(hearth, pythonia)
+        assert path[0] == hearth and path[-1] == pythonia
+        if mode == "fewest_steps":
+            assert len(path) == len(expected)
+        else:
+            assert hpa.last_run_stats["total_energy"] == pytest.approx(
+                flat.last_run_stats["total_energy"]
+            )
+
+
+def test_hpa_default_atlas_reports_build_stats(mixed_world):
+    """The approximate atlas still finds a route and reports its cost."""
+    atlas = Cluster_Atlas(mixed_world, cluster_size=3, smooth=True)
+    hpa = Saladin_Pathfinder(mixed_world, engine="hpa", atlas=atlas)
+
+    path = hpa.chart_course(PathGlyph(0, 0), PathGlyph(5, 4))
+    assert path is not None
+    assert all(mixed_world.is_traversable(g.x, g.y) for g in path)
+    assert atlas.build_stats["abstract_nodes"] > 0
+    assert atlas.build_stats["build_seconds"] >= 0
+    assert atlas.build_stats["approx_bytes"] > 0
+
+
+def test_hpa_rejects_atlas_of_another_world_or_profile(mixed_world, tmp_path):
+    """An atlas built for other terrain would give wrong routes."""
+    other = tmp_path / "other.json"
+    other.write_text(MIXED_MAP)
+    with pytest.raises(ValueError):
+        Saladin_Pathfinder(mixed_world, engine="hpa", atlas=Cluster_Atlas(Map_Anvil(str(other))))
+    with pytest.raises(ValueError):
+        Saladin_Pathfinder(
+            mixed_world, engine="hpa", atlas=Cluster_Atlas(mixed_world), profile="mountain_goat"
+        )
+
+
+@pytest.mark.parametrize("mode", ["fewest_steps", "lowest_energy"])
+def test_bidirectional_matches_unidirectional(mixed_world, mode):
+    """Both frontiers must meet on an optimal route and report their work."""
+    flat = Saladin_Pathfinder(mixed_world, mode=mode)
+    both = Saladin_Pathfinder(mixed_world, mode=mode, engine="bidirectional")
+
+    for hearth, pythonia in [(PathGlyph(0, 0), PathGlyph(5, 4)),
+                             (PathGlyph(3, 4), PathGlyph(1, 2)),
+                             (PathGlyph(2, 1), PathGlyph(5, 2))]:
+        flat.chart_course(hearth, pythonia)
+        path = both.chart_course(hearth, pythonia)
+        stats = both.last_run_stats
+
+        assert path[0] == hearth and path[-1] == pythonia
+        if mode == "fewest_steps":
+            assert stats["path_length"] == flat.last_run_stats["path_length"]
+        else:
+            assert stats["total_energy"] == pytest.approx(flat.last_run_stats["total_energy"])
+        assert stats["forward_expanded"] + stats["backward_expanded"] == stats["nodes_expanded"]
+
+
+def test_bidirectional_no_path(tmp_path):
+    file = tmp_path / "split.json"
+    file.write_text('[["WG", "WA", "WG"], ["WG", "WA", "WG"]]')
+    world = Map_Anvil(str(file))
+
+    pf = Saladin_Pathfinder(world, engine="bidirectional")
+    assert pf.chart_course(PathGlyph(0, 0), PathGlyph(2, 1)) is None
+    assert pf.last_run_stats["success"] is False
@@ -0,0 +1,57 @@
+# tests/test_flow_field.py
+"""
+Tests for Flow_Field: one reverse search must give every cell an optimal
+route to the shared goal.
+"""
+
+import pytest
+
+from runes.runes import PathGlyph
+from world.grid_forge import Map_Anvil
+from aris.flow_field import Flow_Field
+from aris.saladin_pathfinder import Saladin_Pathfinder
+
+def _world(tmp_path):
+    file = tmp_path / "crowd.json"
+    file.write_text("""
+    [
+        ["WG", "FR", "DD", "WG", "WG"],
+        ["MM", "WA", "DD", "WA", "WG"],
+        ["WG", "FR", "WG", "WA", "FL"],
+        ["WA", "WA", "WA", "WA", "WG"],
+        ["WG", "WG", "WA", "SM", "WG"]
+    ]
+    """)
+    return Map_Anvil(str(file))
+
+def test_flow_field_costs_match_astar(tmp_path):
+    world = _world(tmp_path)
+    goal = PathGlyph(4, 4)
+    field = Flow_Field(world, goal, "lowest_energy")
+    pf = Saladin_Pathfinder(world)
+
+    for y in range(world.height):
+        for x in range(world.width):
+            hearth = PathGlyph(x, y)
+            path = field.path_from(hearth)
+            expected = pf.chart_course(hearth, goal)
+            if expected is None:
+                assert path is None
+                assert field.cost_from(hearth) == float("inf")
+                continue
+            assert path[0] == hearth and path[-1] == goal
+            assert field.cost_from(hearth) == pytest.approx(pf.last_run_stats["total_energy"])
+            assert pf._path_energy(path) == pytest.approx(field.cost_from(hearth))
+
+def test_pathfinder_reuses_cached_field(tmp_path):
+    world = _world(tmp_path)
+    pf = Saladin_Pathfinder(world, mode="fewest_steps")
+    goal = PathGlyph(0, 0)
+
+    field = pf.flow_field(goal)
+    assert pf.flow_field(goal) is field
+    assert field.next_step(goal) is None
+
+    path = pf.chart_course(PathGlyph(4, 2), goal)
+    assert pf.last_run_stats["flow_field"] is True
+    assert len(path) - 1 == field.cost_from(PathGlyph(4, 2))
@@ -0,0 +1,98 @@
+# tests/test_landmarks.py
+"""
+Tests for the ALT landmark heuristic: same optimal paths as the octile
+heuristic with fewer expansions, compact tables, and rebuilds after
+terrain edits.
+"""
+
+import random
+
+import pytest
+
+from runes.runes import PathGlyph
+from world.grid_forge import Map_Anvil
+from world.map_smith import forge_terrain, write_map
+from aris.landmarks import Landmark_Atlas
+from aris.saladin_pathfinder import Saladin_Pathfinder
+
+SIZE = 40
+
+@pytest.fixture
+def rooms(tmp_path):
+    codes = forge_terrain(SIZE, SIZE, seed=3, style="rooms", wall_density=0.25)
+    return Map_Anvil(str(write_map(tmp_path / "rooms.json", codes, SIZE, SIZE)))
+
+def _journeys(world, count, seed=0):
+    rng = random.Random(seed)
+    cells = [i for i in range(SIZE * SIZE) if world.is_passable_index(i)]
+    return [
+        (world.glyph_at_index(a), world.glyph_at_index(b))
+        for a, b in (rng.sample(cells, 2) for _ in range(count))
+    ]
+
+@pytest.mark.parametrize("mode", ["lowest_energy", "fewest_steps"])
+def test_paths_stay_optimal_with_fewer_expansions(rooms, mode):
+    octile = Saladin_Pathfinder(rooms, mode=mode)
+    alt = Saladin_Pathfinder(rooms, mode=mode, heuristic="landmarks")
+
+    expanded = {"octile": 0, "alt": 0}
+    for hearth, pythonia in _journeys(rooms, 25):
+        expected = octile.chart_course(hearth, pythonia)
+        path = alt.chart_course(hearth, pythonia)
+        expanded["octile"] += octile.last_run_stats["nodes_expanded"]
+        expanded["alt"] += alt.last_run_stats["nodes_expanded"]
+
+        assert (path is None) == (expected is None)
+        if path is None:
+            continue
+        assert len(path) == len(expected)
+        if mode == "lowest_energy":
+            assert alt.last_run_stats["total_energy"] == pytest.approx(
+                octile.last_run_stats["total_energy"]
+            )
+
+    assert expanded["alt"] < expanded["octile"]
+
+def test_tables_are_float32_and_reported(rooms):
+    landmarks = Landmark_Atlas(rooms, count=4)
+    chosen = landmarks.landmarks("lowest_energy")
+
+    assert len(chosen) == 4 and len(set(chosen)) == 4
+    assert all(rooms.is_passable_index(cell) for cell in chosen)
+    stats = landmarks.build_stats["lowest_energy"]
+    assert stats["landmarks"] == 4 and stats["build_seconds"] > 0
+    assert stats["table_bytes"] == landmarks.memory_bytes() == 4 * 2 * 4 * SIZE * SIZE
+    assert "fewest_steps" not in landmarks.build_stats
+
+    # Never below the octile estimate, and zero at the goal
+    goal = chosen[0]
+    estimate = landmarks.heuristic(0, goal, "lowest_energy", 1.0, 1.4)
+    assert estimate(goal) == pytest.approx(0.0, abs=1e-3)
+    assert estimate(goal + 1) >= 1.0
+
+def test_tables_are_rebuilt_after_edits(tmp_path):
+    file = tmp_path / "gate.json"
+    file.write_text("""
+    [
+        ["WG", "WG", "WA", "WG", "WG"],
+        ["WG", "WG", "WA", "WG", "WG"],
+        ["WG", "WG", "WG", "WG", "WG"]
+    ]
+    """)
+    world = Map_Anvil(str(file))
+    pf = Saladin_Pathfinder(world, heuristic="landmarks")
+    assert len(pf.chart_course(PathGlyph(0, 0), PathGlyph(4, 0))) == 5
+
+    first = pf.landmarks
+    world.set_terrain(PathGlyph(2, 0), "WG")
+    assert pf.chart_course(PathGlyph(0, 0), PathGlyph(4, 0)) == [
+        PathGlyph(x, 0) for x in range(5)
+    ]
+    assert pf.landmarks is not first
+
+def test_landmarks_must_match_the_world(rooms):
+    with pytest.raises(ValueError):
+        Saladin_Pathfinder(rooms, heuristic="landmarks", profile="mountain_goat",
+                           landmarks=Landmark_Atlas(rooms))
+    with pytest.raises(ValueError):
+        Saladin_Pathfinder(rooms, heuristic="euclid")
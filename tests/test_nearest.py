@@ -0,0 +1,89 @@
+# tests/test_nearest.py
+"""
+Tests for chart_nearest: one search answers "path to the nearest of
+these goals" with the same cost as the best of many chart_course calls.
+"""
+
+import random
+
+import pytest
+
+from runes.runes import PathGlyph
+from world.grid_forge import Map_Anvil
+from world.map_smith import forge_terrain, write_map
+from aris.saladin_pathfinder import Saladin_Pathfinder
+
+SIZE = 36
+
+def _cost(pf, path, mode):
+    return pf._path_energy(path) if mode == "lowest_energy" else len(path) - 1
+
+@pytest.mark.parametrize("mode", ["lowest_energy", "fewest_steps"])
+@pytest.mark.parametrize("style", ["open", "rooms"])
+def test_matches_best_of_separate_searches(tmp_path, mode, style):
+    codes = forge_terrain(SIZE, SIZE, seed=6, style=style, wall_density=0.25)
+    world = Map_Anvil(str(write_map(tmp_path / "m.json", codes, SIZE, SIZE)))
+    pf = Saladin_Pathfinder(world, mode=mode)
+    rng = random.Random(1)
+
+    for _ in range(5):
+        hearth = world.glyph_at_index(rng.randrange(SIZE * SIZE))
+        goals = [world.glyph_at_index(rng.randrange(SIZE * SIZE)) for _ in range(25)]
+        goals = [goal for goal in goals if goal != hearth]
+
+        paths = [pf.chart_course(hearth, goal) for goal in goals]
+        costs = [_cost(pf, path, mode) for path in paths if path is not None]
+
+        answer = pf.chart_nearest(hearth, goals)
+        if not costs:
+            assert answer is None
+            continue
+        assert answer.path[0] == hearth and answer.path[-1] == answer.goal
+        assert goals[answer.position] == answer.goal
+        assert _cost(pf, answer.path, mode) == pytest.approx(min(costs))
+        assert pf.last_run_stats["success"] and pf.last_run_stats["goals"] == len(goals)
+
+def test_one_search_is_cheaper_than_many(tmp_path):
+    codes = forge_terrain(SIZE, SIZE, seed=2, style="open", wall_density=0.1)
+    world = Map_Anvil(str(write_map(tmp_path / "m.json", codes, SIZE, SIZE)))
+    pf = Saladin_Pathfinder(world)
+    hearth = PathGlyph(0, 0)
+    world.set_terrain(hearth, "WG")
+    goals = [world.glyph_at_index(i) for i in range(SIZE * SIZE) if world.is_passable_index(i)][-200:]
+
+    separate = 0
+    for goal in goals:
+        pf.chart_course(hearth, goal)
+        separate += pf.last_run_stats["nodes_expanded"]
+    pf.chart_nearest(hearth, goals)
+    assert pf.last_run_stats["nodes_expanded"] * 10 < separate
+
+def test_walls_duplicates_and_unreachable_goals(tmp_path):
+    file = tmp_path / "pen.json"
+    file.write_text("""
+    [
+        ["WA", "WG", "WG", "WA", "WG"],
+        ["WG", "WG", "WG", "WA", "WG"]
+    ]
+    """)
+    world = Map_Anvil(str(file))
+    pf = Saladin_Pathfinder(world)
+
+    # A wall start steps out; the wall goal and the far pen never win
+    answer = pf.chart_nearest(PathGlyph(0, 0), [PathGlyph(4, 0), PathGlyph(3, 1), PathGlyph(2, 1),
+                                               PathGlyph(2, 1), PathGlyph(1, 1)])
+    assert answer.goal == PathGlyph(1, 1) and answer.position == 4
+    assert answer.path == [PathGlyph(0, 0), PathGlyph(1, 1)]
+    assert pf.last_run_stats["goals_reachable"] == 2
+
+    assert pf.chart_nearest(PathGlyph(0, 1), [PathGlyph(4, 0), PathGlyph(3, 0)]) is None
+    assert pf.last_run_stats["nodes_expanded"] == 0
+    with pytest.raises(ValueError):
+        pf.chart_nearest(PathGlyph(0, 1), [PathGlyph(5, 0)])
+
+    # Standing on a goal wins at once, wall or not, as with chart_course
+    for hearth in (PathGlyph(0, 0), PathGlyph(4, 1)):
+        assert pf.chart_course(hearth, hearth) == [hearth]
+        answer = pf.chart_nearest(hearth, [PathGlyph(1, 1), hearth])
+        assert answer == (hearth, 1, [hearth])
+        assert pf.last_run_stats["success"] and pf.last_run_stats["goal_position"] == 1
@@ -0,0 +1,63 @@
+# tests/test_parallel.py
+"""
+Tests for Parallel_Navigator: worker processes read the map from shared
+memory and must answer exactly like an in-process pathfinder.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from runes.runes import PathGlyph
+from world.cost_profiles import Cost_Profile
+from world.grid_forge import Map_Anvil
+from aris.parallel import Parallel_Navigator
+from aris.saladin_pathfinder import Saladin_Pathfinder
+
+DEMO_WORLD = Path(__file__).resolve().parent.parent / "maps" / "demo_world.json"
+
+def test_parallel_matches_sequential():
+    world = Map_Anvil(str(DEMO_WORLD))
+    journeys = [
+        (PathGlyph(0, 0), PathGlyph(6, 4)),
+        (PathGlyph(6, 0), PathGlyph(0, 4)),
+        (PathGlyph(3, 0), PathGlyph(2, 2)),   # goal is a wall
+        (PathGlyph(1, 1), PathGlyph(5, 3)),
+        (PathGlyph(4, 4), PathGlyph(4, 4)),
+    ]
+    pf = Saladin_Pathfinder(world, mode="lowest_energy")
+
+    with Parallel_Navigator(world, workers=2, chunk_size=2, mode="lowest_energy") as navigator:
+        paths = navigator.chart_courses(journeys)
+        report = navigator.last_run_report
+        unordered = sorted(position for position, _, _ in navigator.run(journeys, ordered=False))
+
+    for (hearth, pythonia), path in zip(journeys, paths):
+        expected = pf.chart_course(hearth, pythonia)
+        if expected is None:
+            assert path is None
+            continue
+        assert path[0] == hearth and path[-1] == pythonia
+        assert pf._path_energy(path) == pytest.approx(pf.last_run_stats["total_energy"])
+
+    assert report["queries"] == len(journeys)
+    assert report["chunks"] == 3
+    assert report["queries_per_second"] > 0
+    assert unordered == list(range(len(journeys)))
+
+def test_profile_views_keep_their_costs_in_workers():
+    world = Map_Anvil(str(DEMO_WORLD))
+    view = world.with_profile(Cost_Profile.from_overrides("cheap", {"WG": 0.1, "FR": 0.2}))
+    cells = [world.glyph_at_index(i) for i in range(world.width * world.height)]
+    journeys = [(a, b) for a in cells[::3] for b in cells[1::4] if a != b]
+    pf = Saladin_Pathfinder(view)
+
+    with Parallel_Navigator(view, workers=2, chunk_size=16) as navigator:
+        paths = navigator.chart_courses(journeys)
+
+    for (hearth, pythonia), path in zip(journeys, paths):
+        expected = pf.chart_course(hearth, pythonia)
+        if expected is None:
+            assert path is None
+            continue
+        assert pf._path_energy(path) == pytest.approx(pf.last_run_stats["total_energy"])
@@ -0,0 +1,99 @@
+# tests/test_path_cache.py
+"""
+Tests for Course_Cache: repeated and sub-path queries are served from the
+cache, and nothing survives a change of map version.
+"""
+
+import pytest
+
+from runes.runes import PathGlyph
+from world.grid_forge import Map_Anvil
+from aris.path_cache import Course_Cache
+from aris.saladin_pathfinder import Saladin_Pathfinder
+
+def _world(tmp_path):
+    file = tmp_path / "road.json"
+    file.write_text("""
+    [
+        ["WG", "FR", "DD", "WG", "WG", "MM"],
+        ["MM", "WA", "DD", "WA", "WG", "WG"],
+        ["WG", "FR", "WG", "WG", "FL", "SM"],
+        ["WA", "WA", "WA", "WA", "WG", "WG"]
+    ]
+    """)
+    return Map_Anvil(str(file))
+
+def test_repeat_and_subpath_hits(tmp_path):
+    world = _world(tmp_path)
+    cache = Course_Cache(world)
+    pf = Saladin_Pathfinder(world, course_cache=cache)
+    plain = Saladin_Pathfinder(world)
+
+    path = pf.chart_course(PathGlyph(0, 0), PathGlyph(5, 3))
+    assert pf.last_run_stats["cache"] == "miss"
+
+    assert pf.chart_course(PathGlyph(0, 0), PathGlyph(5, 3)) == path
+    assert pf.last_run_stats["cache"] == "hit"
+    assert pf.last_run_stats["nodes_expanded"] == 0
+
+    # Any stretch of a cached optimal path is an optimal answer
+    inner = pf.chart_course(path[1], path[-2])
+    assert pf.last_run_stats["cache"] == "subpath"
+    assert inner == path[1:-1]
+    plain.chart_course(path[1], path[-2])
+    assert pf.last_run_stats["total_energy"] == pytest.approx(plain.last_run_stats["total_energy"])
+
+    assert pf.last_run_stats["cache_hit_rate"] == pytest.approx(2 / 3)
+
+def test_unreachable_and_inexact_answers(tmp_path):
+    world = _world(tmp_path)
+    cache = Course_Cache(world)
+    pf = Saladin_Pathfinder(world, course_cache=cache)
+
+    assert pf.chart_course(PathGlyph(0, 0), PathGlyph(0, 3)) is None
+    assert pf.chart_course(PathGlyph(0, 0), PathGlyph(0, 3)) is None
+    assert pf.last_run_stats["cache"] == "hit"
+
+    # Weighted A* answers are kept apart and never sliced
+    weighted = Saladin_Pathfinder(world, epsilon=2.0, course_cache=cache)
+    path = weighted.chart_course(PathGlyph(0, 0), PathGlyph(5, 3))
+    pf.chart_course(path[1], path[-1])
+    assert pf.last_run_stats["cache"] == "miss"
+    weighted.chart_course(path[1], path[-1])
+    assert weighted.last_run_stats["cache"] == "miss"
+
+    # Hits keep the bound of the engine that stored them
+    weighted.chart_course(PathGlyph(0, 0), PathGlyph(5, 3))
+    assert weighted.last_run_stats["cache"] == "hit"
+    assert weighted.last_run_stats["suboptimality_bound"] == 2.0
+    hpa = Saladin_Pathfinder(world, engine="hpa", course_cache=cache)
+    for outcome in ("miss", "hit"):
+        hpa.chart_course(PathGlyph(0, 0), PathGlyph(5, 3))
+        assert hpa.last_run_stats["cache"] == outcome
+        assert hpa.last_run_stats["suboptimality_bound"] is None
+
+def test_lru_eviction_and_version_invalidation(tmp_path):
+    world = _world(tmp_path)
+    cache = Course_Cache(world, max_paths=2)
+    pf = Saladin_Pathfinder(world, mode="fewest_steps", course_cache=cache)
+
+    pf.chart_course(PathGlyph(0, 0), PathGlyph(2, 2))
+    pf.chart_course(PathGlyph(5, 0), PathGlyph(4, 3))
+    pf.chart_course(PathGlyph(0, 0), PathGlyph(2, 2))
+    pf.chart_course(PathGlyph(0, 2), PathGlyph(5, 2))
+    assert cache.stats()["cache_evictions"] == 1
+
+    pf.chart_course(PathGlyph(0, 0), PathGlyph(2, 2))
+    assert pf.last_run_stats["cache"] == "hit"
+    pf.chart_course(PathGlyph(5, 0), PathGlyph(4, 3))
+    assert pf.last_run_stats["cache"] == "miss"
+
+    world.version += 1
+    pf.chart_course(PathGlyph(0, 0), PathGlyph(2, 2))
+    assert pf.last_run_stats["cache"] == "miss"
+    assert cache.stats()["cache_invalidations"] == 1
+
+def test_cache_must_match_world(tmp_path):
+    cache = Course_Cache(_world(tmp_path))
+    with pytest.raises(ValueError):
+        Saladin_Pathfinder(_world(tmp_path), course_cache=cache)
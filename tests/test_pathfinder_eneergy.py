@@ -53,4 +53,44 @@ def test_energy_blocked_terrain(tmp_path):
 
     path = pf.chart_course(hearth, pythonia)
     assert path is None  # the wall blocks all paths
-    
\ No newline at end of file
+    
+def test_heuristic_counts_diagonal_penalty(tmp_path):
+    """Octile heuristic must be exact on open grassland, diagonals included."""
+    file = tmp_path / "open.json"
+    file.write_text("""
+    [
+        ["WG", "WG", "WG", "WG"],
+        ["WG", "WG", "WG", "WG"]
+    ]
+    """)
+
+    world = Map_Anvil(str(file))
+    pf = Saladin_Pathfinder(world, mode="lowest_energy")
+
+    hearth, pythonia = PathGlyph(0, 0), PathGlyph(3, 1)
+    pf.chart_course(hearth, pythonia)
+    estimate = pf._heuristic(hearth, pythonia, "lowest_energy")
+    assert estimate == pf.last_run_stats["total_energy"] == 3.4
+
+def test_weighted_energy_within_bound(tmp_path):
+    """Weighted A* may be suboptimal, but never beyond epsilon."""
+    file = tmp_path / "weighted.json"
+    file.write_text("""
+    [
+        ["WG", "FR", "DD", "WG", "SM"],
+        ["MM", "WA", "DD", "FR", "WG"],
+        ["WG", "FR", "WG", "WA", "WG"],
+        ["SM", "WG", "MM", "WG", "FL"]
+    ]
+    """)
+
+    world = Map_Anvil(str(file))
+    exact = Saladin_Pathfinder(world, mode="lowest_energy")
+    greedy = Saladin_Pathfinder(world, mode="lowest_energy", epsilon=2.5)
+
+    hearth, pythonia = PathGlyph(0, 0), PathGlyph(4, 3)
+    assert greedy.chart_course(hearth, pythonia) is not None
+    exact.chart_course(hearth, pythonia)
+
+    assert greedy.last_run_stats["suboptimality_bound"] == 2.5
+    assert greedy.last_run_stats["total_energy"] <= 2.5 * exact.last_run_stats["total_energy"]
@@ -0,0 +1,80 @@
+# tests/test_search_stats.py
+"""
+Tests for per-query Search_Stats, the expansion probe and sharing one
+Saladin_Pathfinder between threads.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+import pytest
+
+from runes.runes import PathGlyph
+from world.grid_forge import Map_Anvil
+from world.map_smith import forge_terrain, write_map
+from aris.saladin_pathfinder import Saladin_Pathfinder
+
+@pytest.fixture
+def field(tmp_path):
+    codes = forge_terrain(30, 30, seed=4, style="rooms", wall_density=0.2)
+    codes[0] = codes[-1] = 0
+    return Map_Anvil(str(write_map(tmp_path / "field.json", codes, 30, 30)))
+
+@pytest.mark.parametrize("engine", ["indexed", "glyph", "bidirectional"])
+def test_report_matches_chart_course(field, engine):
+    pf = Saladin_Pathfinder(field, engine=engine)
+    hearth, pythonia = PathGlyph(0, 0), PathGlyph(29, 29)
+
+    path = pf.chart_course(hearth, pythonia)
+    report = pf.chart_course_report(hearth, pythonia)
+    stats = report.stats
+
+    assert report.path == path
+    assert stats.success and stats.path_length == len(path) - 1
+    assert stats.total_energy == pytest.approx(pf.last_run_stats["total_energy"])
+    assert stats.pops == stats.nodes_expanded + stats.stale_pops
+    assert 1 <= stats.max_open_size <= stats.pushes
+    assert stats.score_memory_bytes > 0 and stats.wall_time > 0
+    assert stats.heuristic_time is None
+    assert stats.as_dict()["nodes_expanded"] == stats.nodes_expanded
+
+@pytest.mark.parametrize("engine", ["indexed", "glyph"])
+def test_hook_samples_and_phase_timing(field, engine):
+    pf = Saladin_Pathfinder(field, engine=engine)
+    hearth, pythonia = PathGlyph(0, 0), PathGlyph(29, 29)
+    expected = pf.chart_course(hearth, pythonia)
+
+    seen = []
+    report = pf.chart_course_report(
+        hearth, pythonia, hook=lambda cell, g, size: seen.append((cell, g, size)),
+        sample_every=3, time_phases=True,
+    )
+    stats = report.stats
+
+    assert report.path == expected
+    assert len(seen) == stats.expansions_sampled == stats.nodes_expanded // 3
+    assert all(field.is_passable_index(cell) for cell, _, _ in seen)
+    assert stats.heuristic_time > 0 and stats.neighbour_time > 0
+
+def test_pathfinder_is_shared_safely_between_threads(field):
+    pf = Saladin_Pathfinder(field, engine="bidirectional")
+    journeys = [(PathGlyph(0, 0), PathGlyph(29, 29)), (PathGlyph(29, 0), PathGlyph(0, 29))] * 8
+    expected = [Saladin_Pathfinder(field).chart_course(*j) for j in journeys]
+
+    def run(journey):
+        report = pf.chart_course_report(*journey)
+        assert pf.last_run_stats["total_energy"] == report.stats.total_energy
+        return report
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        reports = list(pool.map(run, journeys))
+
+    for report, path in zip(reports, expected):
+        assert report.stats.total_energy == pytest.approx(pf._path_energy(path))
+
+    # Another thread's metrics are not visible here
+    other = threading.Thread(target=pf.chart_course, args=journeys[0])
+    pf.chart_course(PathGlyph(0, 0), PathGlyph(1, 1))
+    other.start()
+    other.join()
+    assert pf.last_run_stats["path_length"] == 1
@@ -0,0 +1,113 @@
+# tests/test_terrain_edits.py
+"""
+Tests for runtime terrain edits on Map_Anvil and for the D* Lite planner
+that repairs its plan after them.
+"""
+
+import pytest
+
+from runes.runes import PathGlyph
+from world.grid_forge import Map_Anvil
+from aris.incremental_planner import Incremental_Planner
+from aris.path_cache import Course_Cache
+from aris.saladin_pathfinder import Saladin_Pathfinder
+
+def _world(tmp_path, width=12, height=8):
+    file = tmp_path / "field.json"
+    rows = []
+    for y in range(height):
+        rows.append(["FR" if (x + y) % 3 == 0 else "WG" for x in range(width)])
+    file.write_text(str(rows).replace("'", '"'))
+    return Map_Anvil(str(file))
+
+def test_set_terrain_updates_store_and_notifies(tmp_path):
+    world = _world(tmp_path)
+    seen = []
+    world.subscribe(seen.append)
+
+    change = world.set_terrain(PathGlyph(2, 1), "WA")
+    assert world.version == 1
+    assert world.terrain_at(PathGlyph(2, 1)) == "wall_of_ancients"
+    assert not world.is_traversable(2, 1)
+    assert seen == [change]
+    assert change.indices == [world.index_of(2, 1)]
+
+    world.set_terrain(PathGlyph(2, 1), "muddy_marsh")
+    assert world.is_traversable(2, 1)
+    assert world.cost_at(PathGlyph(2, 1)) == pytest.approx(2.5)
+
+    # Re-applying the current terrain is not a change
+    assert world.set_terrain(PathGlyph(2, 1), "MM") is None
+    assert world.version == 2 and len(seen) == 2
+
+def test_batch_edits_are_validated_first(tmp_path):
+    world = _world(tmp_path)
+    with pytest.raises(ValueError):
+        world.apply_edits([(PathGlyph(0, 0), "WA"), (PathGlyph(1, 0), "LAVA")])
+    with pytest.raises(ValueError):
+        world.apply_edits([(PathGlyph(0, 0), "WA"), (PathGlyph(99, 0), "WA")])
+    assert world.version == 0 and world.is_traversable(0, 0)
+
+    change = world.apply_edits([(PathGlyph(x, 3), "WA") for x in range(5)])
+    assert world.version == 1 and len(change.cells) == 5
+
+def test_incremental_plan_matches_fresh_search(tmp_path):
+    world = _world(tmp_path)
+    hearth, pythonia = PathGlyph(0, 0), PathGlyph(11, 7)
+    planner = Incremental_Planner(world, hearth, pythonia)
+    pf = Saladin_Pathfinder(world)
+
+    path = planner.plan()
+    first = planner.last_run_stats
+    assert first["incremental"] is False
+
+    edits = [
+        [(path[len(path) // 2], "WA")],
+        [(PathGlyph(x, 4), "MM") for x in range(3, 10)],
+        [(path[len(path) // 2], "WG"), (PathGlyph(5, 0), "SM")],
+    ]
+    for batch in edits:
+        world.apply_edits(batch)
+        path = planner.plan()
+        stats = planner.last_run_stats
+        pf.chart_course(hearth, pythonia)
+
+        assert stats["incremental"] and stats["cells_changed"] == len(batch)
+        assert path[0] == hearth and path[-1] == pythonia
+        assert stats["total_energy"] == pytest.approx(pf.last_run_stats["total_energy"])
+        assert 0 < stats["nodes_retouched"] < world.width * world.height
+
+    planner.close()
+
+def test_planner_follows_moving_start(tmp_path):
+    world = _world(tmp_path)
+    pythonia = PathGlyph(11, 7)
+    planner = Incremental_Planner(world, PathGlyph(0, 0), pythonia, mode="fewest_steps")
+    pf = Saladin_Pathfinder(world, mode="fewest_steps")
+
+    path = planner.plan()
+    planner.move_to(path[2])
+    world.apply_edits([(path[4], "WA"), (path[5], "WA")])
+    path = planner.plan()
+
+    assert len(path) == len(pf.chart_course(planner.hearth, pythonia))
+
+    # Walling in the goal leaves no route
+    world.apply_edits([(PathGlyph(10, 6), "WA"), (PathGlyph(11, 6), "WA"), (PathGlyph(10, 7), "WA")])
+    assert planner.plan() is None
+    assert planner.last_run_stats["success"] is False
+
+def test_edits_invalidate_derived_products(tmp_path):
+    world = _world(tmp_path)
+    cache = Course_Cache(world)
+    pf = Saladin_Pathfinder(world, course_cache=cache)
+    goal = PathGlyph(11, 0)
+    pf.flow_field(goal)
+
+    path = pf.chart_course(PathGlyph(0, 0), goal)
+    world.set_terrain(path[1], "WA")
+    detour = pf.chart_course(PathGlyph(0, 0), goal)
+
+    assert pf.last_run_stats["cache"] == "miss"
+    assert "flow_field" not in pf.last_run_stats
+    assert path[1] not in detour
@@ -0,0 +1,78 @@
+# tests/test_tiled_world.py
+"""
+Tests for Tiled_Anvil: a world paged in from a tiled map file must search
+exactly like the in-memory Map_Anvil while keeping few tiles resident.
+"""
+
+import pytest
+
+from runes.runes import PathGlyph
+from world.grid_forge import Map_Anvil
+from world.map_codex import convert_to_tiled
+from world.tiled_anvil import Tiled_Anvil
+from aris.saladin_pathfinder import Saladin_Pathfinder
+
+def _source(tmp_path, width=21, height=19):
+    """Mixed terrain with a few wall runs; width is not a multiple of 8."""
+    codes = ["WG", "FR", "DD", "FL", "MM", "SM"]
+    rows = []
+    for y in range(height):
+        row = []
+        for x in range(width):
+            if (x == 7 and y < 14) or (y == 11 and 3 < x < 18):
+                row.append("WA")
+            else:
+                row.append(codes[(x * 7 + y * 3) % len(codes)])
+        rows.append(row)
+    file = tmp_path / "source.json"
+    file.write_text(str(rows).replace("'", '"'))
+    return file
+
+@pytest.mark.parametrize("width", [21, 24])
+def test_tiled_world_matches_dense(tmp_path, width):
+    file = _source(tmp_path, width=width)
+    dense = Map_Anvil(str(file))
+    tiled = Tiled_Anvil(str(convert_to_tiled(file, tile_size=8)), max_tiles=3)
+
+    assert (tiled.width, tiled.height) == (dense.width, dense.height)
+    assert tiled.grid == dense.grid
+    assert [tiled.passable_bits[b] for b in range(len(dense.passable_bits))] == list(dense.passable_bits)
+    assert [tiled.direction_masks[i] for i in range(len(dense.direction_masks))] == list(dense.direction_masks)
+
+    journeys = [(PathGlyph(0, 0), PathGlyph(width - 1, 18)), (PathGlyph(10, 18), PathGlyph(2, 2))]
+    for engine in ("indexed", "jps", "bidirectional"):
+        for mode in ("lowest_energy", "fewest_steps"):
+            expected = Saladin_Pathfinder(dense, mode=mode, engine=engine)
+            paged = Saladin_Pathfinder(tiled, mode=mode, engine=engine)
+            for hearth, pythonia in journeys:
+                assert paged.chart_course(hearth, pythonia) == expected.chart_course(hearth, pythonia)
+
+def test_tile_cache_is_bounded_and_counted(tmp_path):
+    file = _source(tmp_path, width=24)
+    tiled = Tiled_Anvil(str(convert_to_tiled(file, tile_size=8)), max_tiles=2)
+    pf = Saladin_Pathfinder(tiled)
+
+    pf.chart_course(PathGlyph(0, 0), PathGlyph(23, 18))
+    stats = pf.last_run_stats
+    assert stats["tile_loads"] > 2
+    assert stats["tiles_resident"] == 2
+    assert stats["tile_evictions"] == stats["tile_loads"] - 2
+
+    # A short hop inside one resident tile pages nothing in
+    pf.chart_course(PathGlyph(21, 17), PathGlyph(22, 18))
+    assert pf.last_run_stats["tile_loads"] == 0
+
+def test_tiled_edits_stay_in_memory(tmp_path):
+    file = _source(tmp_path)
+    path = convert_to_tiled(file, tile_size=8)
+    tiled = Tiled_Anvil(str(path), max_tiles=1)
+
+    tiled.set_terrain(PathGlyph(0, 0), "WA")
+    tiled.set_terrain(PathGlyph(20, 18), "SM")
+    assert not tiled.is_traversable(0, 0)
+    assert tiled.terrain_at(PathGlyph(20, 18)) == "shadow_mountain"
+    assert tiled.version == 2
+
+    assert Tiled_Anvil(str(path)).is_traversable(0, 0)
+    with pytest.raises(ValueError):
+        Map_Anvil(str(path))
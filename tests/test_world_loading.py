@@ -77,4 +77,124 @@ def test_ascii_render_structure(tmp_path):
     assert len(lines) == 2
     assert all(len(line) == 3 for line in lines)
     
-    
\ No newline at end of file
+    
+def test_compact_store_matches_terrain(tmp_path):
+    """Codes, costs and passability bitmap must agree with the terrain."""
+    file = tmp_path / "compact.json"
+    file.write_text("""
+    [
+        ["WG", "DD", "WA"],
+        ["MM", "WA", "FL"]
+    ]
+    """)
+
+    world = Map_Anvil(str(file))
+    assert len(world.terrain_codes) == 6
+    assert world.cost_at(PathGlyph(1, 0)) == TERRAIN_CATALOGUE["desert_of_doom"]
+    assert world.cost_at(PathGlyph(2, 0)) == float("inf")
+    assert world.is_traversable(0, 1)
+    assert not world.is_traversable(1, 1)
+    assert world.grid[1] == ["muddy_marsh", "wall_of_ancients", "frozen_lake"]
+    assert PathGlyph(1, 1) not in world.neighbours(PathGlyph(0, 0))
+
+@pytest.mark.parametrize("text", [
+    '[["WG", "WG"], ["WG", 3]]',
+    '[["WG", "WG"] ["WG", "WG"]]',
+    '[["WG", "WG"], [["WG", "WG"]]]',
+    '[["WG", "WG"], ["WG", "WG"]',
+    '[]',
+    '{"grid": [["WG"]]}',
+])
+def test_malformed_json_rejected(tmp_path, text):
+    """The streaming reader must reject anything but a rectangular 2D list."""
+    file = tmp_path / "malformed.json"
+    file.write_text(text)
+    with pytest.raises(ValueError):
+        Map_Anvil(str(file))
+
+def test_streaming_reader_across_chunks(tmp_path, monkeypatch):
+    """Rows split between read chunks must decode the same."""
+    import world.map_codex as map_codex
+
+    file = tmp_path / "chunked.json"
+    file.write_text('[\n' + ',\n'.join(['["WG", "frozen_lake", "WA", "SM"]'] * 6) + '\n]\n')
+    whole = Map_Anvil(str(file))
+
+    monkeypatch.setattr(map_codex, "CHUNK_SIZE", 7)
+    chunked = Map_Anvil(str(file))
+    assert (chunked.width, chunked.height) == (4, 6)
+    assert bytes(chunked.terrain_codes) == bytes(whole.terrain_codes)
+
+def test_binary_map_round_trip(tmp_path):
+    """A converted map loads identically, memory-mapped or not."""
+    from world.map_codex import convert_json_map
+
+    file = tmp_path / "round.json"
+    file.write_text("""
+    [
+        ["WG", "DD", "WA", "FR", "MM"],
+        ["SM", "WA", "FL", "WG", "WG"],
+        ["WG", "WG", "WG", "WA", "DD"]
+    ]
+    """)
+    world = Map_Anvil(str(file))
+    binary = convert_json_map(file)
+    assert binary.suffix == ".anvil"
+
+    for use_mmap in (True, False):
+        loaded = Map_Anvil(str(binary), use_mmap=use_mmap)
+        assert (loaded.width, loaded.height) == (5, 3)
+        assert bytes(loaded.terrain_codes) == bytes(world.terrain_codes)
+        assert list(loaded.cost_grid) == list(world.cost_grid)
+        assert bytes(loaded.passable_bits) == bytes(world.passable_bits)
+
+    # Edits to a mapped world stay in memory
+    mapped = Map_Anvil(str(binary))
+    mapped.set_terrain(PathGlyph(0, 0), "WA")
+    assert not mapped.is_traversable(0, 0)
+    assert Map_Anvil(str(binary)).is_traversable(0, 0)
+
+    mapped.save_binary(str(tmp_path / "edited.anvil"))
+    assert not Map_Anvil(str(tmp_path / "edited.anvil")).is_traversable(0, 0)
+
+def test_corrupt_binary_map_rejected(tmp_path):
+    """Truncated files and unknown codes must raise a ValueError."""
+    from world.map_codex import write_binary_map
+
+    file = tmp_path / "bad.anvil"
+    write_binary_map(file, bytes([0, 1, 2, 40]), 2, 2)
+    with pytest.raises(ValueError):
+        Map_Anvil(str(file))
+
+    write_binary_map(file, bytes([0, 1, 2, 3]), 2, 2)
+    file.write_bytes(file.read_bytes()[:-1])
+    with pytest.raises(ValueError):
+        Map_Anvil(str(file))
+
+def test_direction_masks_match_neighbours(tmp_path):
+    """Each mask bit must agree with a bounds + terrain check, also after edits."""
+    from world.grid_forge import DIRECTIONS
+
+    file = tmp_path / "masks.json"
+    file.write_text("""
+    [
+        ["WG", "WA", "FR", "WG", "DD"],
+        ["WA", "WG", "WG", "WA", "WG"],
+        ["FL", "WG", "WA", "WG", "SM"]
+    ]
+    """)
+    world = Map_Anvil(str(file))
+
+    def expected(x, y):
+        mask = 0
+        for d, (dx, dy) in enumerate(DIRECTIONS):
+            if world.in_bounds(x + dx, y + dy) and world.is_traversable(x + dx, y + dy):
+                mask |= 1 << d
+        return mask
+
+    for edit in (None, (PathGlyph(2, 1), "WA"), (PathGlyph(1, 0), "MM")):
+        if edit is not None:
+            world.set_terrain(*edit)
+        for y in range(world.height):
+            for x in range(world.width):
+                assert world.direction_masks[world.index_of(x, y)] == expected(x, y)
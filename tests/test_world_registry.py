@@ -0,0 +1,80 @@
+# tests/test_world_registry.py
+"""
+Tests for World_Registry: cached worlds, content-hash keys, eviction
+and invalidation.
+"""
+
+import os
+
+from world.map_smith import forge_terrain, write_map
+from world.world_registry import World_Registry
+
+def _write(path, rows):
+    path.write_text("[" + ",".join(
+        "[" + ",".join(f'"{cell}"' for cell in row) + "]" for row in rows
+    ) + "]")
+
+def test_repeat_fetch_is_a_hit(tmp_path):
+    file = tmp_path / "a.json"
+    _write(file, [["WG", "WG"]])
+    registry = World_Registry()
+
+    first = registry.fetch(str(file))
+    assert registry.fetch(str(file)) is first
+    assert registry.stats()["hits"] == 1
+    assert registry.stats()["misses"] == 1
+
+def test_changed_contents_reload(tmp_path):
+    file = tmp_path / "b.json"
+    _write(file, [["WG", "WG"]])
+    registry = World_Registry()
+    first, products = registry.fetch_with_products(str(file))
+    products["note"] = "first"
+
+    _write(file, [["WG", "WA", "WG"]])
+    os.utime(file, ns=(1, 1))
+    second, products = registry.fetch_with_products(str(file))
+
+    assert second is not first and registry.fetch(str(file)) is second
+    assert second.width == 3
+    assert products == {} and registry.products(str(file)) is products
+    assert registry.stats()["worlds"] == 1
+
+def test_touched_but_identical_file_is_a_hit(tmp_path):
+    file = tmp_path / "c.json"
+    _write(file, [["WG"]])
+    registry = World_Registry()
+    first = registry.fetch(str(file))
+
+    os.utime(file, ns=(5, 5))
+    assert registry.fetch(str(file)) is first
+    assert registry.stats()["misses"] == 1
+
+def test_lru_eviction_and_invalidation(tmp_path):
+    registry = World_Registry(max_worlds=2)
+    files = []
+    for name in "xyz":
+        file = tmp_path / f"{name}.json"
+        _write(file, [["WG", "FR"]])
+        files.append(str(file))
+        registry.fetch(str(file))
+
+    stats = registry.stats()
+    assert stats["worlds"] == 2
+    assert stats["evictions"] == 1
+
+    registry.products(files[2])["note"] = "derived"
+    assert registry.invalidate(files[2]) == 1
+    assert "note" not in registry.products(files[2])
+    assert registry.stats()["invalidations"] == 1
+
+def test_binary_worlds_survive_rewrites_of_their_file(tmp_path):
+    codes = forge_terrain(16, 16, seed=1)
+    file = str(write_map(tmp_path / "d.anvil", codes, 16, 16))
+    registry = World_Registry()
+    world = registry.fetch(file)
+
+    with open(file, "wb"):
+        pass
+    assert bytes(world.terrain_codes) == codes.tobytes()
+    assert world.render_ascii()
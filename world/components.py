@@ -0,0 +1,278 @@
+"""
+components.py
+-------------
+Connected regions of a map, for rejecting impossible queries at once.
+
+Passable cells are labelled by 8-connected component, the same moves
+neighbours() offers, so two cells share a label exactly when a path
+joins them. Walls get label 0. Labelling runs over horizontal runs of
+passable cells rather than single cells: runs in neighbouring rows are
+joined when they overlap or touch diagonally.
+
+The index follows the map's edits. An opened cell takes the label of
+its neighbours, merging their regions into the largest one. A closed
+cell can only split its region if its passable neighbours are not
+joined around it; in that case (or when closed cells touch) the labels
+are rebuilt on the next query.
+
+A search may start on a wall, so reachable() also accepts a start whose
+passable neighbours lie in the goal's region.
+"""
+
+from array import array
+from typing import Dict, List, Set
+import re
+import threading
+import time
+
+from world.grid_forge import DIRECTIONS, Map_Anvil, Terrain_Change, follow_edits
+
+# Runs of passable cells in a row of "0"/"1" flags
+_RUN = re.compile("1+")
+
+
+def _ring_joined(mask: int) -> bool:
+    """True if the neighbours in mask are 8-connected without the centre."""
+    ring = [DIRECTIONS[d] for d in range(8) if mask >> d & 1]
+    if len(ring) < 2:
+        return True
+    seen = {ring[0]}
+    stack = [ring[0]]
+    while stack:
+        x, y = stack.pop()
+        for other in ring:
+            if other not in seen and abs(other[0] - x) <= 1 and abs(other[1] - y) <= 1:
+                seen.add(other)
+                stack.append(other)
+    return len(seen) == len(ring)
+
+
+# direction mask -> whether closing the centre cell keeps its neighbours joined
+RING_JOINED = tuple(_ring_joined(mask) for mask in range(256))
+
+
+class Component_Index:
+    """
+    Component label of every cell of a world (see Map_Anvil.components).
+
+    Attributes:
+        labels (array): label per cell, 0 for walls
+        sizes (dict): label -> number of cells
+        build_time (float): seconds the last full labelling took
+        rebuilds (int): full labellings so far, the first included
+        merges (int): regions joined by opened cells
+    """
+
+    def __init__(self, world: Map_Anvil):
+        if world.lazy:
+            raise ValueError("Tiled worlds are paged from disk; components need the whole map")
+
+        self.world = world
+        self._offsets = tuple(dy * world.width + dx for dx, dy in DIRECTIONS)
+        self._lock = threading.Lock()
+        self.rebuilds = 0
+        self.merges = 0
+        self._label_all()
+
+        follow_edits(world, self, Component_Index._follow)
+
+    # ------------------------------------------------------------
+    # PUBLIC METHODS
+    # ------------------------------------------------------------
+    def label_at(self, index: int) -> int:
+        """Component label of a cell (0 for walls)."""
+        self._refresh()
+        return self.labels[index]
+
+    def reachable(self, start: int, goal: int) -> bool:
+        """
+        True if some path leads from start to goal. The goal must be
+        passable; the start may be a wall.
+        """
+        if start == goal:
+            return True
+        self._refresh()
+        labels = self.labels
+        target = labels[goal]
+        if not target:
+            return False
+        label = labels[start]
+        if label:
+            return label == target
+
+        # A wall start steps straight onto one of its passable neighbours
+        mask = self.world.direction_masks[start]
+        return any(
+            labels[start + offset] == target
+            for d, offset in enumerate(self._offsets)
+            if mask >> d & 1
+        )
+
+    @property
+    def component_count(self) -> int:
+        self._refresh()
+        return len(self.sizes)
+
+    def memory_bytes(self) -> int:
+        """Size of the label array."""
+        return len(self.labels) * self.labels.itemsize
+
+    # ------------------------------------------------------------
+    # INTERNAL: FULL LABELLING
+    # ------------------------------------------------------------
+    def _refresh(self) -> None:
+        """Relabel if an edit may have split a region."""
+        if self._stale or self.version != self.world.version:
+            with self._lock:
+                if self._stale or self.version != self.world.version:
+                    self._label_all()
+
+    def _label_all(self) -> None:
+        started = time.perf_counter()
+        world = self.world
+        width, height = world.width, world.height
+        bits = world.passable_bits
+
+        # One "0"/"1" flag per cell, lowest index first (the extra top bit
+        # keeps leading zeros)
+        flags = bin(int.from_bytes(bits, "little") | 1 << (len(bits) * 8))[:2:-1]
+
+        # Union-find over runs; runs of one row are (start, end, run id)
+        parent: List[int] = []
+
+        def root(run: int) -> int:
+            while parent[run] != run:
+                parent[run] = parent[parent[run]]
+                run = parent[run]
+            return run
+
+        rows: List[List[tuple]] = []
+        previous: List[tuple] = []
+        for y in range(height):
+            current = []
+            first = 0
+            for match in _RUN.finditer(flags, y * width, (y + 1) * width):
+                start, end = match.start() - y * width, match.end() - y * width
+                run = len(parent)
+                parent.append(run)
+
+                # Runs above touching [start - 1, end], diagonals included
+                while first < len(previous) and previous[first][1] < start:
+                    first += 1
+                above = first
+                while above < len(previous) and previous[above][0] <= end:
+                    a, b = root(run), root(previous[above][2])
+                    if a != b:
+                        parent[a] = b
+                    above += 1
+                current.append((start, end, run))
+            rows.append(current)
+            previous = current
+
+        labels = array("i", bytes(4 * width * height))
+        sizes: Dict[int, int] = {}
+        label_of: Dict[int, int] = {}
+        for y, runs in enumerate(rows):
+            base = y * width
+            for start, end, run in runs:
+                top = root(run)
+                label = label_of.get(top)
+                if label is None:
+                    label = label_of[top] = len(label_of) + 1
+                labels[base + start:base + end] = array("i", [label]) * (end - start)
+                sizes[label] = sizes.get(label, 0) + end - start
+
+        self.labels = labels
+        self.sizes = sizes
+        self._next_label = len(label_of) + 1
+        self._stale = False
+        self.version = world.version
+        self.rebuilds += 1
+        self.build_time = time.perf_counter() - started
+
+    # ------------------------------------------------------------
+    # INTERNAL: FOLLOWING EDITS
+    # ------------------------------------------------------------
+    def _follow(self, change: Terrain_Change) -> None:
+        with self._lock:
+            if self._stale or self.version != change.version - 1:
+                self._stale = True
+                return
+
+            world = self.world
+            labels = self.labels
+            opened: List[int] = []
+            closed: List[int] = []
+            for index, _, _ in change.cells:
+                now_open = world.is_passable_index(index)
+                if now_open and not labels[index]:
+                    opened.append(index)
+                elif labels[index] and not now_open:
+                    closed.append(index)
+
+            removed = set(closed)
+            for index in closed:
+                label = labels[index]
+                labels[index] = 0
+                self.sizes[label] -= 1
+                if not self.sizes[label]:
+                    del self.sizes[label]
+            for index in closed:
+                if not self._still_joined(index, removed):
+                    self._stale = True
+                    return
+
+            for index in opened:
+                self._open(index)
+            self.version = change.version
+
+    def _still_joined(self, index: int, removed: Set[int]) -> bool:
+        """True if closing index (with the rest of removed) keeps its region whole."""
+        mask = self.world.direction_masks[index]
+        if len(removed) > 1:
+            y, x = divmod(index, self.world.width)
+            for (dx, dy), offset in zip(DIRECTIONS, self._offsets):
+                if self.world.in_bounds(x + dx, y + dy) and index + offset in removed:
+                    return False
+        return RING_JOINED[mask]
+
+    def _open(self, index: int) -> None:
+        """Label a newly passable cell, merging the regions it joins."""
+        labels, sizes = self.labels, self.sizes
+        mask = self.world.direction_masks[index]
+        around = {
+            labels[index + offset]
+            for d, offset in enumerate(self._offsets)
+            if mask >> d & 1
+        }
+        # Neighbours opened later in the same batch join when they are labelled
+        around.discard(0)
+
+        if not around:
+            label = self._next_label
+            self._next_label += 1
+            sizes[label] = 0
+        else:
+            label = max(around, key=sizes.__getitem__)
+            around.discard(label)
+        labels[index] = label
+        sizes[label] += 1
+        if around:
+            self._relabel(index, around, label)
+
+    def _relabel(self, index: int, merged: Set[int], label: int) -> None:
+        """Give every cell of the merged regions, reached from index, label."""
+        labels, masks, offsets = self.labels, self.world.direction_masks, self._offsets
+        stack = [index]
+        while stack:
+            cell = stack.pop()
+            mask = masks[cell]
+            for d, offset in enumerate(offsets):
+                if mask >> d & 1:
+                    neighbour = cell + offset
+                    if labels[neighbour] in merged:
+                        labels[neighbour] = label
+                        stack.append(neighbour)
+        for old in merged:
+            self.sizes[label] += self.sizes.pop(old)
+        self.merges += len(merged)
@@ -0,0 +1,154 @@
+"""
+cost_profiles.py
+----------------
+Terrain cost profiles: the movement cost of every terrain for one kind
+of traveller.
+
+STANDARD is TERRAIN_CATALOGUE. Other profiles override some of its costs
+(a mountain goat crosses shadow_mountain cheaply) or make a terrain
+impassable. Each profile is compiled once into bytes.translate tables
+from terrain code to float32 cost bytes and to passability, so pricing a
+loaded map with it takes a few passes at C speed (see
+Map_Anvil.with_profile) and never touches global state.
+
+Costs are rounded to float32, the precision of the cost layers, so the
+cheapest cost a profile reports is exactly the cheapest step a search
+can take, and octile heuristics priced with it stay admissible.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Mapping, Optional, Tuple, Union
+import struct
+
+from world.terrain_legends import (
+    DIAGONAL_PENALTY,
+    IDENTIFIER_CODES,
+    TERRAIN_CATALOGUE,
+    TERRAIN_CODES,
+)
+
+INF = float("inf")
+
+_FLOAT32 = struct.Struct("=f")
+
+
+@dataclass(frozen=True)
+class Cost_Profile:
+    """
+    Movement costs for one kind of traveller.
+
+    Attributes:
+        name (str): label used in requests and stats
+        costs (tuple): cost of each terrain code (see TERRAIN_CODES);
+                       inf makes that terrain impassable
+    """
+    name: str
+    costs: Tuple[float, ...]
+    cost_tables: Tuple[bytes, ...] = field(init=False, repr=False, compare=False)
+    passable_table: bytes = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if len(self.costs) != len(TERRAIN_CODES):
+            raise ValueError(f"Profile {self.name} needs one cost per terrain")
+        for terrain, cost in zip(TERRAIN_CODES, self.costs):
+            if not cost > 0:
+                raise ValueError(f"Cost of {terrain} must be positive, got {cost}")
+        if all(cost == INF for cost in self.costs):
+            raise ValueError(f"Profile {self.name} leaves no terrain passable")
+
+        costs = tuple(_FLOAT32.unpack(_FLOAT32.pack(cost))[0] for cost in self.costs)
+        object.__setattr__(self, "costs", costs)
+
+        # Code -> k-th byte of its float32 cost, and code -> 1 if passable
+        object.__setattr__(self, "cost_tables", tuple(
+            bytes(
+                _FLOAT32.pack(costs[code])[k] if code < len(costs) else 0
+                for code in range(256)
+            )
+            for k in range(4)
+        ))
+        object.__setattr__(self, "passable_table", bytes(
+            1 if code < len(costs) and costs[code] < INF else 0
+            for code in range(256)
+        ))
+
+    @classmethod
+    def from_overrides(
+        cls,
+        name: str,
+        overrides: Mapping[str, float],
+        base: Optional["Cost_Profile"] = None,
+    ) -> "Cost_Profile":
+        """
+        base (STANDARD by default) with some terrain costs replaced.
+        Terrains may be given by long name or shortcode.
+        """
+        costs = list((base or STANDARD).costs)
+        for terrain, cost in overrides.items():
+            code = IDENTIFIER_CODES.get(terrain) if isinstance(terrain, str) else None
+            if code is None:
+                raise ValueError(f"Unknown terrain identifier: {terrain}")
+            try:
+                costs[code] = float(cost)
+            except (TypeError, ValueError):
+                raise ValueError(f"Cost of {terrain} must be a number, got {cost!r}") from None
+        return cls(name, tuple(costs))
+
+    @property
+    def minimum_cost(self) -> float:
+        """Cheapest passable terrain; the per-step price of the heuristic."""
+        return min(cost for cost in self.costs if cost < INF)
+
+    @property
+    def diagonal_minimum_cost(self) -> float:
+        """
+        Cheapest diagonal step for the heuristic. Two straight steps
+        cover a diagonal too, and undercut a penalised diagonal when a
+        terrain costs less than DIAGONAL_PENALTY.
+        """
+        cheapest = self.minimum_cost
+        return min(cheapest + DIAGONAL_PENALTY, 2.0 * cheapest)
+
+    def cost_of(self, terrain: str) -> float:
+        """Cost of a terrain given by long name or shortcode."""
+        return self.costs[IDENTIFIER_CODES[terrain]]
+
+
+STANDARD = Cost_Profile("standard", tuple(TERRAIN_CATALOGUE[name] for name in TERRAIN_CODES))
+
+# Named profiles selectable by requests; add more with register_profile()
+PROFILES: Dict[str, Cost_Profile] = {
+    "standard": STANDARD,
+    "mountain_goat": Cost_Profile.from_overrides(
+        "mountain_goat", {"shadow_mountain": 1.5, "frozen_lake": 5.0}
+    ),
+    "marsh_strider": Cost_Profile.from_overrides(
+        "marsh_strider", {"muddy_marsh": 1.0, "desert_of_doom": 6.0}
+    ),
+}
+
+Profile_Spec = Union[None, str, Mapping[str, float], Cost_Profile]
+
+
+def register_profile(profile: Cost_Profile) -> None:
+    """Make profile selectable by name."""
+    PROFILES[profile.name] = profile
+
+
+def resolve_profile(spec: Profile_Spec) -> Cost_Profile:
+    """
+    Cost_Profile for a request: None means STANDARD, a string names a
+    registered profile, and a mapping overrides STANDARD's costs.
+    """
+    if spec is None:
+        return STANDARD
+    if isinstance(spec, Cost_Profile):
+        return spec
+    if isinstance(spec, str):
+        profile = PROFILES.get(spec)
+        if profile is None:
+            raise ValueError(f"Unknown cost profile: {spec}")
+        return profile
+    if isinstance(spec, Mapping):
+        return Cost_Profile.from_overrides("custom", spec)
+    raise ValueError(f"Cost profile must be a name or a terrain -> cost mapping, got {spec!r}")
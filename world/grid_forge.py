@@ -2,142 +2,423 @@
 grid_forge.py
 ---------------------------------
 
-This module loads map JSON files, validates the terrain identifiers,
-converts short codes to long terrain names, and provides neighbour lookup
-and ASCII rendering utilities.
+This module loads map files (JSON or the binary format of map_codex),
+validates the terrain identifiers, and provides neighbour lookup and
+ASCII rendering utilities.
+
+The grid is stored compactly as flat row-major arrays (index = y * width + x):
+
+    - terrain_codes : one byte per cell (see TERRAIN_CODES)
+    - cost_grid     : float32 movement cost per cell
+    - passable_bits : packed bitmap, one bit per cell
+    - direction_masks : one byte per cell; bit d is set when the step in
+                      DIRECTIONS[d] stays on the map and lands on
+                      passable terrain, so expanding a cell needs no
+                      bounds or terrain checks
+
+Terrain can be edited after loading with set_terrain() or apply_edits().
+version counts edit batches; anything derived from the map (path caches,
+flow fields, ...) compares it to know when it has gone stale, and
+subscribe() delivers a Terrain_Change for every batch.
+
+Costs come from a Cost_Profile (STANDARD unless stated). with_profile()
+returns a Profiled_Anvil: the same map priced for another traveller,
+compiled once and kept on the map, that follows its edits.
+
+components() labels the connected regions of passable cells, so a goal
+that cannot be reached is known without searching.
 """
 
-import json
-from typing import List, Dict, Optional
+from array import array
+from dataclasses import dataclass
+from collections import OrderedDict
+from typing import Callable, Iterable, List, Dict, Optional, Tuple
 from pathlib import Path
+import weakref
 
 from runes.runes import PathGlyph
+from world.map_codex import (
+    is_binary_map,
+    is_tiled_map,
+    read_binary_map,
+    read_terrain_json,
+    write_binary_map,
+)
+from world.cost_profiles import STANDARD, Cost_Profile
 from world.terrain_legends import (
-    TERRAIN_CATALOGUE,
+    IDENTIFIER_CODES,
+    TERRAIN_CODES,
+    TERRAIN_SHORTCODES,
     TERRAIN_SYMBOLS,
-    is_valid_terrain,
-    minimum_traversable_cost,
 )
 
-TERRAIN_SHORTCODES: Dict[str, str] = {
-    "WG": "whispering_grassland",
-    "FR": "forest_of_reflections",
-    "DD": "desert_of_doom",
-    "FL": "frozen_lake",
-    "MM": "muddy_marsh",
-    "SM": "shadow_mountain",
-    "WA": "wall_of_ancients",
+# Compact arrays that fully describe a forged map, with their item formats
+LAYER_FORMATS: Dict[str, str] = {
+    "terrain_codes": "B",
+    "cost_grid": "f",
+    "passable_bits": "B",
+    "direction_masks": "B",
 }
 
+# The eight moves (dx, dy), in neighbours() order; bit d of a direction
+# mask stands for DIRECTIONS[d]
+DIRECTIONS: Tuple[Tuple[int, int], ...] = (
+    (-1, -1), (0, -1), (1, -1),
+    (-1,  0),          (1,  0),
+    (-1,  1), (0,  1), (1,  1),
+)
+
+# Profile views kept per map (see with_profile), most recently used last
+PROFILE_VIEW_LIMIT = 8
+
+
+@dataclass(frozen=True)
+class Terrain_Change:
+    """
+    One batch of terrain edits, as delivered to change listeners.
+
+    Attributes:
+        version (int): world version after the batch
+        cells (tuple): (index, old code, new code) for every changed cell
+    """
+    version: int
+    cells: Tuple[Tuple[int, int, int], ...]
+
+    @property
+    def indices(self) -> List[int]:
+        return [index for index, _, _ in self.cells]
+
+
+def follow_edits(world: "Map_Anvil", owner, on_change: Callable[[object, Terrain_Change], None]) -> None:
+    """
+    Call on_change(owner, change) after every batch of edits to world,
+    holding owner only weakly: once it is gone the listener removes
+    itself, so maps never keep their derived products alive.
+    """
+    owner_ref = weakref.ref(owner)
+
+    def follow(change: Terrain_Change) -> None:
+        current = owner_ref()
+        if current is None:
+            world.unsubscribe(follow)
+            return
+        on_change(current, change)
+
+    world.subscribe(follow)
+
+
+def forge_cost_layer(codes, profile: Cost_Profile = STANDARD) -> array:
+    """float32 movement cost of every cell in a run of terrain codes."""
+    raw = bytes(codes)
+    cost_bytes = bytearray(4 * len(raw))
+    for k, table in enumerate(profile.cost_tables):
+        cost_bytes[k::4] = raw.translate(table)
+    costs = array("f")
+    costs.frombytes(cost_bytes)
+    return costs
+
+
+def forge_passable_bits(codes, profile: Cost_Profile = STANDARD) -> bytearray:
+    """Packed passability bitmap (bit i = cell i) of a run of terrain codes."""
+    raw = bytes(codes)
+    # Bit k of each bitmap byte comes from every 8th flag starting at k
+    flags = raw.translate(profile.passable_table) + bytes(-len(raw) % 8)
+    packed = 0
+    for k in range(8):
+        packed |= int.from_bytes(flags[k::8], "little") << k
+    return bytearray(packed.to_bytes(len(flags) // 8, "little"))
+
+
+def forge_direction_masks(
+    codes,
+    width: int,
+    height: int,
+    profile: Cost_Profile = STANDARD,
+) -> bytearray:
+    """
+    Direction mask of every cell, built a whole direction at a time: the
+    passability flags shifted by the step's index offset, with the
+    columns that would wrap around a row edge cleared.
+    """
+    flags = bytes(codes).translate(profile.passable_table)
+    size = len(flags)
+    not_first = int.from_bytes((b"\x00" + b"\x01" * (width - 1)) * height, "little")
+    not_last = int.from_bytes((b"\x01" * (width - 1) + b"\x00") * height, "little")
+
+    masks = 0
+    for d, (dx, dy) in enumerate(DIRECTIONS):
+        offset = dy * width + dx
+        if offset > 0:
+            shifted = flags[offset:] + bytes(min(offset, size))
+        else:
+            shifted = bytes(min(-offset, size)) + flags[:max(size + offset, 0)]
+        value = int.from_bytes(shifted, "little")
+        if dx < 0:
+            value &= not_first
+        elif dx > 0:
+            value &= not_last
+        masks |= value << d
+    return bytearray(masks.to_bytes(size, "little"))
+
 
 class Map_Anvil:
     """
     Forged world map loader and validator.
     """
 
-    def __init__(self, json_path: str):
+    # Layers are plain in-memory arrays (Tiled_Anvil pages them from disk)
+    lazy = False
+
+    # Costs the layers are built with (Profiled_Anvil uses others)
+    profile: Cost_Profile = STANDARD
+
+    # Component_Index, built on first use (see components)
+    _components = None
+
+    def __init__(self, json_path: str, use_mmap: bool = True):
         """
-        Load and validate a world grid from a JSON file.
+        Load and validate a world grid from a JSON map or a binary map
+        (recognised by its header). Binary maps are memory-mapped unless
+        use_mmap is False.
         """
         self.json_path = Path(json_path)
 
         if not self.json_path.exists():
             raise FileNotFoundError(f"Map file not found: {self.json_path}")
 
-        raw_grid = self._load_json()
-        self._validate_structure(raw_grid)
-        self.grid = self._normalise_grid(raw_grid)
+        if is_tiled_map(self.json_path):
+            raise ValueError(f"{self.json_path} is a tiled map; open it with Tiled_Anvil")
+        if is_binary_map(self.json_path):
+            codes, width, height = read_binary_map(self.json_path, use_mmap=use_mmap)
+        else:
+            codes, width, height = read_terrain_json(self.json_path)
 
-        self.height = len(self.grid)
-        self.width = len(self.grid[0])
+        self._forge(codes, width=width, height=height)
 
     # ------------------------------------------------------------
     # INTERNAL UTILITIES
     # ------------------------------------------------------------
-    def _load_json(self) -> List[List[str]]:
-        """Load the JSON file."""
-        with open(self.json_path, "r", encoding="utf-8") as file:
-            return json.load(file)
-
-    def _validate_structure(self, raw_grid: List[List[str]]) -> None:
-        """Ensure the map is a rectangular 2D list."""
-        if not isinstance(raw_grid, list) or len(raw_grid) == 0:
-            raise ValueError("Map must be a non-empty 2D list.")
-
-        expected_row_length = len(raw_grid[0])
-        for row in raw_grid:
-            if not isinstance(row, list):
-                raise ValueError("Row in the map is not a list.")
-            if len(row) != expected_row_length:
-                raise ValueError("Map rows must all be the same length.")
-
-    def _normalise_grid(self, raw_grid: List[List[str]]) -> List[List[str]]:
-        """Convert terrain short codes to long names."""
-        normalised = []
-
-        for row in raw_grid:
-            new_row = []
-            for cell in row:
-                if is_valid_terrain(cell):
-                    new_row.append(cell)
-                elif cell in TERRAIN_SHORTCODES:
-                    new_row.append(TERRAIN_SHORTCODES[cell])
-                else:
-                    raise ValueError(f"Unknown terrain identifier: {cell}")
-            normalised.append(new_row)
-
-        return normalised
+    def _forge(self, codes, width: int, height: int) -> None:
+        """Build the cost array and passability bitmap from terrain codes."""
+        self.width = width
+        self.height = height
+        self.version = 0
+        self._listeners: List[Callable[[Terrain_Change], None]] = []
+        self._profile_views: "OrderedDict[Tuple[float, ...], Profiled_Anvil]" = OrderedDict()
+        self.terrain_codes = codes
+        self.cost_grid = forge_cost_layer(codes)
+        self.passable_bits = forge_passable_bits(codes)
+        self.direction_masks = forge_direction_masks(codes, width, height)
 
     # ------------------------------------------------------------
     # PUBLIC METHODS
     # ------------------------------------------------------------
+    @classmethod
+    def from_layers(
+        cls,
+        width: int,
+        height: int,
+        layers: Dict[str, memoryview],
+        source: str = "<layers>",
+        profile: Cost_Profile = STANDARD,
+    ) -> "Map_Anvil":
+        """
+        Wrap existing compact buffers (see layers()) without parsing or
+        copying, e.g. a map placed in shared memory by another process.
+        profile is the one the layers were priced with (a view's layers
+        carry its profile's costs).
+        """
+        world = cls.__new__(cls)
+        world.profile = profile
+        world.json_path = Path(source)
+        world.width = width
+        world.height = height
+        world.version = 0
+        world._listeners = []
+        world._profile_views = OrderedDict()
+        for name, item_format in LAYER_FORMATS.items():
+            setattr(world, name, memoryview(layers[name]).cast("B").cast(item_format))
+        return world
+
+    def with_profile(self, profile: Cost_Profile) -> "Map_Anvil":
+        """
+        This map priced with another Cost_Profile. The Profiled_Anvil is
+        compiled on first use and reused for the same costs; views of the
+        PROFILE_VIEW_LIMIT most recent profiles are kept. Returns the map
+        itself for its own profile.
+        """
+        if profile.costs == self.profile.costs:
+            return self
+        if self.lazy:
+            raise ValueError("Tiled worlds are paged from disk and only support the standard costs")
+
+        views = self._profile_views
+        view = views.get(profile.costs)
+        if view is None:
+            view = Profiled_Anvil(self, profile)
+            views[profile.costs] = view
+            if len(views) > PROFILE_VIEW_LIMIT:
+                views.popitem(last=False)
+        else:
+            views.move_to_end(profile.costs)
+        return view
+
+    def components(self):
+        """
+        The Component_Index of this map's passable cells, labelled on
+        first use and kept up to date under edits. Profile views have
+        their own, since their walls may differ.
+        """
+        if self._components is None:
+            # components imports this module, so it is loaded on demand
+            from world.components import Component_Index
+            self._components = Component_Index(self)
+        return self._components
+
+    def save_binary(self, path: str) -> None:
+        """Write the current terrain in the binary map format."""
+        write_binary_map(path, self.terrain_codes, self.width, self.height)
+
+    def layers(self) -> Dict[str, memoryview]:
+        """Raw bytes of each compact array, keyed by attribute name."""
+        return {name: memoryview(getattr(self, name)).cast("B") for name in LAYER_FORMATS}
+
+    @property
+    def grid(self) -> List[List[str]]:
+        """
+        Long-name view of the map as a list of rows.
+        Built on demand from the compact store; prefer terrain_at().
+        """
+        width = self.width
+        return [
+            [TERRAIN_CODES[code] for code in self.terrain_codes[y * width:(y + 1) * width]]
+            for y in range(self.height)
+        ]
+
+    def index_of(self, x: int, y: int) -> int:
+        """Flat row-major index of the cell at (x, y)."""
+        return y * self.width + x
+
+    def glyph_at_index(self, index: int) -> PathGlyph:
+        """PathGlyph for a flat row-major index."""
+        return PathGlyph(index % self.width, index // self.width)
+
     def terrain_at(self, glyph: PathGlyph) -> str:
-        return self.grid[glyph.y][glyph.x]
+        return TERRAIN_CODES[self.terrain_codes[glyph.y * self.width + glyph.x]]
 
     def cost_at(self, glyph: PathGlyph) -> float:
-        return TERRAIN_CATALOGUE[self.terrain_at(glyph)]
+        return self.cost_grid[glyph.y * self.width + glyph.x]
 
     def in_bounds(self, x: int, y: int) -> bool:
         return 0 <= y < self.height and 0 <= x < self.width
 
+    def is_passable_index(self, index: int) -> bool:
+        """Bitmap lookup for a flat index (no bounds check)."""
+        return bool(self.passable_bits[index >> 3] >> (index & 7) & 1)
+
     def is_traversable(self, x: int, y: int) -> bool:
         """
         Returns True if the cell at (x, y) is walkable.
         Impassable terrain is 'wall_of_ancients' (WA).
         """
-        terrain = self.grid[y][x]
-        return TERRAIN_CATALOGUE[self.grid[y][x]] < float("inf")
+        return self.is_passable_index(y * self.width + x)
 
+    def set_terrain(self, glyph: PathGlyph, terrain: str) -> Optional[Terrain_Change]:
+        """Change one cell to terrain (long name or short code)."""
+        return self.apply_edits([(glyph, terrain)])
 
+    def apply_edits(
+        self,
+        edits: Iterable[Tuple[PathGlyph, str]],
+    ) -> Optional[Terrain_Change]:
+        """
+        Apply a batch of (glyph, terrain) edits as one change.
 
+        Every edit is validated before any is written, so a bad edit
+        leaves the map untouched. Cells that already hold the requested
+        terrain are ignored; if nothing changes, returns None without
+        bumping the version. Otherwise the version goes up by one and
+        listeners receive the Terrain_Change, which is also returned.
+        """
+        staged: Dict[int, int] = {}
+        for glyph, terrain in edits:
+            if not self.in_bounds(glyph.x, glyph.y):
+                raise ValueError(f"Cell outside the map: ({glyph.x}, {glyph.y})")
+            code = IDENTIFIER_CODES.get(terrain) if isinstance(terrain, str) else None
+            if code is None:
+                raise ValueError(f"Unknown terrain identifier: {terrain}")
+            staged[glyph.y * self.width + glyph.x] = code
+
+        codes = self.terrain_codes
+        cells = []
+        for index, code in staged.items():
+            old = codes[index]
+            if old == code:
+                continue
+            self._write_cell(index, code)
+            cells.append((index, old, code))
+
+        if not cells:
+            return None
+
+        self.version += 1
+        change = Terrain_Change(self.version, tuple(cells))
+        for listener in list(self._listeners):
+            listener(change)
+        return change
+
+    def _write_cell(self, index: int, code: int) -> None:
+        """Store a new terrain code and its derived cost and passability."""
+        self.terrain_codes[index] = code
+        self._derive_cell(index, code)
+
+    def _derive_cell(self, index: int, code: int) -> None:
+        """Update the cost, passability and neighbour masks of one cell."""
+        cost = self.profile.costs[code]
+        was_open = self.is_passable_index(index)
+        now_open = cost < float("inf")
+
+        self.cost_grid[index] = cost
+        if now_open:
+            self.passable_bits[index >> 3] |= 1 << (index & 7)
+        else:
+            self.passable_bits[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+
+        if was_open == now_open:
+            return
+
+        # Every neighbour whose step d lands here gains or loses bit d
+        y, x = divmod(index, self.width)
+        masks = self.direction_masks
+        for d, (dx, dy) in enumerate(DIRECTIONS):
+            if self.in_bounds(x - dx, y - dy):
+                source = index - dy * self.width - dx
+                if now_open:
+                    masks[source] |= 1 << d
+                else:
+                    masks[source] &= ~(1 << d) & 0xFF
+
+    def subscribe(self, listener: Callable[[Terrain_Change], None]) -> None:
+        """Call listener(change) after every applied batch of edits."""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[Terrain_Change], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
 
     def neighbours(self, glyph: PathGlyph) -> List[PathGlyph]:
         """
         Returns all 8 adjacent cells, but ONLY those that are inside the map
         AND are traversable terrain (not WA).
         """
-        dirs = [
-            (-1, -1), (0, -1), (1, -1),
-            (-1,  0),          (1,  0),
-            (-1,  1), (0,  1), (1,  1),
+        # The cell's direction mask already excludes off-map and WA steps
+        mask = self.direction_masks[glyph.y * self.width + glyph.x]
+        return [
+            PathGlyph(glyph.x + dx, glyph.y + dy)
+            for d, (dx, dy) in enumerate(DIRECTIONS)
+            if mask >> d & 1
         ]
 
-        results = []
-
-        for dx, dy in dirs:
-            nx, ny = glyph.x + dx, glyph.y + dy
-
-            if not self.in_bounds(nx, ny):
-                continue
-
-            # Skip impassable terrain
-            if not self.is_traversable(nx, ny):
-                continue
-
-            results.append(PathGlyph(nx, ny))
-
-        return results
-
     def render_ascii(
         self,
         path: Optional[List[PathGlyph]] = None,
@@ -166,3 +447,53 @@ class Map_Anvil:
             rows.append("".join(line))
 
         return "\n".join(rows)
+
+
+
+class Profiled_Anvil(Map_Anvil):
+    """
+    A map priced with another Cost_Profile (see Map_Anvil.with_profile).
+
+    Shares the terrain codes of its base map and owns its cost,
+    passability and direction mask layers. Edits, version and listeners
+    all belong to the base map; the view patches its layers after every
+    batch, before any listener that subscribed through it runs.
+    """
+
+    def __init__(self, base: Map_Anvil, profile: Cost_Profile):
+        codes = base.terrain_codes
+        self.base = base
+        self.profile = profile
+        self.json_path = base.json_path
+        self.width = base.width
+        self.height = base.height
+        self.terrain_codes = codes
+        self.cost_grid = forge_cost_layer(codes, profile)
+        self.passable_bits = forge_passable_bits(codes, profile)
+        self.direction_masks = forge_direction_masks(codes, base.width, base.height, profile)
+
+        # The base map keeps only a weak reference, so unused views die
+        follow_edits(base, self, Profiled_Anvil._follow)
+
+    def _follow(self, change: Terrain_Change) -> None:
+        for index, _, code in change.cells:
+            self._derive_cell(index, code)
+
+    @property
+    def version(self) -> int:
+        return self.base.version
+
+    def with_profile(self, profile: Cost_Profile) -> Map_Anvil:
+        return self.base.with_profile(profile)
+
+    def apply_edits(
+        self,
+        edits: Iterable[Tuple[PathGlyph, str]],
+    ) -> Optional[Terrain_Change]:
+        return self.base.apply_edits(edits)
+
+    def subscribe(self, listener: Callable[[Terrain_Change], None]) -> None:
+        self.base.subscribe(listener)
+
+    def unsubscribe(self, listener: Callable[[Terrain_Change], None]) -> None:
+        self.base.unsubscribe(listener)
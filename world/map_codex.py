@@ -0,0 +1,296 @@
+"""
+map_codex.py
+------------
+Fast readers and writers for map files.
+
+JSON maps (the format in maps/) are read in a single streaming pass: the
+file is consumed in chunks, each row is split on commas, and every
+quoted identifier is looked up and encoded straight into a compact array
+of terrain codes. Anything that is not a known quoted identifier fails
+the lookup, so validation happens in the same pass. No nested list of
+strings is ever built.
+
+The binary format stores the same codes with a fixed header:
+
+    offset  size  field
+    0       4     magic b"ANVL"
+    4       2     format version (1)
+    6       2     reserved (0)
+    8       4     width
+    12      4     height
+    16      w*h   terrain codes, row-major, one uint8 per cell
+
+All integers are little-endian. Binary maps are memory-mapped, so
+opening one costs little more than mapping the file.
+
+Tiled maps (for worlds too large to hold in memory, see Tiled_Anvil) use
+the same header with magic b"ANVT" and the tile size in the reserved
+field. The codes follow as square tiles of tile_size * tile_size bytes,
+tile rows top to bottom, and row-major inside each tile. Tiles on the
+right and bottom edges are padded with wall_of_ancients.
+
+Run as a script to convert JSON maps (add --tiled for the tiled format):
+
+    python -m world.map_codex [--tiled] maps/demo_world.json [more.json ...]
+"""
+
+from array import array
+from pathlib import Path
+from typing import Optional, Tuple, Union
+import mmap
+import re
+import struct
+import sys
+
+from world.terrain_legends import IDENTIFIER_CODES, TERRAIN_CODE_OF, TERRAIN_CODES
+
+MAGIC = b"ANVL"
+TILED_MAGIC = b"ANVT"
+FORMAT_VERSION = 1
+BINARY_SUFFIX = ".anvil"
+TILED_SUFFIX = ".anvt"
+
+# Tile edge in cells; a multiple of 8 so tile rows hold whole bitmap bytes
+DEFAULT_TILE_SIZE = 64
+
+_HEADER = struct.Struct("<4sHHII")
+HEADER_SIZE = _HEADER.size
+
+# Characters read per chunk by the streaming JSON reader
+CHUNK_SIZE = 1 << 20
+
+# One row: optional separating comma, then a bracketed list without nesting
+_ROW = re.compile(r'\s*(,?)\s*\[([^\[\]]*)\]')
+_OPENING = re.compile(r'\s*\[')
+_CLOSING = re.compile(r'\s*\]\s*')
+
+# Whitespace carries no meaning inside a row of identifiers
+_WHITESPACE = str.maketrans("", "", " \t\r\n")
+
+# Quoted JSON identifiers (long names and shortcodes) -> terrain code
+_QUOTED_CODES = {f'"{name}"': code for name, code in IDENTIFIER_CODES.items()}
+
+# Byte values that are valid terrain codes
+_VALID_CODES = bytes(range(len(TERRAIN_CODES)))
+
+Terrain_Codes = Union[array, memoryview]
+
+
+def read_terrain_json(path: Union[str, Path]) -> Tuple[array, int, int]:
+    """
+    Parse a JSON map into (terrain codes, width, height) in one pass.
+    Raises ValueError for anything that is not a non-empty rectangular
+    list of rows of known terrain identifiers.
+    """
+    lookup = _QUOTED_CODES.__getitem__
+    codes = array("B")
+    width = -1
+    height = 0
+
+    with open(path, "r", encoding="utf-8") as file:
+        buffer = file.read(CHUNK_SIZE)
+        opening = _OPENING.match(buffer)
+        while opening is None and len(buffer.strip()) == 0:
+            chunk = file.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            buffer += chunk
+            opening = _OPENING.match(buffer)
+        if opening is None:
+            raise ValueError("Map must be a non-empty 2D list.")
+        position = opening.end()
+
+        while True:
+            row = _ROW.match(buffer, position)
+            if row is None:
+                chunk = file.read(CHUNK_SIZE)
+                if chunk:
+                    buffer = buffer[position:] + chunk
+                    position = 0
+                    continue
+                break
+
+            if bool(row.group(1)) != (height > 0):
+                raise ValueError(f"Malformed separator before map row {height}.")
+
+            cells = row.group(2).translate(_WHITESPACE).split(",")
+            if width == -1:
+                width = len(cells)
+            elif len(cells) != width:
+                raise ValueError("Map rows must all be the same length.")
+
+            try:
+                codes.extend(map(lookup, cells))
+            except KeyError as error:
+                raise ValueError(f"Unknown terrain identifier: {error.args[0]}") from None
+
+            height += 1
+            position = row.end()
+
+    if height == 0 or _CLOSING.fullmatch(buffer, position) is None:
+        raise ValueError("Map must be a non-empty 2D list.")
+
+    return codes, width, height
+
+
+def write_binary_map(
+    path: Union[str, Path],
+    codes: Terrain_Codes,
+    width: int,
+    height: int,
+) -> None:
+    """Write terrain codes in the binary map format."""
+    if len(codes) != width * height:
+        raise ValueError("Terrain code count does not match width * height.")
+
+    with open(path, "wb") as file:
+        file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, 0, width, height))
+        file.write(memoryview(codes).cast("B"))
+
+
+def read_binary_map(
+    path: Union[str, Path],
+    use_mmap: bool = True,
+) -> Tuple[Terrain_Codes, int, int]:
+    """
+    (terrain codes, width, height) of a binary map.
+
+    With use_mmap the codes are a copy-on-write view of the mapped file:
+    pages are read on first touch and edits never reach the file.
+    Otherwise the codes are read into a fresh array.
+    """
+    with open(path, "rb") as file:
+        header = file.read(HEADER_SIZE)
+        width, height = _check_header(header, path)
+        size = width * height
+
+        if use_mmap:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+            if len(mapped) < HEADER_SIZE + size:
+                raise ValueError(f"Binary map is truncated: {path}")
+            codes: Terrain_Codes = memoryview(mapped)[HEADER_SIZE:HEADER_SIZE + size]
+        else:
+            codes = array("B")
+            try:
+                codes.fromfile(file, size)
+            except EOFError:
+                raise ValueError(f"Binary map is truncated: {path}") from None
+
+    if bytes(codes).translate(None, _VALID_CODES):
+        raise ValueError(f"Binary map holds unknown terrain codes: {path}")
+
+    return codes, width, height
+
+
+def is_binary_map(path: Union[str, Path]) -> bool:
+    """True if the file starts with the binary map magic number."""
+    with open(path, "rb") as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+def convert_json_map(
+    json_path: Union[str, Path],
+    binary_path: Optional[Union[str, Path]] = None,
+) -> Path:
+    """
+    Convert a JSON map to the binary format. The output defaults to the
+    same name with the .anvil suffix; returns the path written.
+    """
+    json_path = Path(json_path)
+    binary_path = Path(binary_path) if binary_path else json_path.with_suffix(BINARY_SUFFIX)
+
+    codes, width, height = read_terrain_json(json_path)
+    write_binary_map(binary_path, codes, width, height)
+    return binary_path
+
+
+def is_tiled_map(path: Union[str, Path]) -> bool:
+    """True if the file starts with the tiled map magic number."""
+    with open(path, "rb") as file:
+        return file.read(len(TILED_MAGIC)) == TILED_MAGIC
+
+
+def write_tiled_map(
+    path: Union[str, Path],
+    codes: Terrain_Codes,
+    width: int,
+    height: int,
+    tile_size: int = DEFAULT_TILE_SIZE,
+) -> None:
+    """Write row-major terrain codes in the tiled map format."""
+    if tile_size < 8 or tile_size % 8 or tile_size > 0xFFFF:
+        raise ValueError("tile_size must be a multiple of 8 below 65536")
+    if len(codes) != width * height:
+        raise ValueError("Terrain code count does not match width * height.")
+
+    codes = memoryview(codes).cast("B")
+    wall = TERRAIN_CODE_OF["wall_of_ancients"]
+    blank = bytes([wall]) * (tile_size * tile_size)
+
+    with open(path, "wb") as file:
+        file.write(_HEADER.pack(TILED_MAGIC, FORMAT_VERSION, tile_size, width, height))
+        for top in range(0, height, tile_size):
+            rows = min(tile_size, height - top)
+            for left in range(0, width, tile_size):
+                span = min(tile_size, width - left)
+                tile = bytearray(blank)
+                for row in range(rows):
+                    start = (top + row) * width + left
+                    tile[row * tile_size:row * tile_size + span] = codes[start:start + span]
+                file.write(tile)
+
+
+def read_tiled_header(path: Union[str, Path]) -> Tuple[int, int, int]:
+    """(width, height, tile_size) of a tiled map."""
+    with open(path, "rb") as file:
+        header = file.read(HEADER_SIZE)
+    width, height = _check_header(header, path, TILED_MAGIC)
+    tile_size = _HEADER.unpack(header)[2]
+    if tile_size < 8 or tile_size % 8:
+        raise ValueError(f"Tiled map has an invalid tile size {tile_size}: {path}")
+    return width, height, tile_size
+
+
+def convert_to_tiled(
+    source_path: Union[str, Path],
+    tiled_path: Optional[Union[str, Path]] = None,
+    tile_size: int = DEFAULT_TILE_SIZE,
+) -> Path:
+    """
+    Convert a JSON or binary map to the tiled format. Binary sources are
+    memory-mapped, so maps larger than RAM can be converted. The output
+    defaults to the same name with the .anvt suffix.
+    """
+    source_path = Path(source_path)
+    tiled_path = Path(tiled_path) if tiled_path else source_path.with_suffix(TILED_SUFFIX)
+
+    if is_binary_map(source_path):
+        codes, width, height = read_binary_map(source_path)
+    else:
+        codes, width, height = read_terrain_json(source_path)
+    write_tiled_map(tiled_path, codes, width, height, tile_size)
+    return tiled_path
+
+
+def _check_header(header: bytes, path, expected: bytes = MAGIC) -> Tuple[int, int]:
+    if len(header) < HEADER_SIZE:
+        raise ValueError(f"Binary map is truncated: {path}")
+
+    magic, version, _, width, height = _HEADER.unpack(header)
+    if magic != expected:
+        raise ValueError(f"Not a {'tiled' if expected == TILED_MAGIC else 'binary'} map: {path}")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported binary map version {version}: {path}")
+    if width == 0 or height == 0:
+        raise ValueError("Map must be a non-empty 2D list.")
+    return width, height
+
+
+if __name__ == "__main__":
+    sources = sys.argv[1:]
+    convert = convert_json_map
+    if "--tiled" in sources:
+        sources.remove("--tiled")
+        convert = convert_to_tiled
+    for source in sources:
+        print(f"{source} -> {convert(source)}")
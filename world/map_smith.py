@@ -0,0 +1,233 @@
+"""
+map_smith.py
+------------
+Seeded procedural maps for benchmarks and tests.
+
+forge_terrain() returns row-major terrain codes, the same compact form
+map_codex reads, so a generated map can be written as JSON or in the
+binary format. The same arguments and seed always give the same map.
+
+Styles:
+    - open  : walls scattered at random
+    - rooms : rooms split by wall lines (recursive division) joined by
+              doorways, with scattered walls inside the rooms
+    - maze  : a perfect maze of one-cell corridors (for straight steps;
+              diagonal steps can slip between corridors), braided by
+              knocking out walls at random
+
+wall_density is the share of wall cells to aim for. Structural walls are
+kept, so rooms never drop below the walls that divide them, and a maze is
+only braided down to the density (at 0.5 and above it stays near perfect).
+
+Passable cells draw their terrain from terrain_weights (terrain name or
+shortcode -> relative weight).
+
+Run as a script to write a map:
+
+    python -m world.map_smith out.json 256 256 --style maze --seed 7
+"""
+
+from array import array
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Tuple, Union
+import argparse
+import random
+
+from world.map_codex import write_binary_map
+from world.terrain_legends import IDENTIFIER_CODES, TERRAIN_CODE_OF, TERRAIN_SHORTCODES
+
+STYLES = ("open", "rooms", "maze")
+
+# Default mix of passable terrain: mostly grassland
+DEFAULT_TERRAIN_WEIGHTS: Dict[str, float] = {
+    "WG": 4.0,
+    "FR": 2.0,
+    "DD": 1.0,
+    "FL": 1.0,
+    "MM": 1.0,
+    "SM": 1.0,
+}
+
+# Smallest room edge the rooms style will split further
+MIN_ROOM = 6
+
+_WALL = TERRAIN_CODE_OF["wall_of_ancients"]
+
+# Terrain code -> quoted shortcode, for writing JSON
+_QUOTED_SHORTCODES = {
+    TERRAIN_CODE_OF[name]: f'"{short}"' for short, name in TERRAIN_SHORTCODES.items()
+}
+
+
+def forge_terrain(
+    width: int,
+    height: int,
+    seed: int = 0,
+    style: str = "open",
+    wall_density: float = 0.2,
+    terrain_weights: Optional[Mapping[str, float]] = None,
+) -> array:
+    """Row-major terrain codes of a generated width x height map."""
+    if width < 1 or height < 1:
+        raise ValueError("Map must be at least 1 x 1")
+    if style not in STYLES:
+        raise ValueError(f"Unknown map style: {style}")
+    if not 0.0 <= wall_density <= 1.0:
+        raise ValueError("wall_density must be between 0 and 1")
+
+    rng = random.Random(seed)
+    codes = _terrain_fill(width * height, rng, terrain_weights or DEFAULT_TERRAIN_WEIGHTS)
+    target = int(wall_density * width * height)
+
+    if style == "maze":
+        walls = _carve_maze(width, height, rng)
+        _open_walls(codes, walls, target, rng)
+    else:
+        walls = _divide_rooms(width, height, rng) if style == "rooms" else []
+        for index in walls:
+            codes[index] = _WALL
+        _scatter_walls(codes, target - len(walls), rng)
+
+    return codes
+
+
+def write_map(
+    path: Union[str, Path],
+    codes: array,
+    width: int,
+    height: int,
+) -> Path:
+    """
+    Write generated codes as a JSON map of shortcodes, or in the binary
+    format if path ends in .anvil. Returns the path written.
+    """
+    path = Path(path)
+    if path.suffix == ".anvil":
+        write_binary_map(path, codes, width, height)
+        return path
+
+    quoted = [_QUOTED_SHORTCODES[code] for code in range(len(_QUOTED_SHORTCODES))]
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("[\n")
+        for y in range(height):
+            row = ", ".join(map(quoted.__getitem__, codes[y * width:(y + 1) * width]))
+            file.write(f"    [{row}]{',' if y < height - 1 else ''}\n")
+        file.write("]\n")
+    return path
+
+
+# ---------------------------------------------------------------
+# INTERNAL: GENERATION STEPS
+# ---------------------------------------------------------------
+
+def _terrain_fill(size: int, rng: random.Random, weights: Mapping[str, float]) -> array:
+    """size passable codes drawn from the weighted terrain mix."""
+    choices: List[int] = []
+    cumulative: List[float] = []
+    total = 0.0
+    for terrain, weight in weights.items():
+        code = IDENTIFIER_CODES.get(terrain)
+        if code is None:
+            raise ValueError(f"Unknown terrain identifier: {terrain}")
+        if code == _WALL:
+            raise ValueError("Walls are placed by wall_density, not terrain_weights")
+        if weight < 0:
+            raise ValueError(f"Weight of {terrain} must not be negative")
+        if weight > 0:
+            total += weight
+            choices.append(code)
+            cumulative.append(total)
+    if not choices:
+        raise ValueError("terrain_weights must give some terrain a positive weight")
+
+    return array("B", rng.choices(choices, cum_weights=cumulative, k=size))
+
+
+def _scatter_walls(codes: array, count: int, rng: random.Random) -> None:
+    """Turn count random open cells into walls."""
+    if count <= 0:
+        return
+    open_cells = [index for index, code in enumerate(codes) if code != _WALL]
+    for index in rng.sample(open_cells, min(count, len(open_cells))):
+        codes[index] = _WALL
+
+
+def _open_walls(codes: array, walls: List[int], target: int, rng: random.Random) -> None:
+    """Write the maze walls, minus random ones beyond the target count."""
+    rng.shuffle(walls)
+    for index in walls[:max(target, 0)]:
+        codes[index] = _WALL
+
+
+def _carve_maze(width: int, height: int, rng: random.Random) -> List[int]:
+    """
+    Wall cells of a perfect maze. Corridor cells sit on even coordinates
+    and are joined by a randomised depth-first search.
+    """
+    carved = bytearray(width * height)
+    columns = (width + 1) // 2
+    rows = (height + 1) // 2
+
+    stack = [(0, 0)]
+    carved[0] = 1
+    while stack:
+        cx, cy = stack[-1]
+        options = [
+            (cx + dx, cy + dy)
+            for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1))
+            if 0 <= cx + dx < columns and 0 <= cy + dy < rows
+            and not carved[2 * (cy + dy) * width + 2 * (cx + dx)]
+        ]
+        if not options:
+            stack.pop()
+            continue
+        nx, ny = rng.choice(options)
+        # Open the cell itself and the wall between it and the current one
+        carved[2 * ny * width + 2 * nx] = 1
+        carved[(cy + ny) * width + (cx + nx)] = 1
+        stack.append((nx, ny))
+
+    return [index for index, open_cell in enumerate(carved) if not open_cell]
+
+
+def _divide_rooms(width: int, height: int, rng: random.Random) -> List[int]:
+    """
+    Wall cells of a recursive division: each region wider or taller than
+    two rooms is split by a wall line with a doorway, until every room is
+    below 2 * MIN_ROOM on both sides.
+    """
+    walls = set()
+    regions: List[Tuple[int, int, int, int]] = [(0, 0, width, height)]
+
+    while regions:
+        x0, y0, x1, y1 = regions.pop()
+        w, h = x1 - x0, y1 - y0
+        if w < 2 * MIN_ROOM and h < 2 * MIN_ROOM:
+            continue
+
+        if w >= h:
+            line = rng.randrange(x0 + MIN_ROOM, x1 - MIN_ROOM + 1)
+            door = rng.randrange(y0, y1)
+            walls.update(y * width + line for y in range(y0, y1) if y != door)
+            regions += [(x0, y0, line, y1), (line + 1, y0, x1, y1)]
+        else:
+            line = rng.randrange(y0 + MIN_ROOM, y1 - MIN_ROOM + 1)
+            door = rng.randrange(x0, x1)
+            walls.update(line * width + x for x in range(x0, x1) if x != door)
+            regions += [(x0, y0, x1, line), (x0, line + 1, x1, y1)]
+
+    return sorted(walls)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a procedurally generated map.")
+    parser.add_argument("path", help="output file (.json, or .anvil for the binary format)")
+    parser.add_argument("width", type=int)
+    parser.add_argument("height", type=int)
+    parser.add_argument("--style", choices=STYLES, default="open")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--walls", type=float, default=0.2, help="target share of wall cells")
+    args = parser.parse_args()
+
+    codes = forge_terrain(args.width, args.height, args.seed, args.style, args.walls)
+    print(write_map(args.path, codes, args.width, args.height))
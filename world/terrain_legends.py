@@ -15,6 +15,20 @@ TERRAIN_CATALOGUE = {
     "wall_of_ancients": float("inf"),  # impassable
 }
 
+# Two-letter shortcodes used by the map files in maps/
+TERRAIN_SHORTCODES = {
+    "WG": "whispering_grassland",
+    "FR": "forest_of_reflections",
+    "DD": "desert_of_doom",
+    "FL": "frozen_lake",
+    "MM": "muddy_marsh",
+    "SM": "shadow_mountain",
+    "WA": "wall_of_ancients",
+}
+
+# Extra energy charged for a diagonal step in lowest_energy mode
+DIAGONAL_PENALTY = 0.4
+
 # ASCII symbols
 TERRAIN_SYMBOLS = {
     "whispering_grassland": ".",
@@ -26,6 +40,17 @@ TERRAIN_SYMBOLS = {
     "wall_of_ancients": "#",
 }
 
+# Stable integer codes used by the compact grid store (code -> long name).
+# A code fits in one byte, so a map costs one byte per cell.
+TERRAIN_CODES = tuple(TERRAIN_CATALOGUE)
+TERRAIN_CODE_OF = {name: code for code, name in enumerate(TERRAIN_CODES)}
+
+# Both long names and shortcodes resolve straight to a terrain code
+IDENTIFIER_CODES = dict(TERRAIN_CODE_OF)
+IDENTIFIER_CODES.update(
+    (short, TERRAIN_CODE_OF[name]) for short, name in TERRAIN_SHORTCODES.items()
+)
+
 # ---------------------------------------------------------------
 # VALIDATION HELPERS
 # ---------------------------------------------------------------
@@ -0,0 +1,272 @@
+"""
+tiled_anvil.py
+--------------
+Map_Anvil backed by a memory-mapped tiled map file (see map_codex).
+
+Worlds such as 50k x 50k cells do not fit in memory as flat arrays. A
+Tiled_Anvil maps the file and decodes a tile (terrain codes, float32
+costs and passability bitmap) only when a lookup first touches it.
+Decoded tiles are kept in a bounded LRU Tile_Cache, so memory grows with
+the region a search actually visits, not with the map.
+
+terrain_codes, cost_grid, passable_bits and direction_masks are lazy
+views that use the same flat row-major indexing as Map_Anvil's arrays,
+so every method and search engine works unchanged. Saladin_Pathfinder
+pairs lazy worlds with a Sparse_Workspace so that its scratch state does
+not span the map either.
+
+Edits go to the copy-on-write mapping and never reach the file.
+"""
+
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Tuple
+import mmap
+
+from world.grid_forge import (
+    DIRECTIONS,
+    Map_Anvil,
+    forge_cost_layer,
+    forge_direction_masks,
+    forge_passable_bits,
+)
+from world.cost_profiles import STANDARD
+from world.map_codex import HEADER_SIZE, read_tiled_header
+from world.terrain_legends import TERRAIN_CODES
+
+# Byte values that are valid terrain codes
+_VALID_CODES = bytes(range(len(TERRAIN_CODES)))
+
+# One decoded tile: (terrain codes, costs, passability bitmap, direction
+# masks); the masks treat the tile as a map of its own, so they are only
+# right away from its border
+Tile = Tuple[bytearray, array, bytearray, bytearray]
+
+
+class Tile_Cache:
+    """
+    Least-recently-used cache of decoded tiles of one mapped file.
+    """
+
+    def __init__(self, mapped: mmap.mmap, width: int, height: int, tile_size: int, max_tiles: int):
+        if max_tiles < 1:
+            raise ValueError("max_tiles must be at least 1")
+
+        self.mapped = mapped
+        self.width = width
+        self.height = height
+        self.tile_size = tile_size
+        self.max_tiles = max_tiles
+        self.columns = -(-width // tile_size)
+        self.rows = -(-height // tile_size)
+
+        self._tiles: "OrderedDict[int, Tile]" = OrderedDict()
+
+        self.loads = 0
+        self.evictions = 0
+
+    def tile(self, tile_id: int) -> Tile:
+        """Decoded tile, paging it in (and evicting the oldest) if needed."""
+        tile = self._tiles.get(tile_id)
+        if tile is not None:
+            self._tiles.move_to_end(tile_id)
+            return tile
+
+        area = self.tile_size * self.tile_size
+        start = HEADER_SIZE + tile_id * area
+        codes = bytearray(self.mapped[start:start + area])
+        if codes.translate(None, _VALID_CODES):
+            raise ValueError(f"Tile {tile_id} holds unknown terrain codes")
+
+        size = self.tile_size
+        tile = (
+            codes,
+            forge_cost_layer(codes),
+            forge_passable_bits(codes),
+            forge_direction_masks(codes, size, size),
+        )
+        self._tiles[tile_id] = tile
+        self.loads += 1
+        if len(self._tiles) > self.max_tiles:
+            self._tiles.popitem(last=False)
+            self.evictions += 1
+        return tile
+
+    def locate(self, index: int) -> Tuple[int, int]:
+        """(tile id, position inside the tile) of a flat row-major index."""
+        y, x = divmod(index, self.width)
+        size = self.tile_size
+        ty, ly = divmod(y, size)
+        tx, lx = divmod(x, size)
+        return ty * self.columns + tx, ly * size + lx
+
+    def write(self, index: int, code: int) -> None:
+        """Store a terrain code in the mapping and any decoded copy."""
+        tile_id, local = self.locate(index)
+        self.mapped[HEADER_SIZE + tile_id * self.tile_size * self.tile_size + local] = code
+
+        tile = self._tiles.get(tile_id)
+        if tile is not None:
+            codes, costs, bits, masks = tile
+            cost = STANDARD.costs[code]
+            codes[local] = code
+            costs[local] = cost
+            mask = 1 << (local & 7)
+            if cost < float("inf"):
+                bits[local >> 3] |= mask
+            else:
+                bits[local >> 3] &= ~mask & 0xFF
+            masks[:] = forge_direction_masks(codes, self.tile_size, self.tile_size)
+
+    def stats(self) -> Dict[str, int]:
+        area = self.tile_size * self.tile_size
+        return {
+            "tile_loads": self.loads,
+            "tile_evictions": self.evictions,
+            "tiles_resident": len(self._tiles),
+            # codes, float32 costs, bitmap and masks per decoded tile
+            "resident_bytes": len(self._tiles) * (area + 4 * area + area // 8 + area),
+        }
+
+    def __len__(self) -> int:
+        return len(self._tiles)
+
+
+class Tiled_Layer:
+    """
+    Flat-indexed view of one per-cell tile part (0 = codes, 1 = costs).
+    Read-only: edits go through Tiled_Anvil.apply_edits.
+    """
+
+    def __init__(self, cache: Tile_Cache, part: int):
+        self.cache = cache
+        self.part = part
+        self.size = cache.width * cache.height
+
+    def __getitem__(self, index):
+        cache = self.cache
+        try:
+            y, x = divmod(index, cache.width)
+        except TypeError:
+            return [self[i] for i in range(*index.indices(self.size))]
+        size = cache.tile_size
+        ty, ly = divmod(y, size)
+        tx, lx = divmod(x, size)
+        return cache.tile(ty * cache.columns + tx)[self.part][ly * size + lx]
+
+    def __len__(self) -> int:
+        return self.size
+
+
+class Tiled_Bitmap:
+    """
+    Flat view of the packed passability bitmap: byte b holds cells
+    8b .. 8b + 7. When the map width is a multiple of 8 those cells always
+    share one tile row, so a byte comes straight from the tile's bitmap;
+    otherwise it is assembled cell by cell.
+    """
+
+    def __init__(self, cache: Tile_Cache):
+        self.cache = cache
+        self.size = cache.width * cache.height
+        self.aligned = cache.width % 8 == 0
+
+    def __getitem__(self, byte: int) -> int:
+        cache = self.cache
+        index = byte << 3
+
+        if self.aligned:
+            y, x = divmod(index, cache.width)
+            size = cache.tile_size
+            ty, ly = divmod(y, size)
+            tx, lx = divmod(x, size)
+            return cache.tile(ty * cache.columns + tx)[2][(ly * size + lx) >> 3]
+
+        value = 0
+        for k in range(min(8, self.size - index)):
+            tile_id, local = cache.locate(index + k)
+            value |= (cache.tile(tile_id)[2][local >> 3] >> (local & 7) & 1) << k
+        return value
+
+    def __len__(self) -> int:
+        return (self.size + 7) // 8
+
+
+class Tiled_Masks:
+    """
+    Flat view of the direction masks. Cells off a tile's border use the
+    mask decoded with the tile; border cells check their neighbours,
+    which may lie in adjacent tiles.
+    """
+
+    def __init__(self, cache: Tile_Cache):
+        self.cache = cache
+        self.size = cache.width * cache.height
+
+    def __getitem__(self, index: int) -> int:
+        cache = self.cache
+        width, height, size = cache.width, cache.height, cache.tile_size
+        y, x = divmod(index, width)
+        ty, ly = divmod(y, size)
+        tx, lx = divmod(x, size)
+
+        if 0 < lx < size - 1 and 0 < ly < size - 1:
+            return cache.tile(ty * cache.columns + tx)[3][ly * size + lx]
+
+        mask = 0
+        for d, (dx, dy) in enumerate(DIRECTIONS):
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < width and 0 <= ny < height:
+                tile_id, local = cache.locate(ny * width + nx)
+                if cache.tile(tile_id)[2][local >> 3] >> (local & 7) & 1:
+                    mask |= 1 << d
+        return mask
+
+    def __len__(self) -> int:
+        return self.size
+
+
+class Tiled_Anvil(Map_Anvil):
+    """
+    Map_Anvil paged in tile by tile from a tiled map file.
+
+    Maps whose width is a multiple of 8 read passability one tile at a
+    time; other widths may touch a neighbouring tile per bitmap byte.
+    """
+
+    lazy = True
+
+    def __init__(self, tiled_path: str, max_tiles: int = 1024):
+        self.json_path = Path(tiled_path)
+
+        if not self.json_path.exists():
+            raise FileNotFoundError(f"Map file not found: {self.json_path}")
+
+        width, height, tile_size = read_tiled_header(self.json_path)
+        with open(self.json_path, "rb") as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+
+        tiles = -(-width // tile_size) * -(-height // tile_size)
+        if len(mapped) < HEADER_SIZE + tiles * tile_size * tile_size:
+            raise ValueError(f"Tiled map is truncated: {self.json_path}")
+
+        self.width = width
+        self.height = height
+        self.version = 0
+        self._listeners = []
+
+        self.tiles = Tile_Cache(mapped, width, height, tile_size, max_tiles)
+        self.terrain_codes = Tiled_Layer(self.tiles, 0)
+        self.cost_grid = Tiled_Layer(self.tiles, 1)
+        self.passable_bits = Tiled_Bitmap(self.tiles)
+        self.direction_masks = Tiled_Masks(self.tiles)
+
+    def layers(self) -> Dict[str, memoryview]:
+        raise ValueError("Tiled worlds are paged from disk and have no flat layers")
+
+    def save_binary(self, path: str) -> None:
+        raise ValueError("Tiled worlds are paged from disk; convert the source map instead")
+
+    def _write_cell(self, index: int, code: int) -> None:
+        self.tiles.write(index, code)
@@ -0,0 +1,145 @@
+"""
+world_registry.py
+-----------------
+In-process cache of loaded Map_Anvil worlds.
+
+Worlds are keyed by file id (the map path) plus a SHA-256 of the file
+contents. A request whose file has the same mtime and size as last time
+is served without touching the file at all. If the stat changed, the
+file is hashed and only re-parsed when its contents actually differ.
+Entries are evicted least-recently-used first once either the world
+count or the total cell count exceeds its limit.
+
+Binary maps are read into memory rather than mapped: an upload may
+truncate and rewrite the file while its world is still cached.
+
+Each entry also carries a "products" dict for things derived from the
+world (flow fields, path caches, ...), dropped together with it.
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Tuple
+import hashlib
+import os
+import threading
+
+from world.grid_forge import Map_Anvil
+
+
+class World_Registry:
+    """
+    LRU registry of Map_Anvil instances, safe to share between threads.
+    """
+
+    def __init__(self, max_worlds: int = 8, max_cells: int = 16_000_000):
+        if max_worlds < 1:
+            raise ValueError("max_worlds must be at least 1")
+
+        self.max_worlds = max_worlds
+        self.max_cells = max_cells
+
+        # (file_id, digest) -> (world, products), least recently used first
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Map_Anvil, Dict]]" = OrderedDict()
+        # file_id -> (mtime_ns, size, digest) seen on the last fetch
+        self._fingerprints: Dict[str, Tuple[int, int, str]] = {}
+        self._cells = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    # ------------------------------------------------------------
+    # PUBLIC METHODS
+    # ------------------------------------------------------------
+    def fetch(self, file_id: str) -> Map_Anvil:
+        """Loaded world for file_id, parsing the file only on a miss."""
+        return self._entry(file_id)[0]
+
+    def products(self, file_id: str) -> Dict:
+        """Scratch dict for objects derived from the current world."""
+        return self._entry(file_id)[1]
+
+    def fetch_with_products(self, file_id: str) -> Tuple[Map_Anvil, Dict]:
+        """
+        fetch() and products() from one lookup, so the products always
+        belong to the returned world even if the file changes meanwhile.
+        """
+        return self._entry(file_id)
+
+    def invalidate(self, file_id: str) -> int:
+        """Forget every cached version of file_id; returns how many."""
+        with self._lock:
+            self._fingerprints.pop(file_id, None)
+            stale = [key for key in self._entries if key[0] == file_id]
+            for key in stale:
+                self._drop(key)
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "worlds": len(self._entries),
+                "cells": self._cells,
+            }
+
+    # ------------------------------------------------------------
+    # INTERNAL UTILITIES
+    # ------------------------------------------------------------
+    def _entry(self, file_id: str) -> Tuple[Map_Anvil, Dict]:
+        info = os.stat(file_id)
+
+        with self._lock:
+            known = self._fingerprints.get(file_id)
+            if known is not None and known[:2] == (info.st_mtime_ns, info.st_size):
+                key = (file_id, known[2])
+                if key in self._entries:
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                    return self._entries[key]
+
+        digest = hashlib.sha256(Path(file_id).read_bytes()).hexdigest()
+        key = (file_id, digest)
+
+        with self._lock:
+            self._fingerprints[file_id] = (info.st_mtime_ns, info.st_size, digest)
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        # Uploads rewrite files in place, so cached worlds own their codes
+        world = Map_Anvil(file_id, use_mmap=False)
+
+        with self._lock:
+            self.misses += 1
+            # Older contents of the same file can never be requested again
+            for stale in [k for k in self._entries if k[0] == file_id and k != key]:
+                self._drop(stale)
+                self.evictions += 1
+
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = (world, {})
+                self._entries[key] = entry
+                self._cells += world.width * world.height
+                self._evict()
+            return entry
+
+    def _evict(self) -> None:
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_worlds or self._cells > self.max_cells
+        ):
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _drop(self, key: Tuple[str, str]) -> None:
+        world, _ = self._entries.pop(key)
+        self._cells -= world.width * world.height